@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+bench_distinct.py
+===========================================
+Accuracy / speed of distinct-athlete counts: row-level nunique vs cube
+exact unions vs merged HLL sketches (nil_sketch.py).
+
+Builds a synthetic deal table (schools × sports × months, Zipf-ish athlete
+activity), rolls it into the cube once, then answers the same filters three
+ways and reports wall time and relative error against exact nunique.
+
+Usage:
+  python bench_distinct.py [n_deals] [n_athletes]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from nil_cube import build_cube, slice_cube, cube_kpis
+
+
+def synthetic_deals(n_deals: int, n_athletes: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    schools = np.array([f"School {i}" for i in range(400)])
+    sports = np.array(["Football", "Basketball", "Baseball", "Softball", "Volleyball"])
+    athletes = rng.zipf(1.3, n_deals) % n_athletes
+    return pd.DataFrame({
+        "deal_key": np.arange(n_deals),
+        "deal_date": pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 4 * 365, n_deals), "D"),
+        "deal_amount": np.where(rng.random(n_deals) < 0.2, rng.integers(100, 100_000, n_deals), np.nan),
+        "player_key": athletes,
+        "team_committed": pd.Categorical(schools[athletes % len(schools)]),
+        "sport_name": pd.Categorical(sports[(athletes // 7) % len(sports)]),
+    })
+
+
+def _timed(fn, repeat: int = 3):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best * 1000
+
+
+def main():
+    n_deals = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_athletes = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+
+    deals = synthetic_deals(n_deals, n_athletes)
+    t0 = time.perf_counter()
+    cube = build_cube(deals)
+    print(f"[BENCH] {n_deals:,} deals → {len(cube):,} cube cells (build {time.perf_counter() - t0:.1f}s)\n")
+
+    scenarios = {
+        "all": ((), (), (2022, 2025)),
+        "2 schools": (("School 1", "School 2"), (), (2022, 2025)),
+        "1 sport, 2 yrs": ((), ("Football",), (2023, 2024)),
+        "20 schools, 2 sports": (tuple(f"School {i}" for i in range(20)), ("Football", "Basketball"), (2022, 2025)),
+    }
+
+    print(f"{'filter':<22}{'exact':>9}{'nunique ms':>12}{'cube exact ms':>15}{'sketch ms':>11}{'sketch':>9}{'rel err':>9}")
+    for name, (schools, sports, years) in scenarios.items():
+        def rows_nunique():
+            f = deals
+            if schools:
+                f = f[f["team_committed"].isin(schools)]
+            if sports:
+                f = f[f["sport_name"].isin(sports)]
+            f = f[f["deal_date"].dt.year.between(*years)]
+            return f["player_key"].nunique()
+
+        cells = slice_cube(cube, schools, sports, years)
+        truth, t_rows = _timed(rows_nunique)
+        exact, t_exact = _timed(lambda: cube_kpis(cells, mode="exact")["total_athletes"])
+        approx, t_sketch = _timed(lambda: cube_kpis(cells, mode="sketch")["total_athletes"])
+        assert exact == truth, (exact, truth)
+
+        err = (approx - truth) / truth if truth else 0.0
+        print(f"{name:<22}{truth:>9,}{t_rows:>12.1f}{t_exact:>15.1f}{t_sketch:>11.1f}{approx:>9,}{err:>+9.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+bench_geo_index.py
+===========================================
+Nearest-county and radius queries for every IPEDS campus: brute-force
+all-pairs great-circle distances vs the grid index (geo_index.py).
+
+County centroids come from the Census Gazetteer file when present,
+otherwise the mean campus position per county (as etl.py does). Checks
+that both methods return the same neighbours, at the default cell size
+and at cell sizes that do not divide 360°.
+
+Usage:
+  python bench_geo_index.py [radius_miles] [ipeds_year]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from geo_index import GeoIndex, _miles, _unit_vectors
+from raw_schemas import IPEDS_DIRECTORY, read_raw
+from etl import COUNTY_GAZETTEER
+
+
+def _timed(fn, repeat: int = 5):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best * 1000
+
+
+def load_points(year: int):
+    ipeds = read_raw(IPEDS_DIRECTORY, IPEDS_DIRECTORY.path_for(year=year))
+    ipeds = ipeds.dropna(subset=["latitude", "longitude"])
+    if os.path.exists(COUNTY_GAZETTEER):
+        gaz = pd.read_csv(COUNTY_GAZETTEER, sep="\t")
+        gaz.columns = [c.strip() for c in gaz.columns]
+        centroids = gaz[["INTPTLAT", "INTPTLONG"]].to_numpy(dtype="float64")
+    else:
+        centroids = ipeds.groupby("county_fips")[["latitude", "longitude"]].mean().to_numpy()
+    return ipeds[["latitude", "longitude"]].to_numpy(dtype="float64"), centroids
+
+
+def main():
+    radius = float(sys.argv[1]) if len(sys.argv) > 1 else 25.0
+    year = int(sys.argv[2]) if len(sys.argv) > 2 else 2022
+    campuses, centroids = load_points(year)
+    print(f"[BENCH] {len(campuses):,} campuses × {len(centroids):,} county centroids, radius {radius:g} mi\n")
+
+    def brute():
+        miles = _miles(_unit_vectors(*campuses.T) @ _unit_vectors(*centroids.T).T)
+        return miles.argmin(axis=1), np.nonzero(miles <= radius)
+
+    (b_nearest, (b_q, b_p)), t_brute = _timed(brute)
+    index, t_build = _timed(lambda: GeoIndex(centroids[:, 0], centroids[:, 1]))
+    (g_nearest, _), t_nearest = _timed(lambda: index.nearest(*campuses.T))
+    (g_q, g_p, _), t_within = _timed(lambda: index.within(*campuses.T, radius))
+
+    print(f"  brute force (all pairs)   {t_brute:8.1f} ms")
+    print(f"  grid index build          {t_build:8.1f} ms")
+    print(f"  grid nearest              {t_nearest:8.1f} ms")
+    print(f"  {f'grid within {radius:g} mi':<26}{t_within:8.1f} ms   ({len(g_q):,} pairs)")
+
+    same_nearest = np.array_equal(b_nearest, g_nearest)
+    same_within = set(zip(b_q.tolist(), b_p.tolist())) == set(zip(g_q.tolist(), g_p.tolist()))
+    print(f"\n[CHECK] nearest identical: {same_nearest}; radius pairs identical: {same_within}")
+
+    odd = {}
+    for cell_deg in (7.0, 17.0):
+        idx = GeoIndex(centroids[:, 0], centroids[:, 1], cell_deg=cell_deg)
+        q, p, _ = idx.within(*campuses.T, radius)
+        odd[cell_deg] = (np.array_equal(b_nearest, idx.nearest(*campuses.T)[0])
+                         and set(zip(b_q.tolist(), b_p.tolist())) == set(zip(q.tolist(), p.tolist())))
+    print("[CHECK] " + "; ".join(f"cell_deg={c:g} identical: {ok}" for c, ok in odd.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+bench_raw_reads.py
+===========================================
+Parse time / memory of the raw CSV reads: full read with inferred dtypes
+(what the pipelines used to do) vs read_raw() with the schema registry's
+usecols + explicit dtypes, on the C and pyarrow engines.
+
+Usage:
+  python bench_raw_reads.py [ipeds_year]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+from raw_schemas import EADA, FCC_MOBILE, IPEDS_DIRECTORY, read_raw
+
+
+def _timed(fn, repeat: int = 5):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best * 1000
+
+
+def main():
+    year = int(sys.argv[1]) if len(sys.argv) > 1 else 2022
+    sources = [
+        (IPEDS_DIRECTORY, IPEDS_DIRECTORY.path_for(year=year)),
+        (EADA, EADA.path),
+        (FCC_MOBILE, FCC_MOBILE.path),
+    ]
+
+    for schema, path in sources:
+        if not os.path.exists(path):
+            print(f"[SKIP] {path} not found.")
+            continue
+        print(f"[BENCH] {os.path.basename(path)} ({os.path.getsize(path) / 1e6:.1f} MB)")
+        runs = {
+            "full read, inferred": lambda: pd.read_csv(path, low_memory=False),
+            "schema, c engine": lambda: read_raw(schema, path, engine="c"),
+            "schema, pyarrow csv": lambda: read_raw(schema, path, engine="pyarrow"),
+        }
+        for label, fn in runs.items():
+            df, ms = _timed(fn)
+            mem = df.memory_usage(deep=True).sum() / 1e6
+            print(f"  {label:<22} {ms:8.1f} ms   {df.shape[1]:4d} cols   {mem:7.2f} MB in memory")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+bench_urban_client.py
+===========================================
+UrbanClient (urban_client.py) against a local stand-in for the Urban
+Institute Education Data API, one request in flight vs the default pool.
+
+The stand-in serves two paginated endpoints with a fixed latency:
+
+  /counted   `count` + `next` + `results` (the real API shape), so the
+             client plans pages 2..N from page 1 and fans them out
+  /chained   only `next` + `results`, so the client follows `next` links
+
+and answers one page of each with a 500 the first time it is requested.
+
+Checks:
+  - rows come back complete and in order on both endpoints
+  - the 500 pages were retried
+  - /counted pages ran concurrently (never above max_in_flight)
+  - a second client on the same cache directory makes no requests
+  - once the cached pages are older than the TTL they are fetched again
+
+Usage:
+  python bench_urban_client.py [n_rows] [latency_ms]
+"""
+
+import glob
+import http.server
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from urban_client import MAX_IN_FLIGHT, UrbanClient
+
+PAGE_SIZE = 100
+
+
+def start_stub(n_rows, latency, fail_once):
+    lock = threading.Lock()
+    log = {"requests": 0, "open": 0, "max_open": 0}
+    pending_failures = set(fail_once)   # (endpoint, page)
+    n_pages = -(-n_rows // PAGE_SIZE)
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            endpoint = parts.path.strip("/")
+            page = int(parse_qs(parts.query).get("page", ["1"])[0])
+            with lock:
+                log["requests"] += 1
+                log["open"] += 1
+                log["max_open"] = max(log["max_open"], log["open"])
+                fail = (endpoint, page) in pending_failures
+                pending_failures.discard((endpoint, page))
+            try:
+                time.sleep(latency)
+                if fail or endpoint not in ("counted", "chained"):
+                    self.send_response(500 if fail else 404)
+                    self.end_headers()
+                    return
+                start = (page - 1) * PAGE_SIZE
+                body = {
+                    "next": (f"http://{self.headers['Host']}/{endpoint}/?page={page + 1}"
+                             if page < n_pages else None),
+                    "results": [{"unitid": i, "year": 2022} for i in range(start, min(start + PAGE_SIZE, n_rows))],
+                }
+                if endpoint == "counted":
+                    body["count"] = n_rows
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            finally:
+                with lock:
+                    log["open"] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, log
+
+
+def _rows_in_order(df, n_rows):
+    return len(df) == n_rows and df["unitid"].tolist() == list(range(n_rows))
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1234
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 100.0) / 1000
+    n_pages = -(-n_rows // PAGE_SIZE)
+    fail_once = {("counted", 5), ("chained", 3)}
+    print(f"[BENCH] {n_rows:,} rows in {n_pages} pages of {PAGE_SIZE}, "
+          f"{latency * 1000:.0f} ms latency, one-off 500s on {sorted(fail_once)}\n")
+
+    # Fan-out vs serial, and the `next` fallback
+    for endpoint in ("counted", "chained"):
+        for in_flight in (1, MAX_IN_FLIGHT):
+            server, log = start_stub(n_rows, latency, fail_once)
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+            client = UrbanClient(rate=0, max_in_flight=in_flight, backoff=0.05, cache_dir=None, ttl=0)
+            t0 = time.perf_counter()
+            df = client.fetch_frame(f"{base}/{endpoint}/")
+            elapsed = time.perf_counter() - t0
+            server.shutdown()
+            concurrent = log["max_open"] > 1 if endpoint == "counted" and in_flight > 1 else log["max_open"] == 1
+            print(f"  /{endpoint:<9}{in_flight} in flight {elapsed:6.2f} s  {log['requests']} requests")
+            print(f"    [CHECK] rows complete + in order: {_rows_in_order(df, n_rows)}; "
+                  f"500 retried: {log['requests'] == n_pages + 1}; "
+                  f"{'fanned out' if endpoint == 'counted' and in_flight > 1 else 'serial'}: {concurrent}; "
+                  f"in flight ≤ {in_flight}: {log['max_open'] <= in_flight}")
+
+    # Page cache and TTL
+    server, log = start_stub(n_rows, latency, set())
+    url = f"http://127.0.0.1:{server.server_address[1]}/counted/"
+    cache_dir = tempfile.mkdtemp(prefix="urban_cache_")
+    ttl = 3600.0
+    runs = []
+    for label in ("cold", "warm", "expired"):
+        if label == "expired":
+            stale = time.time() - ttl - 1
+            for path in glob.glob(os.path.join(cache_dir, "*.json")):
+                os.utime(path, (stale, stale))
+        client = UrbanClient(rate=0, backoff=0.05, cache_dir=cache_dir, ttl=ttl)
+        before = log["requests"]
+        df = client.fetch_frame(url)
+        runs.append((label, _rows_in_order(df, n_rows), log["requests"] - before, client.cache_hits))
+    server.shutdown()
+
+    print()
+    for label, ok, requests_made, hits in runs:
+        print(f"  cache {label:<8}{requests_made:>3} requests {hits:>3} cache hits   rows ok: {ok}")
+    (_, _, cold_req, _), (_, _, warm_req, warm_hits), (_, _, exp_req, exp_hits) = runs
+    print(f"    [CHECK] warm run served from cache: {warm_req == 0 and warm_hits == n_pages}; "
+          f"expired pages re-fetched: {exp_req == n_pages and exp_hits == 0}")
+
+
+if __name__ == "__main__":
+    main()
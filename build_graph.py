@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+build_graph.py
+===========================================
+Minimal incremental build graph for the ETL stages.
+
+Each Stage declares the files it reads (inputs) and writes (outputs). Its
+fingerprint is a hash of:
+  - the source of its function (plus any helpers / constants it names in
+    `code`), so editing a stage's code re-runs it
+  - the content hash of every input (files, or every file under a
+    directory; missing inputs hash as "missing")
+
+A stage is skipped when its fingerprint matches the one recorded after its
+last run and the outputs it produced then still exist. Dependencies are
+implied: a stage depends on every stage that outputs one of its inputs.
+Because downstream fingerprints use upstream *content*, a re-run stage that
+writes byte-identical outputs does not force its dependants to re-run.
+
+Stages whose dependencies are done run together in a process pool (stage
+functions must be picklable, i.e. module-level functions or partials).
+
+Content hashes are cached in the state file keyed by (size, mtime_ns), so a
+no-op build only stats files and reads nothing.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[], Any]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    code: Sequence[Any] = ()     # extra helpers / constants whose changes should re-run the stage
+
+    def code_hash(self) -> str:
+        h = hashlib.sha1()
+        for obj in [self.fn, *self.code]:
+            h.update(_describe(obj).encode("utf-8"))
+        return h.hexdigest()
+
+
+def _describe(obj: Any) -> str:
+    """Source for functions (partials include their bound args), repr for data."""
+    if isinstance(obj, partial):
+        return _describe(obj.func) + repr(obj.args) + repr(sorted(obj.keywords.items()))
+    if callable(obj):
+        try:
+            return inspect.getsource(obj)
+        except (OSError, TypeError):
+            return repr(obj)
+    return repr(obj)
+
+
+def _iter_files(path: str) -> Iterator[str]:
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for f in sorted(files):
+                yield os.path.join(root, f)
+    elif os.path.exists(path):
+        yield path
+
+
+class BuildGraph:
+    """Runs Stages in dependency order, skipping the ones whose fingerprint is unchanged."""
+
+    def __init__(self, stages: List[Stage], state_path: str, workers: Optional[int] = None):
+        names = [s.name for s in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names: {names}")
+        self.stages = {s.name: s for s in stages}
+        self.state_path = state_path
+        self.workers = workers or os.cpu_count() or 1
+
+        producers = {os.path.abspath(o): s.name for s in stages for o in s.outputs}
+        self.deps = {
+            s.name: sorted({producers[os.path.abspath(i)] for i in s.inputs if os.path.abspath(i) in producers} - {s.name})
+            for s in stages
+        }
+
+        self.state: Dict[str, Any] = {"files": {}, "stages": {}}
+        if os.path.exists(state_path):
+            with open(state_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    # ---------------- hashing ----------------
+
+    def file_hash(self, path: str) -> str:
+        st = os.stat(path)
+        cached = self.state["files"].get(path)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["sha1"]
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        self.state["files"][path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": h.hexdigest()}
+        return h.hexdigest()
+
+    def input_hash(self, path: str) -> str:
+        files = list(_iter_files(path))
+        if not files:
+            return "missing"
+        h = hashlib.sha1()
+        for f in files:
+            h.update(os.path.relpath(f, path).encode("utf-8"))
+            h.update(self.file_hash(f).encode("utf-8"))
+        return h.hexdigest()
+
+    def fingerprint(self, stage: Stage) -> str:
+        h = hashlib.sha1(stage.code_hash().encode("utf-8"))
+        for path in sorted(stage.inputs):
+            h.update(path.encode("utf-8"))
+            h.update(self.input_hash(path).encode("utf-8"))
+        return h.hexdigest()
+
+    def is_fresh(self, stage: Stage, fp: str) -> bool:
+        last = self.state["stages"].get(stage.name)
+        return bool(last) and last["fingerprint"] == fp and all(os.path.exists(o) for o in last["outputs"])
+
+    # ---------------- run ----------------
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+    def _record(self, stage: Stage, fp: str) -> None:
+        self.state["stages"][stage.name] = {
+            "fingerprint": fp,
+            "outputs": [o for o in stage.outputs if os.path.exists(o)],
+            "built_at": time.time(),
+        }
+
+    def run(self, force: bool = False) -> Dict[str, str]:
+        """Build every stage; returns {stage: "skipped" | "ran" | "failed" | "blocked"}."""
+        status: Dict[str, str] = {}
+        remaining = list(self.stages)
+
+        while remaining:
+            wave = [n for n in remaining if all(d in status for d in self.deps[n])]
+            if not wave:
+                raise RuntimeError(f"Dependency cycle among stages: {remaining}")
+            remaining = [n for n in remaining if n not in wave]
+
+            to_run = {}
+            for name in wave:
+                stage = self.stages[name]
+                if any(status[d] in ("failed", "blocked") for d in self.deps[name]):
+                    status[name] = "blocked"
+                    continue
+                fp = self.fingerprint(stage)
+                if not force and self.is_fresh(stage, fp):
+                    status[name] = "skipped"
+                else:
+                    to_run[name] = fp
+
+            for name, err in self._execute(list(to_run)).items():
+                stage = self.stages[name]
+                if err is None:
+                    # Re-fingerprint: a stage may create its own inputs (e.g. a download)
+                    self._record(stage, self.fingerprint(stage))
+                    status[name] = "ran"
+                else:
+                    print(f"[BUILD] Stage {name} failed: {err!r}")
+                    status[name] = "failed"
+
+        self._save()
+        return status
+
+    def _execute(self, names: List[str]) -> Dict[str, Optional[BaseException]]:
+        """Run stage functions: inline when there is only one, otherwise in a process pool."""
+        results: Dict[str, Optional[BaseException]] = {}
+        if len(names) <= 1 or self.workers <= 1:
+            for name in names:
+                try:
+                    self.stages[name].fn()
+                    results[name] = None
+                except Exception as e:
+                    results[name] = e
+            return results
+
+        with ProcessPoolExecutor(max_workers=min(len(names), self.workers)) as pool:
+            futures = {name: pool.submit(self.stages[name].fn) for name in names}
+            for name, fut in futures.items():
+                try:
+                    fut.result()
+                    results[name] = None
+                except Exception as e:
+                    results[name] = e
+        return results
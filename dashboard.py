@@ -4,10 +4,17 @@ NIL Collegiate Dashboard (2022–2025)
 Executive Theme — Streamlit + Altair
 """
 
+import os
+
 import pandas as pd
 import streamlit as st
 import altair as alt
 
+from nil_store import load_deals, load_athlete_values, fill_category, source_mtimes
+from nil_cube import build_cube, load_cube, cube_mtime, slice_cube, cube_kpis, cube_time_series, cube_school_summary
+from dashboard_cache import LRUCache, SectionTimer
+from filter_index import FilterIndex
+
 # --------------------------------------------
 # THEME SETUP (Altair 5.x)
 # --------------------------------------------
@@ -56,17 +63,169 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# --------------------------------------------
+# CACHES + TIMING
+# --------------------------------------------
+# Streamlit reruns this whole script on every interaction. Loaded frames and
+# per-filter aggregations live in process-wide memos (see dashboard_cache.py);
+# everything taken from them is shared, so treat it as read-only.
+@st.cache_resource
+def get_caches():
+    return {
+        "frames": LRUCache(max_entries=1),    # keyed on source + cube file mtimes
+        "panels": LRUCache(max_entries=64),   # keyed on (mtimes, filters)
+    }
+
+caches = get_caches()
+timer = SectionTimer()
+
 # --------------------------------------------
 # LOAD DATA
 # --------------------------------------------
-df = pd.read_csv("data/processed/on3_nil_deals_all.csv")
-df_dedupe = pd.read_csv("data/processed/on3_nil_athlete_values.csv")
+# Typed Parquet store (see nil_store.py): deal_date is already a timestamp,
+# low-cardinality text columns are categorical, and only these columns are read.
+DEAL_COLUMNS = [
+    "deal_key", "deal_date", "deal_amount", "player_key", "player_name",
+    "team_committed", "sport_name", "company_name", "player_state",
+]
+ATHLETE_COLUMNS = ["player_key", "team_committed", "sport_name", "deal_value"]
+
+
+def load_frames():
+    df = load_deals(DEAL_COLUMNS)
+    df_dedupe = load_athlete_values(ATHLETE_COLUMNS)
+
+    df = df[df["deal_date"].dt.year.between(2022, 2025)].copy()
+    df["sport_name"] = fill_category(df["sport_name"], "Unknown")
+    df["player_state"] = fill_category(df["player_state"], "Unknown")
+
+    # Pre-aggregated (school × sport × month) cube from nil_cube.py; built
+    # in-process from the deal rows if it has not been built since the deals
+    # last changed.
+    cube = load_cube(newer_than=source_mtimes()[0])
+    if cube is None:
+        cube = build_cube(df)
+
+    # Posting-list indexes so each filter combination is a row-id intersection
+    deal_index = FilterIndex(df, {
+        "school": df["team_committed"],
+        "sport": df["sport_name"],
+        "year": df["deal_date"].dt.year,
+    })
+    dedupe_index = FilterIndex.for_columns(df_dedupe, school="team_committed", sport="sport_name")
+
+    return {
+        "df": df,
+        "dedupe": df_dedupe,
+        "cube": cube,
+        "deal_index": deal_index,
+        "dedupe_index": dedupe_index,
+        "schools": sorted(df["team_committed"].dropna().unique()),
+        "sports": sorted(df["sport_name"].dropna().unique()),
+    }
+
+
+data_version = source_mtimes() + (cube_mtime(),)
+with timer.section("load"):
+    frames = caches["frames"].get_or_compute(data_version, load_frames)
+df, df_dedupe, cube = frames["df"], frames["dedupe"], frames["cube"]
+
+# --------------------------------------------
+# AGGREGATIONS (one function per panel)
+# --------------------------------------------
+# KPIs, "NIL Deals Over Time" and "Top NIL Schools" are answered from the
+# cube; brand / athlete panels and the school table still need row detail.
+# Distinct athletes: exact unions for small selections, merged HLL sketches
+# for large ones; NIL_DISTINCT_MODE=exact|sketch forces either path.
+DISTINCT_MODE = os.environ.get("NIL_DISTINCT_MODE", "auto")
+
+def filter_frames(schools, sports, years):
+    filtered_df = frames["deal_index"].select(
+        df, school=schools, sport=sports, year=range(years[0], years[1] + 1)
+    )
+    filtered_dedupe = frames["dedupe_index"].select(df_dedupe, school=schools, sport=sports)
+    return filtered_df, filtered_dedupe
+
+
+def compute_brand_volume(filtered_df):
+    return (
+        filtered_df.groupby("company_name", observed=True)
+        .size()
+        .reset_index(name="deal_count")
+        .sort_values("deal_count", ascending=False)
+        .head(10)
+    )
+
+
+def compute_athlete_volume(filtered_df):
+    return (
+        filtered_df.groupby(["player_key", "player_name"])
+        .size()
+        .reset_index(name="deal_count")
+        .sort_values("deal_count", ascending=False)
+        .head(10)
+    )
+
 
-df["deal_date"] = pd.to_datetime(df["deal_date"], errors="coerce")
-df = df[df["deal_date"].dt.year.between(2022, 2025)]
-df["sport_name"] = df["sport_name"].fillna("Unknown")
-df["player_state"] = df["player_state"].fillna("Unknown")
+def compute_athlete_value(filtered_df):
+    df_money = filtered_df[filtered_df["deal_amount"].notnull()]
+    return (
+        df_money.groupby(["player_key", "player_name"])
+        .agg(total_value=("deal_amount", "mean"), deal_count=("deal_amount", "count"), avg_value=("deal_amount", "mean"))
+        .reset_index()
+        .sort_values("total_value", ascending=False)
+        .head(10)
+    )
+
+
+def compute_school_table(filtered_dedupe):
+    school_money = (
+        filtered_dedupe
+        .loc[filtered_dedupe["deal_value"].notnull()]
+        .groupby(["team_committed", "player_key"], as_index=False, observed=True)
+        .agg(deal_value=("deal_value", "max"))
+    )
+    if school_money.empty:
+        return None
+
+    school_table = (
+        school_money
+        .groupby("team_committed", observed=True)
+        .agg(
+            total_value=("deal_value", "sum"),
+            avg_value=("deal_value", "mean"),
+            median_value=("deal_value", "median"),
+            deal_count=("deal_value", "count"),
+            athletes=("player_key", "nunique")
+        )
+        .reset_index()
+        .sort_values("total_value", ascending=False)
+    )
+
+    total_value = school_table["total_value"].sum()
+    total_deals = school_table["deal_count"].sum()
+
+    school_table["% of NIL Value"] = school_table["total_value"] / total_value
+    school_table["% of Deals"] = school_table["deal_count"] / total_deals
+    return school_table
+
+
+def compute_panels(schools, sports, years):
+    cells = slice_cube(cube, schools, sports, years)
+    filtered_df, filtered_dedupe = filter_frames(schools, sports, years)
+    return {
+        "kpis": cube_kpis(cells, mode=DISTINCT_MODE),
+        "time_series": cube_time_series(cells),
+        "school_summary": cube_school_summary(cells, mode=DISTINCT_MODE),
+        "brand_volume": compute_brand_volume(filtered_df),
+        "athlete_volume": compute_athlete_volume(filtered_df),
+        "athlete_value": compute_athlete_value(filtered_df),
+        "school_table": compute_school_table(filtered_dedupe),
+    }
 
+# --------------------------------------------
+# HEADER + FILTERS
+# --------------------------------------------
 col1, spacer, col2 = st.columns([2, 0.1, 1])
 
 with col1:
@@ -96,24 +255,16 @@ with col1:
     """)
 
 with col2:
-    selected_school = st.multiselect("School", sorted(df["team_committed"].dropna().unique()))
-    selected_sports = st.multiselect("Sport", sorted(df["sport_name"].dropna().unique()))
+    selected_school = st.multiselect("School", frames["schools"])
+    selected_sports = st.multiselect("Sport", frames["sports"])
     year_range = st.slider("Year Range", 2022, 2025, (2022, 2025))
 
-# Apply filters
-filtered_df = df.copy()
-filtered_dedupe = df_dedupe.copy()
-
-if selected_school:
-    filtered_df = filtered_df[filtered_df["team_committed"].isin(selected_school)]
-    filtered_dedupe = filtered_dedupe[filtered_dedupe["team_committed"].isin(selected_school)]
-if selected_sports:
-    filtered_df = filtered_df[filtered_df["sport_name"].isin(selected_sports)]
-    filtered_dedupe = filtered_dedupe[filtered_dedupe["sport_name"].isin(selected_sports)]
-
-filtered_df = filtered_df[
-    filtered_df["deal_date"].dt.year.between(year_range[0], year_range[1])
-]
+# Apply filters (order-insensitive key so reordering a multiselect is still a hit)
+filter_key = (data_version, tuple(sorted(selected_school)), tuple(sorted(selected_sports)), tuple(year_range))
+with timer.section("aggregate"):
+    panels = caches["panels"].get_or_compute(
+        filter_key, lambda: compute_panels(selected_school, selected_sports, year_range)
+    )
 
 st.markdown("---")
 
@@ -122,7 +273,7 @@ st.markdown("---")
 # --------------------------------------------
 col1, spacer, col2 = st.columns([1, 0.01, 1])
 
-with col1:
+with timer.section("kpis"), col1:
     st.title("Market Overview")
     st.caption("Key indicators summarizing NIL activity volume, school and athlete participation, and deal value disclosures.")
 
@@ -130,34 +281,28 @@ with col1:
     k3, k4 = st.columns(2)
     k5, k6 = st.columns(2)
 
-    reported_deals = filtered_df["deal_amount"].notnull().sum()
-    total_deals = filtered_df["deal_key"].nunique()
-    share_reported = reported_deals / total_deals if total_deals else 0
-
-    reported_athletes = filtered_df[filtered_df["deal_amount"].notnull()]["player_key"].nunique()
-    total_athletes = filtered_df["player_key"].nunique()
+    kpis = panels["kpis"]
+    total_athletes = kpis["total_athletes"]
 
-    k1.metric("Total Deals", f"{len(filtered_df):,}")
-    k2.metric("Schools Represented", filtered_df["team_committed"].nunique())
+    k1.metric("Total Deals", f"{kpis['rows']:,}")
+    k2.metric("Schools Represented", kpis["schools"])
     k3.metric("Athletes Represented", total_athletes)
-    k4.metric("Athletes with Disclosed NIL Values", f"{reported_athletes / total_athletes:.1%}" if total_athletes else "0.0%")
-    k5.metric("Average Disclosed Deal Value", f"${filtered_df['deal_amount'].mean():,.0f}")
-    k6.metric("Deals with Disclosed Values", f"{share_reported:.1%}")
+    k4.metric("Athletes with Disclosed NIL Values", f"{kpis['reported_athletes'] / total_athletes:.1%}" if total_athletes else "0.0%")
+    k5.metric("Average Disclosed Deal Value", f"${kpis['avg_value']:,.0f}")
+    k6.metric("Deals with Disclosed Values", f"{kpis['share_reported']:.1%}")
 
 # --------------------------------------------
 # TIME SERIES — DEALS OVER TIME
 # --------------------------------------------
-filtered_df["deal_month"] = filtered_df["deal_date"].dt.to_period("M").dt.to_timestamp()
-time_series = filtered_df.groupby("deal_month").size().reset_index(name="deals")
-
-time_line = alt.Chart(time_series).mark_line(point=True, strokeWidth=3, color="#ef4444").encode(
-    x="deal_month:T", y="deals:Q", tooltip=["deal_month", "deals"]
-)
+with timer.section("time_series"):
+    time_line = alt.Chart(panels["time_series"]).mark_line(point=True, strokeWidth=3, color="#ef4444").encode(
+        x="deal_month:T", y="deals:Q", tooltip=["deal_month", "deals"]
+    )
 
-with col2:
-    st.subheader("NIL Deals Over Time")
-    st.caption("Monthly trend of NIL deal activity across all athletes and institutions from 2022 to 2025.")
-    st.altair_chart(time_line.properties(height=350), use_container_width=True)
+    with col2:
+        st.subheader("NIL Deals Over Time")
+        st.caption("Monthly trend of NIL deal activity across all athletes and institutions from 2022 to 2025.")
+        st.altair_chart(time_line.properties(height=350), use_container_width=True)
 
 st.markdown("---")
 
@@ -166,43 +311,33 @@ st.markdown("---")
 # --------------------------------------------
 col1, spacer, col2 = st.columns([1, 0.1, 1])
 
-school_summary = (
-    filtered_df.groupby("team_committed")
-    .agg(deals=("deal_key", "count"), athletes=("player_key", "nunique"))
-    .sort_values("deals", ascending=False)
-    .head(10)
-    .reset_index()
-)
+with timer.section("top_schools"):
+    school_summary = panels["school_summary"]
 
-school_bars = alt.Chart(school_summary).mark_bar(color="#2563eb").encode(
-    x="deals:Q",
-    y=alt.Y("team_committed:N", sort="-x"),
-    tooltip=["team_committed", "deals", "athletes"]
-)
+    school_bars = alt.Chart(school_summary).mark_bar(color="#2563eb").encode(
+        x="deals:Q",
+        y=alt.Y("team_committed:N", sort="-x"),
+        tooltip=["team_committed", "deals", "athletes"]
+    )
 
-with col1:
-    st.subheader("Top NIL Schools")
-    st.caption("The 10 most active schools based on total NIL deal volume, regardless of value.")
-    st.altair_chart(school_bars.properties(height=350), use_container_width=True)
-
-brand_volume = (
-    filtered_df.groupby("company_name")
-    .size()
-    .reset_index(name="deal_count")
-    .sort_values("deal_count", ascending=False)
-    .head(10)
-)
+    with col1:
+        st.subheader("Top NIL Schools")
+        st.caption("The 10 most active schools based on total NIL deal volume, regardless of value.")
+        st.altair_chart(school_bars.properties(height=350), use_container_width=True)
 
-brand_bars = alt.Chart(brand_volume).mark_bar(color="#6b7280").encode(
-    x=alt.X("deal_count:Q", title="Number of NIL Deals"),
-    y=alt.Y("company_name:N", sort="-x", title="Brand"),
-    tooltip=["company_name", "deal_count"]
-)
+with timer.section("top_brands"):
+    brand_volume = panels["brand_volume"]
 
-with col2:
-    st.subheader("Most Active Brands (Deal Volume)")
-    st.caption("Brands with the highest number of NIL deals signed, highlighting frequent sponsors and activators.")
-    st.altair_chart(brand_bars.properties(height=350), use_container_width=True)
+    brand_bars = alt.Chart(brand_volume).mark_bar(color="#6b7280").encode(
+        x=alt.X("deal_count:Q", title="Number of NIL Deals"),
+        y=alt.Y("company_name:N", sort="-x", title="Brand"),
+        tooltip=["company_name", "deal_count"]
+    )
+
+    with col2:
+        st.subheader("Most Active Brands (Deal Volume)")
+        st.caption("Brands with the highest number of NIL deals signed, highlighting frequent sponsors and activators.")
+        st.altair_chart(brand_bars.properties(height=350), use_container_width=True)
 
 st.markdown("---")
 
@@ -212,98 +347,63 @@ st.markdown("---")
 
 col1, spacer, col2 = st.columns([1, 0.1, 1])
 
-athlete_volume = (
-    filtered_df.groupby(["player_key", "player_name"])
-    .size()
-    .reset_index(name="deal_count")
-    .sort_values("deal_count", ascending=False)
-    .head(10)
-)
+with timer.section("athlete_volume"):
+    athlete_volume = panels["athlete_volume"]
 
-volume_bars = alt.Chart(athlete_volume).mark_bar(color="#7c3aed").encode(
-    x="deal_count:Q",
-    y=alt.Y("player_name:N", sort="-x"),
-    tooltip=["player_name", "deal_count"]
-)
-
-with col1:
-    st.subheader("Top 10 NIL Deals (Volume)")
-    st.caption("Athletes with the highest number of reported NIL deals across all categories.")
-    st.altair_chart(volume_bars.properties(height=350), use_container_width=True)
-
-df_money = filtered_df[filtered_df["deal_amount"].notnull()]
-athlete_value = (
-    df_money.groupby(["player_key", "player_name"])
-    .agg(total_value=("deal_amount", "mean"), deal_count=("deal_amount", "count"), avg_value=("deal_amount", "mean"))
-    .reset_index()
-    .sort_values("total_value", ascending=False)
-    .head(10)
-)
+    volume_bars = alt.Chart(athlete_volume).mark_bar(color="#7c3aed").encode(
+        x="deal_count:Q",
+        y=alt.Y("player_name:N", sort="-x"),
+        tooltip=["player_name", "deal_count"]
+    )
 
-value_bars = alt.Chart(athlete_value).mark_bar(color="#2563eb").encode(
-    x=alt.X("total_value:Q", axis=alt.Axis(format="~s")),
-    y=alt.Y("player_name:N", sort="-x"),
-    tooltip=[
-        "player_name",
-        alt.Tooltip("total_value:Q", format="$,.0f"),
-        "deal_count",
-        alt.Tooltip("avg_value:Q", format="$,.0f")
-    ]
-)
+    with col1:
+        st.subheader("Top 10 NIL Deals (Volume)")
+        st.caption("Athletes with the highest number of reported NIL deals across all categories.")
+        st.altair_chart(volume_bars.properties(height=350), use_container_width=True)
+
+with timer.section("athlete_value"):
+    athlete_value = panels["athlete_value"]
+
+    value_bars = alt.Chart(athlete_value).mark_bar(color="#2563eb").encode(
+        x=alt.X("total_value:Q", axis=alt.Axis(format="~s")),
+        y=alt.Y("player_name:N", sort="-x"),
+        tooltip=[
+            "player_name",
+            alt.Tooltip("total_value:Q", format="$,.0f"),
+            "deal_count",
+            alt.Tooltip("avg_value:Q", format="$,.0f")
+        ]
+    )
 
-with col2:
-    st.subheader("Highest NIL Value (Reported $)")
-    st.caption("Athletes with the highest reported NIL value, based on average or total deal amounts disclosed.")
-    st.altair_chart(value_bars.properties(height=350), use_container_width=True)
+    with col2:
+        st.subheader("Highest NIL Value (Reported $)")
+        st.caption("Athletes with the highest reported NIL value, based on average or total deal amounts disclosed.")
+        st.altair_chart(value_bars.properties(height=350), use_container_width=True)
 
 st.markdown("---")
 
 # --------------------------------------------
 # SCHOOL-LEVEL SUMMARY TABLE
 # --------------------------------------------
-st.header("School-Level NIL Summary")
-st.caption("Aggregate school-level NIL totals for athletes with disclosed deal values, including market share and median deal size.")
-
-school_money = (
-    filtered_dedupe
-    .loc[filtered_dedupe["deal_value"].notnull()]
-    .groupby(["team_committed", "player_key"], as_index=False)
-    .agg(deal_value=("deal_value", "max"))
-)
-
-if school_money.empty:
-    st.warning("No reported NIL values available.")
-else:
-    school_table = (
-        school_money
-        .groupby("team_committed")
-        .agg(
-            total_value=("deal_value", "sum"),
-            avg_value=("deal_value", "mean"),
-            median_value=("deal_value", "median"),
-            deal_count=("deal_value", "count"),
-            athletes=("player_key", "nunique")
+with timer.section("school_table"):
+    st.header("School-Level NIL Summary")
+    st.caption("Aggregate school-level NIL totals for athletes with disclosed deal values, including market share and median deal size.")
+
+    school_table = panels["school_table"]
+
+    if school_table is None:
+        st.warning("No reported NIL values available.")
+    else:
+        st.dataframe(
+            school_table.style.format({
+                "total_value": "${:,.0f}",
+                "avg_value": "${:,.0f}",
+                "median_value": "${:,.0f}",
+                "% of NIL Value": "{:.1%}",
+                "% of Deals": "{:.1%}",
+            }),
+            use_container_width=True
         )
-        .reset_index()
-        .sort_values("total_value", ascending=False)
-    )
-
-    total_value = school_table["total_value"].sum()
-    total_deals = school_table["deal_count"].sum()
-
-    school_table["% of NIL Value"] = school_table["total_value"] / total_value
-    school_table["% of Deals"] = school_table["deal_count"] / total_deals
-
-    st.dataframe(
-        school_table.style.format({
-            "total_value": "${:,.0f}",
-            "avg_value": "${:,.0f}",
-            "median_value": "${:,.0f}",
-            "% of NIL Value": "{:.1%}",
-            "% of Deals": "{:.1%}",
-        }),
-        use_container_width=True
-    )
 
 st.markdown("---")
 
@@ -313,3 +413,19 @@ st.caption(
 )
 
 st.success("Dashboard Build Complete")
+
+# --------------------------------------------
+# PERFORMANCE (render time + cache hit rate)
+# --------------------------------------------
+with st.expander("Performance"):
+    st.caption("Wall time per section for this run, and hit rates of the process-wide caches.")
+    p1, p2 = st.columns(2)
+    p1.dataframe(
+        pd.DataFrame(timer.rows(), columns=["section", "ms"]).style.format({"ms": "{:,.1f}"}),
+        use_container_width=True
+    )
+    p2.dataframe(
+        pd.DataFrame([{"cache": name, **c.stats()} for name, c in caches.items()])
+        .style.format({"hit_rate": "{:.1%}"}),
+        use_container_width=True
+    )
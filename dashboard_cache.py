@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+dashboard_cache.py
+===========================================
+Memo + timing helpers for dashboard.py.
+
+Streamlit re-executes the whole dashboard script on every widget
+interaction. These helpers let the script:
+  - keep the loaded frames for the life of the process (keyed on the
+    source file mtimes, so a rebuilt store is picked up automatically)
+  - memoize every panel's aggregation per filter combination in a bounded
+    LRU, so revisiting a filter combination is a dictionary lookup
+  - record per-section render time and cache hit rates for display
+
+Cached values are shared across sessions and reruns: callers must treat
+them as read-only.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable
+
+
+# ============================================================
+# LRU MEMO
+# ============================================================
+
+class LRUCache:
+    """Thread-safe bounded memo with hit/miss counters."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        value = fn()
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return value
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+
+# ============================================================
+# TIMING
+# ============================================================
+
+class SectionTimer:
+    """Collects wall time per named section for one script run."""
+
+    def __init__(self):
+        self.timings: "OrderedDict[str, float]" = OrderedDict()
+
+    @contextmanager
+    def section(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + (time.perf_counter() - t0) * 1000
+
+    def rows(self):
+        """[(section, ms)] in execution order, plus a total."""
+        out = list(self.timings.items())
+        out.append(("total", sum(self.timings.values())))
+        return out
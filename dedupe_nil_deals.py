@@ -15,11 +15,14 @@ INPUT:
 
 OUTPUT:
   data/processed/on3_nil_athlete_values.csv
+  data/processed/store/athlete_values.parquet  (typed store for the dashboard)
 """
 
 import pandas as pd
 import os
 
+from nil_store import ATHLETE_STORE, write_store
+
 # ------------------------------------------------------------
 # CONFIG
 # ------------------------------------------------------------
@@ -86,6 +89,7 @@ final_df = athlete_fact.sort_values(
 final_df.to_csv(OUTPUT_PATH, index=False)
 
 print(f"[OK] Saved athlete NIL fact table → {OUTPUT_PATH}")
+write_store(final_df, ATHLETE_STORE)
 
 # ------------------------------------------------------------
 # SANITY CHECKS
@@ -6,18 +6,39 @@ End-to-end ETL for:
 - IPEDS institution metadata
 - NIL state-level economics (manual export)
 - EADA athletics economics (wide-format)
-- FCC mobile coverage (state-level geometry from area file)
+- FCC mobile coverage (state- and county-level geometry from area file;
+  institutions get their county's coverage via IPEDS county_fips)
+- the typed Parquet store of the scraped NIL deal / athlete CSVs
+  (nil_store.py) that the dashboard reads
 
-Outputs clean, consistent processed CSVs for downstream modeling.
+Outputs clean, consistent processed CSVs for downstream modeling, plus a
+year-partitioned IPEDS demographics store when several years are requested:
+
+  python etl.py --years 2018-2022
+
+Stages only re-run when their code or input contents change (build_graph.py);
+--force re-runs everything.
 """
 
+import argparse
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from typing import Dict, Any, List, Optional
 
-import requests
+import numpy as np
 import pandas as pd
 
+from build_graph import BuildGraph, Stage
+from geo_index import GeoIndex
+from nil_store import (
+    ATHLETE_CSV, ATHLETE_STORE, CATEGORICAL_COLS, DATETIME_COLS, DEALS_CSV, DEALS_STORE,
+    apply_store_types, build_store, write_store,
+)
+from raw_schemas import EADA, FCC_MOBILE, IPEDS_DIRECTORY, read_raw
+from urban_client import RATE_LIMIT as URBAN_RATE_LIMIT, URBAN_BASE, UrbanClient
+
 
 # ============================================================
 # CONFIG
@@ -29,7 +50,25 @@ RAW_DIR = os.path.join(DATA_DIR, "raw")
 PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
 
 IPEDS_YEAR = 2022
-URBAN_BASE = "https://educationdata.urban.org/api/v1"
+IPEDS_YEARS = os.environ.get("IPEDS_YEARS", str(IPEDS_YEAR))   # "2018-2022", "2019,2021", …
+IPEDS_STORE_DIR = os.path.join(PROCESSED_DIR, "store", "ipeds_demographics")
+BUILD_STATE = os.path.join(PROCESSED_DIR, ".etl_build_state.json")
+
+# Column → dtype of the partitioned IPEDS store (identical across years)
+IPEDS_SCHEMA: Dict[str, str] = {
+    "unitid": "int64",
+    "school_name": "string",
+    "state_abbr": "string", "city": "string", "county_name": "string", "county_fips": "string",
+    "latitude": "float64", "longitude": "float64",
+    "urban_centric_locale": "Int64",
+    "inst_control": "Int64", "sector": "Int64", "institution_level": "Int64",
+    "degree_granting": "Int64", "offering_undergrad": "Int64", "offering_grad": "Int64",
+    "inst_size": "Int64", "inst_system_flag": "Int64", "inst_system_name": "string",
+    "cbsa": "Int64", "cbsa_type": "Int64", "csa": "Int64",
+    "cc_basic_2021": "Int64", "cc_instruc_undergrad_2021": "Int64", "cc_instruc_grad_2021": "Int64",
+    "cc_undergrad_2021": "Int64", "cc_enroll_2021": "Int64", "cc_size_setting_2021": "Int64",
+    "url_school": "string", "url_application": "string", "url_fin_aid": "string",
+}
 
 
 # ============================================================
@@ -42,43 +81,36 @@ def ensure_dirs() -> None:
         os.makedirs(d, exist_ok=True)
 
 
-def fetch_urban_endpoint(url: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+def fetch_urban_endpoint(url: str, params: Optional[Dict[str, Any]] = None,
+                         rate: float = URBAN_RATE_LIMIT) -> pd.DataFrame:
     """
     Paginated request to Urban Institute Education Data API.
     Returns a unified DataFrame of all pages.
+
+    Pages are fetched concurrently, rate limited (`rate` requests / second
+    for this call) and cached on disk (see urban_client.py for the knobs).
     """
     print(f"[URBAN] Fetching {url} ...")
-    rows: List[Dict[str, Any]] = []
-    session = requests.Session()
-    next_url = url
-
-    while next_url:
-        resp = session.get(next_url, params=params, timeout=60)
-        if resp.status_code != 200:
-            raise RuntimeError(f"Urban API error {resp.status_code}: {resp.text[:500]}")
-
-        data = resp.json()
-        rows.extend(data.get("results", []))
-        next_url = data.get("next")
-        time.sleep(0.25)  # politeness throttle
-
-    print(f"[URBAN] Retrieved {len(rows)} rows.")
-    return pd.DataFrame(rows)
+    client = UrbanClient(rate=rate)
+    df = client.fetch_frame(url, params)
+    print(f"[URBAN] Retrieved {len(df)} rows "
+          f"({client.requests_made} requests, {client.cache_hits} cached pages).")
+    return df
 
 
 # ============================================================
 # IPEDS PIPELINE
 # ============================================================
 
-def download_ipeds_directory(year: int = IPEDS_YEAR) -> str:
+def download_ipeds_directory(year: int = IPEDS_YEAR, rate: float = URBAN_RATE_LIMIT) -> str:
     """Pull IPEDS directory for the specified year and cache locally."""
-    out_path = os.path.join(RAW_DIR, f"ipeds_directory_{year}.csv")
+    out_path = IPEDS_DIRECTORY.path_for(year=year)
     if os.path.exists(out_path):
         print("[SKIP] IPEDS directory already present.")
         return out_path
 
     url = f"{URBAN_BASE}/college-university/ipeds/directory/{year}/"
-    df = fetch_urban_endpoint(url)
+    df = fetch_urban_endpoint(url, rate=rate)
     df.columns = [c.lower() for c in df.columns]
     df.to_csv(out_path, index=False)
 
@@ -101,44 +133,23 @@ def build_ipeds_institution_demographics(year: int = IPEDS_YEAR) -> str:
       - Carnegie 2021 classifications: cc_basic_2021, cc_instruc_undergrad_2021, ...
     """
     dir_path = download_ipeds_directory(year)
-    df = pd.read_csv(dir_path)
-    df.columns = [c.lower().strip() for c in df.columns]
-
-    # ------------------------------------------------------------
-    # STEP 1 — Define expanded schema to extract
-    # ------------------------------------------------------------
-    expanded_cols = [
-        # Identity
-        "unitid", "inst_name", "institution_name",
-
-        # Geography
-        "state_abbr", "city", "county_name", "county_fips",
-        "latitude", "longitude",
-
-        # Urbanicity
-        "urban_centric_locale",
+    inst = transform_ipeds_directory(read_raw(IPEDS_DIRECTORY, dir_path))
 
-        # Sector / control / level
-        "inst_control", "sector", "institution_level",
-        "degree_granting", "offering_undergrad", "offering_grad",
+    out_path = os.path.join(PROCESSED_DIR, "ipeds_institution_demographics.csv")
+    inst.to_csv(out_path, index=False)
+    print(f"[OK] Saved expanded IPEDS institution demographics → {out_path}")
 
-        # Size & admin
-        "inst_size", "inst_system_flag", "inst_system_name",
+    return out_path
 
-        # CBSA regioning
-        "cbsa", "cbsa_type", "csa",
 
-        # Carnegie 2021 classifications (very important for segmentation)
-        "cc_basic_2021",
-        "cc_instruc_undergrad_2021",
-        "cc_instruc_grad_2021",
-        "cc_undergrad_2021",
-        "cc_enroll_2021",
-        "cc_size_setting_2021",
+def transform_ipeds_directory(df: pd.DataFrame) -> pd.DataFrame:
+    """Raw IPEDS directory → expanded institution demographics (steps 1–5)."""
+    df.columns = [c.lower().strip() for c in df.columns]
 
-        # Nice-to-have URLs
-        "url_school", "url_application", "url_fin_aid",
-    ]
+    # ------------------------------------------------------------
+    # STEP 1 — Expanded schema to extract (see raw_schemas.IPEDS_DIRECTORY)
+    # ------------------------------------------------------------
+    expanded_cols = list(IPEDS_DIRECTORY.columns)
 
     # Keep only columns that actually exist
     keep_cols = [c for c in expanded_cols if c in df.columns]
@@ -182,18 +193,81 @@ def build_ipeds_institution_demographics(year: int = IPEDS_YEAR) -> str:
     # ------------------------------------------------------------
     # STEP 5 — Drop duplicates
     # ------------------------------------------------------------
-    inst = inst.drop_duplicates(subset="unitid")
+    return inst.drop_duplicates(subset="unitid")
 
-    # ------------------------------------------------------------
-    # STEP 6 — Save
-    # ------------------------------------------------------------
-    out_path = os.path.join(PROCESSED_DIR, "ipeds_institution_demographics.csv")
-    inst.to_csv(out_path, index=False)
-    print(f"[OK] Saved expanded IPEDS institution demographics → {out_path}")
 
+# ============================================================
+# MULTI-YEAR IPEDS STORE
+# ============================================================
+
+def parse_years(spec: str) -> List[int]:
+    """"2018-2022" / "2019,2021" / "2022" → sorted list of years."""
+    years = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = (int(x) for x in part.split("-", 1))
+            years.update(range(lo, hi + 1))
+        elif part:
+            years.add(int(part))
+    return sorted(years)
+
+
+def conform_ipeds_schema(inst: pd.DataFrame) -> pd.DataFrame:
+    """Same columns, order and dtypes for every year (missing columns → NA)."""
+    out = pd.DataFrame(index=inst.index)
+    for col, dtype in IPEDS_SCHEMA.items():
+        values = inst[col] if col in inst.columns else pd.Series(pd.NA, index=inst.index)
+        if dtype in ("Int64", "float64"):
+            values = pd.to_numeric(values, errors="coerce")
+        out[col] = values.astype(dtype)
+    return out.reset_index(drop=True)
+
+
+def build_ipeds_year_partition(year: int, rate: float = URBAN_RATE_LIMIT) -> str:
+    """Download + transform one IPEDS year into its store partition (runs in a worker process)."""
+    dir_path = download_ipeds_directory(year, rate=rate)
+    inst = conform_ipeds_schema(transform_ipeds_directory(read_raw(IPEDS_DIRECTORY, dir_path)))
+
+    part_dir = os.path.join(IPEDS_STORE_DIR, f"year={year}")
+    os.makedirs(part_dir, exist_ok=True)
+    out_path = os.path.join(part_dir, "part-0.parquet")
+    tmp = out_path + ".tmp"
+    inst.to_parquet(tmp, index=False)
+    os.replace(tmp, out_path)
+    print(f"[OK] IPEDS {year}: {len(inst):,} institutions → {out_path}")
     return out_path
 
 
+def build_ipeds_store(years: List[int], workers: Optional[int] = None) -> str:
+    """
+    Download the raw IPEDS directories and build the year-partitioned IPEDS
+    demographics store, one process per year:
+      data/processed/store/ipeds_demographics/year=YYYY/part-0.parquet
+
+    Each worker has its own Urban client, so the rate limit is split
+    between them to keep the total at URBAN_RATE_LIMIT.
+    """
+    ensure_dirs()
+    workers = min(len(years), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        for y in years:
+            build_ipeds_year_partition(y)
+    else:
+        build_one = partial(build_ipeds_year_partition, rate=URBAN_RATE_LIMIT / workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(build_one, years))
+    return IPEDS_STORE_DIR
+
+
+def load_ipeds_store(years: Optional[List[int]] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read the partitioned store (optionally only some years / columns); adds an int `year` column."""
+    filters = [("year", "in", list(years))] if years else None
+    df = pd.read_parquet(IPEDS_STORE_DIR, columns=columns and ["year"] + list(columns), filters=filters)
+    df["year"] = df["year"].astype("int64")
+    return df
+
+
 # ============================================================
 # NIL PIPELINE
 # ============================================================
@@ -281,13 +355,13 @@ def process_fcc_mobile_raw() -> Optional[str]:
       - pct5g_low_st
       - coverage_mobile_score
     """
-    in_path = os.path.join(RAW_DIR, "fcc_mobile_county.csv")
+    in_path = FCC_MOBILE.path
     if not os.path.exists(in_path):
         print("[INFO] FCC file missing.")
         return None
 
-    df = pd.read_csv(in_path)
-    df.columns = [c.lower().strip() for c in df.columns]
+    # Only the geometry / coverage columns, typed up front (see raw_schemas.py)
+    df = read_raw(FCC_MOBILE, in_path)
 
     required = ["geography_type", "geography_desc", "total_area"]
     if not all(c in df.columns for c in required):
@@ -317,10 +391,236 @@ def process_fcc_mobile_raw() -> Optional[str]:
     return out_path
 
 
+# ============================================================
+# FCC PIPELINE (COUNTY-LEVEL COVERAGE)
+# ============================================================
+
+FCC_COUNTY_CSV = os.path.join(PROCESSED_DIR, "fcc_mobile_coverage_by_county.csv")
+INSTITUTION_COVERAGE_CSV = os.path.join(PROCESSED_DIR, "institution_mobile_coverage.csv")
+COVERAGE_COLS = ["pct4g_st", "pct5g_low_st", "coverage_mobile_score"]
+
+# Census Gazetteer counties file (GEOID, INTPTLAT, INTPTLONG; tab-separated), optional
+COUNTY_GAZETTEER = os.path.join(RAW_DIR, "county_gazetteer.txt")
+NEARBY_RADIUS_MILES = float(os.environ.get("COVERAGE_RADIUS_MILES", "25"))
+
+
+def process_fcc_county_raw() -> Optional[str]:
+    """
+    County rows of the FCC area file as a lookup table keyed by 5-digit
+    county FIPS, so institutions get their own county's coverage instead of
+    their state's.
+
+    Uses the area_data_type == 'Total' rows (the file repeats each county for
+    Urban / Rural / Tribal / Nontribal areas).
+
+    Output: processed/fcc_mobile_coverage_by_county.csv, one row per
+    county_fips (unique, sorted) with
+      - county_fips, county_name, state_abbr, total_area
+      - pct4g_st, pct5g_low_st, coverage_mobile_score
+    """
+    in_path = FCC_MOBILE.path
+    if not os.path.exists(in_path):
+        print("[INFO] FCC file missing.")
+        return None
+
+    df = read_raw(FCC_MOBILE, in_path)
+
+    required = ["area_data_type", "geography_type", "geography_id", "geography_desc", "total_area",
+                "mobilebb_4g_area_st_pct", "mobilebb_5g_spd1_area_st_pct"]
+    if not all(c in df.columns for c in required):
+        print("[WARN] FCC file did not contain expected county geometry columns.")
+        return None
+
+    county = df[
+        (df["geography_type"].str.lower() == "county") & (df["area_data_type"].str.lower() == "total")
+    ]
+
+    # "Autauga County, AL" → county name + postal abbreviation
+    desc = county["geography_desc"].str.rsplit(", ", n=1)
+    pct4g = pd.to_numeric(county["mobilebb_4g_area_st_pct"], errors="coerce").fillna(0)
+    pct5g = pd.to_numeric(county["mobilebb_5g_spd1_area_st_pct"], errors="coerce").fillna(0)
+    out = pd.DataFrame({
+        "county_fips": county["geography_id"].str.zfill(5),
+        "county_name": desc.str[0],
+        "state_abbr": desc.str[-1].str.upper().str.strip(),
+        "total_area": county["total_area"],
+        "pct4g_st": pct4g,
+        "pct5g_low_st": pct5g,
+        # Same weights as the state-level score
+        "coverage_mobile_score": 0.6 * pct4g + 0.4 * pct5g,
+    })
+    out = out.drop_duplicates(subset="county_fips").sort_values("county_fips")
+
+    out.to_csv(FCC_COUNTY_CSV, index=False)
+    print(f"[OK] Saved FCC county coverage ({len(out):,} counties) → {FCC_COUNTY_CSV}")
+    return FCC_COUNTY_CSV
+
+
+def load_fcc_county_lookup(path: str = FCC_COUNTY_CSV) -> pd.DataFrame:
+    """County coverage indexed by county_fips (string, unique) for .reindex / .join lookups."""
+    return pd.read_csv(path, dtype={"county_fips": str}, index_col="county_fips")
+
+
+def load_county_centroids(lookup: pd.DataFrame, ipeds: Optional[pd.DataFrame] = None) -> Optional[pd.DataFrame]:
+    """
+    latitude / longitude per county_fips in the coverage lookup.
+
+    From the Census Gazetteer counties file when present; otherwise the mean
+    campus position of each county's IPEDS institutions (so only counties
+    with a campus get a centroid).
+    """
+    if os.path.exists(COUNTY_GAZETTEER):
+        gaz = pd.read_csv(COUNTY_GAZETTEER, sep="\t", dtype={"GEOID": str})
+        gaz.columns = [c.strip() for c in gaz.columns]
+        centroids = pd.DataFrame({
+            "latitude": gaz["INTPTLAT"].to_numpy(),
+            "longitude": gaz["INTPTLONG"].to_numpy(),
+        }, index=gaz["GEOID"].str.zfill(5).to_numpy())
+    elif ipeds is not None and {"county_fips", "latitude", "longitude"} <= set(ipeds.columns):
+        print(f"[INFO] {os.path.basename(COUNTY_GAZETTEER)} not found; using mean campus position per county.")
+        centroids = ipeds.groupby(ipeds["county_fips"].astype("string").str.zfill(5))[["latitude", "longitude"]].mean()
+    else:
+        return None
+    centroids = centroids[~centroids.index.duplicated()]
+    return centroids.reindex(lookup.index).dropna()
+
+
+def nearby_coverage(ipeds: pd.DataFrame, lookup: pd.DataFrame, centroids: pd.DataFrame,
+                    radius_miles: float = NEARBY_RADIUS_MILES) -> pd.DataFrame:
+    """
+    Spatial coverage per campus from a grid index over county centroids (geo_index.py):
+      - nearest_county_fips / nearest_county_miles
+      - nearby_county_count and area-weighted nearby_* coverage over every
+        county whose centroid is within radius_miles of campus
+    """
+    index = GeoIndex(centroids["latitude"], centroids["longitude"])
+    lat = pd.to_numeric(ipeds["latitude"], errors="coerce").to_numpy(dtype="float64")
+    lon = pd.to_numeric(ipeds["longitude"], errors="coerce").to_numpy(dtype="float64")
+    fips = centroids.index.to_numpy()
+    n = len(ipeds)
+
+    out = pd.DataFrame(index=ipeds.index)
+    nearest, miles = index.nearest(lat, lon)
+    out["nearest_county_fips"] = pd.array(np.where(nearest >= 0, fips[nearest], None), dtype="string")
+    out["nearest_county_miles"] = miles
+
+    q, p, _ = index.within(lat, lon, radius_miles)
+    metrics = lookup.reindex(fips)
+    area = metrics["total_area"].to_numpy(dtype="float64")[p]
+    weight = np.bincount(q, weights=area, minlength=n)
+    out["nearby_county_count"] = np.bincount(q, minlength=n)
+    for col in COVERAGE_COLS:
+        values = metrics[col].to_numpy(dtype="float64")[p]
+        total = np.bincount(q, weights=area * values, minlength=n)
+        out[f"nearby_{col}"] = np.divide(total, weight, out=np.full(n, np.nan), where=weight > 0)
+    return out
+
+
+def institution_mobile_coverage(ipeds: pd.DataFrame, lookup: pd.DataFrame,
+                                centroids: Optional[pd.DataFrame] = None,
+                                radius_miles: float = NEARBY_RADIUS_MILES) -> pd.DataFrame:
+    """
+    Coverage per institution: an indexed lookup on county_fips. Where the
+    county is unknown (missing / suppressed FIPS, re-drawn county
+    equivalents) it falls back to the nearest same-state county centroid
+    within radius_miles (given centroids and campus coordinates), then to the
+    area-weighted mean of the state's counties. With centroids the
+    nearby_coverage() columns are added.
+    """
+    if "county_fips" in ipeds.columns:
+        fips = ipeds["county_fips"].astype("string").str.zfill(5)
+    else:
+        fips = pd.Series(pd.NA, index=ipeds.index, dtype="string")
+    by_county = lookup[COVERAGE_COLS].reindex(fips.to_numpy()).set_axis(ipeds.index)
+
+    area = lookup["total_area"]
+    by_state = (
+        lookup[COVERAGE_COLS].mul(area, axis=0).groupby(lookup["state_abbr"]).sum()
+        .div(area.groupby(lookup["state_abbr"]).sum(), axis=0)
+        .reindex(ipeds["state_abbr"].to_numpy()).set_axis(ipeds.index)
+    )
+    level = by_county["coverage_mobile_score"].notna().map({True: "county", False: "state"})
+
+    geo = None
+    if centroids is not None and len(centroids) and {"latitude", "longitude"} <= set(ipeds.columns):
+        geo = nearby_coverage(ipeds, lookup, centroids, radius_miles)
+        nearest_state = lookup["state_abbr"].reindex(geo["nearest_county_fips"].to_numpy()).to_numpy()
+        near = (geo["nearest_county_miles"] <= radius_miles) & (nearest_state == ipeds["state_abbr"].to_numpy())
+        by_nearest = lookup[COVERAGE_COLS].reindex(geo["nearest_county_fips"].where(near).to_numpy())
+        use_nearest = (level == "state") & near
+        by_county = by_county.fillna(by_nearest.set_axis(ipeds.index))
+        level = level.mask(use_nearest, "nearest")
+    coverage = by_county.fillna(by_state)
+
+    out = pd.DataFrame({
+        "unitid": ipeds["unitid"],
+        "county_fips": fips,
+        "state_abbr": ipeds["state_abbr"],
+    })
+    out[COVERAGE_COLS] = coverage
+    out["coverage_level"] = level.where(out["coverage_mobile_score"].notna())
+    if geo is not None:
+        out = pd.concat([out, geo], axis=1)
+    return out
+
+
+def build_institution_coverage() -> Optional[str]:
+    """IPEDS institutions × county coverage lookup → processed/institution_mobile_coverage.csv."""
+    ipeds_path = os.path.join(PROCESSED_DIR, "ipeds_institution_demographics.csv")
+    if not (os.path.exists(ipeds_path) and os.path.exists(FCC_COUNTY_CSV)):
+        print("[WARN] IPEDS demographics or FCC county coverage missing. Skip.")
+        return None
+
+    ipeds = pd.read_csv(ipeds_path, dtype={"county_fips": str},
+                        usecols=lambda c: c in ("unitid", "state_abbr", "county_fips", "latitude", "longitude"))
+    lookup = load_fcc_county_lookup()
+    out = institution_mobile_coverage(ipeds, lookup, load_county_centroids(lookup, ipeds))
+    out.to_csv(INSTITUTION_COVERAGE_CSV, index=False)
+
+    levels = out["coverage_level"].value_counts()
+    print(f"[OK] Saved institution coverage (county: {levels.get('county', 0):,}, "
+          f"nearest county: {levels.get('nearest', 0):,}, "
+          f"state fallback: {levels.get('state', 0):,}) → {INSTITUTION_COVERAGE_CSV}")
+    return INSTITUTION_COVERAGE_CSV
+
+
 # ============================================================
 # EADA PIPELINE
 # ============================================================
 
+def _eada_column_groups(columns: List[str]) -> Dict[str, Any]:
+    """
+    Single pass over the EADA columns: money columns to coerce to numeric,
+    the column lists summed into totals, and the sport revenue columns.
+    """
+    groups: Dict[str, Any] = {
+        "numeric": [], "revenue": [], "expense": [], "coach": [], "recruit": [],
+        "football_rev": None, "mbb_rev": None, "wbb_rev": None, "softball_rev": None,
+    }
+    sport_cols = {
+        "football_rev": "total_revenue_all_football",
+        "mbb_rev": "total_revenue_all_bskball",
+        "wbb_rev": "total_revenue_all_wbskball",
+        "softball_rev": "total_revenue_all_softball",
+    }
+    for c in columns:
+        if not any(k in c for k in ("revenue", "expense", "salary", "recruit")):
+            continue
+        groups["numeric"].append(c)
+        if c.startswith("total_revenue_all_"):
+            groups["revenue"].append(c)
+        if c.startswith("total_expense_all_"):
+            groups["expense"].append(c)
+        if "hdcoach_salary" in c:
+            groups["coach"].append(c)
+        if "recruitexp" in c:
+            groups["recruit"].append(c)
+        for name, prefix in sport_cols.items():
+            if groups[name] is None and prefix in c:
+                groups[name] = c
+    return groups
+
+
 def process_eada_raw() -> Optional[str]:
     """
     Processes wide-format EADA_2024.csv into robust athletics summary.
@@ -343,13 +643,13 @@ def process_eada_raw() -> Optional[str]:
       - expense_per_athlete
       - recruiting_intensity
     """
-    in_path = os.path.join(RAW_DIR, "eada_2024.csv")
+    in_path = EADA.path
     if not os.path.exists(in_path):
         print("[INFO] EADA_2024.csv missing.")
         return None
 
-    df = pd.read_csv(in_path)
-    df.columns = [c.lower().strip() for c in df.columns]
+    # Identity, enrollment and money columns only (see raw_schemas.py)
+    df = read_raw(EADA, in_path)
 
     unit = "unitid" if "unitid" in df.columns else None
     inst = next((c for c in ["institution_name", "inst_name", "school_name"] if c in df.columns), None)
@@ -359,75 +659,60 @@ def process_eada_raw() -> Optional[str]:
         print("[WARN] EADA missing identity fields. Columns:", df.columns.tolist())
         return None
 
-    # Numeric columns (revenue/expense/salary/recruit)
-    numeric_cols = [c for c in df.columns if any(k in c for k in ["revenue", "expense", "salary", "recruit"])]
-    df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce").fillna(0)
+    # Classify columns once; derived metrics are built from the numeric block
+    groups = _eada_column_groups(df.columns)
+    num = df[groups["numeric"]]
+    non_numeric = [c for c in num.columns if not pd.api.types.is_numeric_dtype(num[c])]
+    if non_numeric:
+        num = num.assign(**{c: pd.to_numeric(num[c], errors="coerce") for c in non_numeric})
+    num = num.fillna(0)
 
     # Aggregate total revenue / expense
-    rev_cols = [c for c in df.columns if c.startswith("total_revenue_all_")]
-    exp_cols = [c for c in df.columns if c.startswith("total_expense_all_")]
+    total_rev = num[groups["revenue"]].sum(axis=1)
+    total_exp = num[groups["expense"]].sum(axis=1)
+    rev_denom = total_rev.replace(0, pd.NA)
+    net_margin = total_rev - total_exp
 
-    df["total_revenue_all_sports"] = df[rev_cols].sum(axis=1)
-    df["total_expense_all_sports"] = df[exp_cols].sum(axis=1)
-    df["net_athletics_margin"] = df["total_revenue_all_sports"] - df["total_expense_all_sports"]
-    df["athletics_margin_pct"] = df["net_athletics_margin"] / df["total_revenue_all_sports"].replace(0, pd.NA)
+    # Sport revenue columns (first match in column order)
+    football_rev = groups["football_rev"]
+    mbb_rev = groups["mbb_rev"]
+    wbb_rev = groups["wbb_rev"] or groups["softball_rev"]
 
-    # Helper to find sport revenue columns
-    def find_col(prefix: str) -> Optional[str]:
-        return next((c for c in df.columns if prefix in c), None)
-
-    football_rev = find_col("total_revenue_all_football")
-    mbb_rev = find_col("total_revenue_all_bskball")
-    wbb_rev = find_col("total_revenue_all_wbskball") or find_col("total_revenue_all_softball")
-
-    df["football_revenue_share"] = df[football_rev] / df["total_revenue_all_sports"] if football_rev else 0
-    df["mbb_revenue_share"] = df[mbb_rev] / df["total_revenue_all_sports"] if mbb_rev else 0
-    df["wbb_revenue_share"] = df[wbb_rev] / df["total_revenue_all_sports"] if wbb_rev else 0
-
-    # Non-revenue sports ratio
-    df["non_revenue_sports_ratio"] = (
-        df["total_revenue_all_sports"] -
-        df[[c for c in [football_rev, mbb_rev] if c]].sum(axis=1)
-    ) / df["total_revenue_all_sports"].replace(0, pd.NA)
-
-    # Coach + recruiting
-    df["head_coach_salary_total"] = df[[c for c in df.columns if "hdcoach_salary" in c]].sum(axis=1)
-    df["recruiting_budget_total"] = df[[c for c in df.columns if "recruitexp" in c]].sum(axis=1)
+    def share(col: Optional[str]):
+        return num[col] / total_rev if col else 0
 
     # Per-athlete economics
     athlete_col = next((c for c in ["eftotalcount", "total_athletes"] if c in df.columns), None)
-    if athlete_col:
-        denom = df[athlete_col].replace(0, pd.NA)
-        df["revenue_per_athlete"] = df["total_revenue_all_sports"] / denom
-        df["expense_per_athlete"] = df["total_expense_all_sports"] / denom
-        df["recruiting_intensity"] = df["recruiting_budget_total"] / denom
-    else:
-        df["revenue_per_athlete"] = pd.NA
-        df["expense_per_athlete"] = pd.NA
-        df["recruiting_intensity"] = pd.NA
+    denom = df[athlete_col].replace(0, pd.NA) if athlete_col else None
+    recruiting_total = num[groups["recruit"]].sum(axis=1)
+
+    derived = {
+        "total_revenue_all_sports": total_rev,
+        "total_expense_all_sports": total_exp,
+        "net_athletics_margin": net_margin,
+        "athletics_margin_pct": net_margin / rev_denom,
+        "football_revenue_share": share(football_rev),
+        "mbb_revenue_share": share(mbb_rev),
+        "wbb_revenue_share": share(wbb_rev),
+        # Non-revenue sports ratio
+        "non_revenue_sports_ratio": (
+            total_rev - num[[c for c in [football_rev, mbb_rev] if c]].sum(axis=1)
+        ) / rev_denom,
+        # Coach + recruiting
+        "head_coach_salary_total": num[groups["coach"]].sum(axis=1),
+        "recruiting_budget_total": recruiting_total,
+        "revenue_per_athlete": total_rev / denom if athlete_col else pd.NA,
+        "expense_per_athlete": total_exp / denom if athlete_col else pd.NA,
+        "recruiting_intensity": recruiting_total / denom if athlete_col else pd.NA,
+    }
 
     # Normalize identity columns
-    df = df.rename(columns={unit: "unitid", inst: "school_name", state: "state_abbr"})
-    df["state_abbr"] = df["state_abbr"].astype(str).str.upper().str.strip()
-
-    # Guarantee school_name column exists
-    if "school_name" not in df.columns:
-        name_candidate = next((c for c in df.columns if "name" in c), None)
-        if name_candidate:
-            df["school_name"] = df[name_candidate]
-        else:
-            df["school_name"] = pd.NA
-
-    out_cols = [
-        "unitid", "school_name", "state_abbr",
-        "total_revenue_all_sports", "total_expense_all_sports",
-        "net_athletics_margin", "athletics_margin_pct",
-        "football_revenue_share", "mbb_revenue_share", "wbb_revenue_share",
-        "non_revenue_sports_ratio",
-        "head_coach_salary_total", "recruiting_budget_total",
-        "revenue_per_athlete", "expense_per_athlete", "recruiting_intensity"
-    ]
-    out = df[out_cols]
+    out = pd.DataFrame({
+        "unitid": df[unit],
+        "school_name": df[inst],
+        "state_abbr": df[state].astype(str).str.upper().str.strip(),
+    })
+    out = out.assign(**derived)
 
     out_path = os.path.join(PROCESSED_DIR, "eada_athletics_by_school.csv")
     out.to_csv(out_path, index=False)
@@ -444,20 +729,20 @@ def test_joins() -> None:
     """Validate IPEDS + EADA + FCC merges cleanly and show basic diagnostics."""
     ipeds_path = os.path.join(PROCESSED_DIR, "ipeds_institution_demographics.csv")
     eada_path = os.path.join(PROCESSED_DIR, "eada_athletics_by_school.csv")
-    fcc_path = os.path.join(PROCESSED_DIR, "fcc_mobile_coverage_by_area.csv")
+    fcc_path = FCC_COUNTY_CSV
 
     if not (os.path.exists(ipeds_path) and os.path.exists(eada_path) and os.path.exists(fcc_path)):
         print("[WARN] One or more processed files missing. Skipping join tests.")
         return
 
-    ipeds = pd.read_csv(ipeds_path)
+    ipeds = pd.read_csv(ipeds_path, dtype={"county_fips": str})
     eada = pd.read_csv(eada_path)
-    fcc = pd.read_csv(fcc_path)
+    fcc = load_fcc_county_lookup(fcc_path)
 
     print("\n--- JOIN TESTS ---")
     print("IPEDS shape:", ipeds.shape)
     print("EADA  shape:", eada.shape)
-    print("FCC   shape:", fcc.shape)
+    print("FCC   shape:", fcc.shape, "(counties)")
 
     # IPEDS × EADA on unitid → expect school_name_x (IPEDS) + school_name_y (EADA)
     j1 = ipeds.merge(eada, on="unitid", how="left", suffixes=("_ipeds", "_eada"))
@@ -470,33 +755,19 @@ def test_joins() -> None:
     else:
         print("EADA match rate: could not find school_name_eada column")
 
-    # IPEDS × FCC on state_abbr
+    # IPEDS × FCC: indexed lookup on county_fips (state fallback for unknown counties)
     if "state_abbr" not in ipeds.columns:
         print("[WARN] IPEDS missing state_abbr; cannot join to FCC.")
         return
 
-    j2 = ipeds.merge(fcc, on="state_abbr", how="left")
+    j2 = institution_mobile_coverage(ipeds, fcc)
     print("IPEDS × FCC shape:", j2.shape)
-    fcc_match_rate = j2["coverage_mobile_score"].notna().mean()
-    print(f"FCC coverage match rate (by state): {fcc_match_rate:.3f}")
-
-    # Unified: IPEDS × EADA × FCC
-    # j1 has state_abbr_ipeds / state_abbr_eada? Let's inspect:
-    state_cols = [c for c in j1.columns if "state_abbr" in c.lower()]
-    print("State columns in IPEDS×EADA:", state_cols)
-
-    # Prefer IPEDS state_abbr if available
-    left_state_col = None
-    for cand in ["state_abbr_ipeds", "state_abbr"]:
-        if cand in j1.columns:
-            left_state_col = cand
-            break
-
-    if left_state_col is None:
-        print("[WARN] No state_abbr column in IPEDS×EADA join; skipping unified join.")
-        return
+    print(f"FCC coverage match rate (by county): {(j2['coverage_level'] == 'county').mean():.3f}")
+    print(f"FCC coverage match rate (county or state fallback): {j2['coverage_mobile_score'].notna().mean():.3f}")
 
-    j3 = j1.merge(fcc, left_on=left_state_col, right_on="state_abbr", how="left")
+    # Unified: IPEDS × EADA × FCC (coverage keyed by unitid)
+    coverage = j2.drop_duplicates(subset="unitid").set_index("unitid")[COVERAGE_COLS + ["coverage_level"]]
+    j3 = j1.join(coverage, on="unitid")
     print("Unified dataset shape (IPEDS × EADA × FCC):", j3.shape)
     unified_fcc_match = j3["coverage_mobile_score"].notna().mean()
     print(f"Unified FCC match rate: {unified_fcc_match:.3f}")
@@ -509,30 +780,67 @@ def test_joins() -> None:
 # MAIN DRIVER
 # ============================================================
 
-def main() -> None:
-    ensure_dirs()
-
-    print("\n=== STEP 1: IPEDS ===")
-    ipeds_path = build_ipeds_institution_demographics(IPEDS_YEAR)
-
-    print("\n=== STEP 2: NIL ===")
-    nil_path = process_nil_raw()
+def build_stages(years: List[int]) -> List[Stage]:
+    """ETL stages with their declared inputs / outputs (see build_graph.py)."""
+    raw_dirs = [IPEDS_DIRECTORY.path_for(year=y) for y in years]
+    ipeds_csv = os.path.join(PROCESSED_DIR, "ipeds_institution_demographics.csv")
+    eada_csv = os.path.join(PROCESSED_DIR, "eada_athletics_by_school.csv")
+    fcc_csv = os.path.join(PROCESSED_DIR, "fcc_mobile_coverage_by_area.csv")
+    nil_csv = os.path.join(PROCESSED_DIR, "nil_state_level.csv")
+    ipeds_code = [transform_ipeds_directory, read_raw, IPEDS_DIRECTORY]
+
+    stages = [
+        # Downloads every year and builds its partition in the same worker
+        # (the raw directories are inputs too, so replacing one re-runs it)
+        Stage("ipeds_store", partial(build_ipeds_store, years),
+              inputs=raw_dirs, outputs=raw_dirs + [IPEDS_STORE_DIR],
+              code=ipeds_code + [build_ipeds_year_partition, conform_ipeds_schema, IPEDS_SCHEMA,
+                                 download_ipeds_directory, fetch_urban_endpoint]),
+        Stage("ipeds", partial(build_ipeds_institution_demographics, years[-1]),
+              inputs=raw_dirs[-1:], outputs=[ipeds_csv], code=ipeds_code),
+        Stage("nil", process_nil_raw,
+              inputs=[os.path.join(RAW_DIR, "nil_state_export.csv")], outputs=[nil_csv]),
+        Stage("eada", process_eada_raw,
+              inputs=[EADA.path], outputs=[eada_csv], code=[_eada_column_groups, read_raw, EADA]),
+        Stage("fcc", process_fcc_mobile_raw,
+              inputs=[FCC_MOBILE.path], outputs=[fcc_csv], code=[STATE_MAP, read_raw, FCC_MOBILE]),
+        Stage("fcc_county", process_fcc_county_raw,
+              inputs=[FCC_MOBILE.path], outputs=[FCC_COUNTY_CSV], code=[read_raw, FCC_MOBILE]),
+        Stage("institution_coverage", build_institution_coverage,
+              inputs=[ipeds_csv, FCC_COUNTY_CSV, COUNTY_GAZETTEER], outputs=[INSTITUTION_COVERAGE_CSV],
+              code=[institution_mobile_coverage, load_fcc_county_lookup, load_county_centroids,
+                    nearby_coverage, GeoIndex, COVERAGE_COLS, NEARBY_RADIUS_MILES]),
+        Stage("join_validation", test_joins, inputs=[ipeds_csv, eada_csv, FCC_COUNTY_CSV],
+              code=[institution_mobile_coverage, load_fcc_county_lookup]),
+        # Deal / athlete CSVs come from nils_extract_deals.py / dedupe_nil_deals.py
+        Stage("nil_store", build_store,
+              inputs=[DEALS_CSV, ATHLETE_CSV], outputs=[DEALS_STORE, ATHLETE_STORE],
+              code=[apply_store_types, write_store, CATEGORICAL_COLS, DATETIME_COLS]),
+    ]
+    return stages
 
-    print("\n=== STEP 3: EADA ===")
-    eada_path = process_eada_raw()
 
-    print("\n=== STEP 4: FCC Mobile ===")
-    fcc_path = process_fcc_mobile_raw()
+def main(years: Optional[List[int]] = None, force: bool = False) -> None:
+    ensure_dirs()
+    years = years or parse_years(IPEDS_YEARS)
 
-    print("\n=== JOIN VALIDATION ===")
-    test_joins()
+    # Stages are skipped when their code and input contents are unchanged;
+    # IPEDS / NIL / EADA / FCC have no dependencies on each other and run in parallel.
+    t0 = time.perf_counter()
+    stages = build_stages(years)
+    status = BuildGraph(stages, BUILD_STATE).run(force=force)
 
     print("\n=== SUMMARY ===")
-    print("IPEDS →", ipeds_path)
-    print("NIL   →", nil_path)
-    print("EADA  →", eada_path)
-    print("FCC   →", fcc_path)
+    for stage in stages:
+        outputs = ", ".join(o for o in stage.outputs if os.path.exists(o)) or "-"
+        print(f"{stage.name:<16} {status[stage.name]:<8} → {outputs}")
+    print(f"[DONE] {time.perf_counter() - t0:.2f}s")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="College / NIL / mobile ETL")
+    parser.add_argument("--years", default=IPEDS_YEARS,
+                        help='IPEDS directory years, e.g. "2018-2022" or "2019,2021" (default: %(default)s)')
+    parser.add_argument("--force", action="store_true", help="Re-run every stage, ignoring the build state")
+    args = parser.parse_args()
+    main(parse_years(args.years), force=args.force)
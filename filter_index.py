@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+filter_index.py
+===========================================
+Inverted row index for the dashboard's school / sport / year filters.
+
+Filtering with repeated `isin` / `dt.year.between` scans every row of every
+filtered column on every interaction. FilterIndex precomputes, once per
+loaded frame, a sorted array of row positions for each distinct value of
+each filter column (a posting list). A filter combination then becomes:
+
+  - union of the posting lists of the selected values, per column
+  - intersection across columns, smallest first
+
+so the cost scales with the number of matching rows, not the frame size.
+The result is a sorted position array usable with DataFrame.iloc, which
+keeps the original row order.
+"""
+
+from typing import Dict, Iterable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    """Posting lists {column: {value: sorted row positions}} over one frame."""
+
+    def __init__(self, frame: pd.DataFrame, columns: Mapping[str, pd.Series]):
+        """
+        `columns` maps an index name to a Series aligned with `frame`
+        (e.g. {"school": df["team_committed"], "year": df["deal_date"].dt.year}).
+        """
+        self.n_rows = len(frame)
+        self.postings: Dict[str, Dict[object, np.ndarray]] = {}
+        self.has_nulls: Dict[str, bool] = {}
+        for name, values in columns.items():
+            grouped = pd.Series(np.arange(self.n_rows), index=values.to_numpy()).groupby(level=0, sort=False)
+            self.postings[name] = {k: v.to_numpy() for k, v in grouped}
+            self.has_nulls[name] = sum(map(len, self.postings[name].values())) < self.n_rows
+
+    @classmethod
+    def for_columns(cls, frame: pd.DataFrame, **columns: str) -> "FilterIndex":
+        """FilterIndex.for_columns(df, school="team_committed", sport="sport_name")."""
+        return cls(frame, {name: frame[col] for name, col in columns.items()})
+
+    def _union(self, name: str, selected: Iterable) -> Optional[np.ndarray]:
+        """Rows matching any selected value; None when the selection covers every row."""
+        postings = self.postings[name]
+        selected = set(selected)
+        if not self.has_nulls[name] and selected >= postings.keys():
+            return None
+        parts = [postings[v] for v in selected if v in postings]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts))
+
+    def rows(self, **selections: Optional[Iterable]) -> Optional[np.ndarray]:
+        """
+        Sorted row positions matching every non-empty selection, or None
+        when nothing actually restricts the frame (caller can skip iloc).
+        """
+        matches = []
+        for name, selected in selections.items():
+            if not selected:
+                continue
+            rows = self._union(name, selected)
+            if rows is not None:
+                matches.append(rows)
+
+        if not matches:
+            return None
+        matches.sort(key=len)
+        result = matches[0]
+        for other in matches[1:]:
+            result = np.intersect1d(result, other, assume_unique=True)
+            if not len(result):
+                break
+        return result
+
+    def select(self, frame: pd.DataFrame, **selections: Optional[Iterable]) -> pd.DataFrame:
+        rows = self.rows(**selections)
+        return frame if rows is None else frame.iloc[rows]
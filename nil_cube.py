@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+nil_cube.py
+===========================================
+Pre-aggregated NIL deal cube for the dashboard.
+
+Every dashboard panel is driven by the same three filters (school, sport,
+year range). Instead of scanning deal-level rows per interaction, this
+stage rolls deals up once to (team_committed, sport_name, deal_month) grain:
+
+  - deal_rows            rows in the cell
+  - deal_key_count       non-null deal_key values
+  - deal_key_distinct    distinct deal_key values
+  - disclosed_count      deals with a disclosed deal_amount
+  - disclosed_sum        sum of disclosed deal_amount
+  - athletes             sorted distinct player_keys in the cell
+  - disclosed_athletes   sorted distinct player_keys with a disclosed deal
+  - athletes_hll / disclosed_athletes_hll
+                         sparse HyperLogLog sketches of the same keys
+                         (see nil_sketch.py)
+
+Counts and sums are additive across cells. deal_key_distinct is additive
+because each deal belongs to exactly one (school, sport, month) cell.
+Distinct athletes are not additive: queries merge the per-cell sketches
+(mode="sketch"), union the exact key arrays (mode="exact"), or pick per
+query by size (mode="auto", see nil_sketch.distinct_count).
+
+Input:
+  data/processed/store/deals.parquet  (or the CSV fallback, via nil_store)
+
+Output:
+  data/processed/store/nil_cube.parquet
+
+Run after nil_store.py:
+  python nil_cube.py
+"""
+
+import os
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from nil_sketch import encode_keys, distinct_count
+from nil_store import STORE_DIR, fill_category, load_deals
+
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+CUBE_STORE = os.path.join(STORE_DIR, "nil_cube.parquet")
+
+CUBE_KEYS = ["team_committed", "sport_name", "deal_month"]
+CUBE_SOURCE_COLUMNS = ["deal_key", "deal_date", "deal_amount", "player_key", "team_committed", "sport_name"]
+
+
+# ============================================================
+# BUILD
+# ============================================================
+
+def _distinct_key_lists(df: pd.DataFrame, value_col: str, index: pd.Index) -> pd.Series:
+    """Per-cell sorted distinct `value_col` keys, aligned to `index` (empty array where none)."""
+    pairs = (
+        df[CUBE_KEYS + [value_col]]
+        .dropna(subset=[value_col])
+        .drop_duplicates()
+        .sort_values(value_col)
+    )
+    pairs[value_col] = pairs[value_col].astype("int64")
+    lists = pairs.groupby(CUBE_KEYS, observed=True, dropna=False)[value_col].agg(list).reindex(index)
+    return lists.map(lambda v: np.asarray(v if isinstance(v, list) else [], dtype="int64"))
+
+
+def _sketch_lists(df: pd.DataFrame, value_col: str, index: pd.Index) -> pd.Series:
+    """Per-cell sparse HLL sketch of `value_col`, aligned to `index`."""
+    pairs = df[CUBE_KEYS + [value_col]].dropna(subset=[value_col])
+    pairs = pairs[CUBE_KEYS].assign(packed=encode_keys(pairs[value_col].astype("int64")))
+    pairs = pairs.drop_duplicates().sort_values("packed")
+    lists = pairs.groupby(CUBE_KEYS, observed=True, dropna=False)["packed"].agg(list).reindex(index)
+    return lists.map(lambda v: np.asarray(v if isinstance(v, list) else [], dtype="uint32"))
+
+
+def build_cube(deals: pd.DataFrame) -> pd.DataFrame:
+    """Roll deal-level rows up to (team_committed, sport_name, deal_month)."""
+    df = deals[CUBE_SOURCE_COLUMNS].copy()
+    df = df[df["deal_date"].notna()]
+    df["sport_name"] = fill_category(df["sport_name"], "Unknown")
+    df["deal_month"] = df["deal_date"].dt.to_period("M").dt.to_timestamp()
+    df["disclosed"] = df["deal_amount"].notna()
+    df["disclosed_player"] = df["player_key"].where(df["disclosed"])
+
+    grouped = df.groupby(CUBE_KEYS, observed=True, dropna=False, sort=True)
+    cube = grouped.agg(
+        deal_rows=("deal_date", "size"),
+        deal_key_count=("deal_key", "count"),
+        deal_key_distinct=("deal_key", "nunique"),
+        disclosed_count=("disclosed", "sum"),
+        disclosed_sum=("deal_amount", "sum"),
+    )
+    cube["athletes"] = _distinct_key_lists(df, "player_key", cube.index)
+    cube["disclosed_athletes"] = _distinct_key_lists(df, "disclosed_player", cube.index)
+    cube["athletes_hll"] = _sketch_lists(df, "player_key", cube.index)
+    cube["disclosed_athletes_hll"] = _sketch_lists(df, "disclosed_player", cube.index)
+
+    cube = cube.reset_index()
+    for c in ("team_committed", "sport_name"):
+        cube[c] = cube[c].astype("category")
+    return cube
+
+
+def write_cube(cube: pd.DataFrame, path: str = CUBE_STORE) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cube.to_parquet(path, index=False)
+    print(f"[OK] Saved NIL cube ({len(cube):,} cells) → {path}")
+    return path
+
+
+def load_cube(path: str = CUBE_STORE, newer_than: Optional[float] = None) -> Optional[pd.DataFrame]:
+    """The stored cube, or None if it is missing or older than `newer_than` (a deal source mtime)."""
+    built = cube_mtime(path)
+    if built is None:
+        return None
+    if newer_than is not None and built < newer_than:
+        print(f"[WARN] {path} is older than the deal data — ignoring it")
+        return None
+    return pd.read_parquet(path)
+
+
+def cube_mtime(path: str = CUBE_STORE) -> Optional[float]:
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+# ============================================================
+# QUERY
+# ============================================================
+
+def slice_cube(
+    cube: pd.DataFrame,
+    schools: Sequence[str] = (),
+    sports: Sequence[str] = (),
+    years: Tuple[int, int] = (2022, 2025),
+) -> pd.DataFrame:
+    """Cells matching the dashboard filters (empty selection = no filter)."""
+    mask = cube["deal_month"].dt.year.between(years[0], years[1])
+    if schools:
+        mask &= cube["team_committed"].isin(schools)
+    if sports:
+        mask &= cube["sport_name"].isin(sports)
+    return cube[mask]
+
+
+def _athletes(cells: pd.DataFrame, column: str, mode: str) -> int:
+    """Distinct athletes across `cells` from the exact key arrays or their HLL sketches."""
+    sketches = cells[column + "_hll"] if column + "_hll" in cells.columns else None
+    return distinct_count(cells[column], sketches, mode=mode)
+
+
+def cube_kpis(cells: pd.DataFrame, mode: str = "auto") -> Dict[str, float]:
+    """
+    Market Overview KPIs, same keys/semantics as the deal-level computation.
+    `mode` selects how distinct athletes are counted (exact / sketch / auto).
+    """
+    disclosed_count = cells["disclosed_count"].sum()
+    total_deals = cells["deal_key_distinct"].sum()
+    return {
+        "rows": int(cells["deal_rows"].sum()),
+        "schools": cells.loc[cells["deal_rows"] > 0, "team_committed"].nunique(),
+        "total_athletes": _athletes(cells, "athletes", mode),
+        "reported_athletes": _athletes(cells, "disclosed_athletes", mode),
+        "avg_value": cells["disclosed_sum"].sum() / disclosed_count if disclosed_count else np.nan,
+        "share_reported": disclosed_count / total_deals if total_deals else 0,
+    }
+
+
+def cube_time_series(cells: pd.DataFrame) -> pd.DataFrame:
+    return (
+        cells.groupby("deal_month")["deal_rows"].sum()
+        .reset_index(name="deals")
+    )
+
+
+def cube_school_summary(cells: pd.DataFrame, top_n: int = 10, mode: str = "auto") -> pd.DataFrame:
+    summary = (
+        cells.groupby("team_committed", observed=True)["deal_key_count"].sum()
+        .rename("deals")
+        .sort_values(ascending=False)
+        .head(top_n)
+        .to_frame()
+    )
+    # Distinct athletes only for the schools that make the cut
+    by_school = cells[cells["team_committed"].isin(summary.index)].groupby("team_committed", observed=True)
+    summary["athletes"] = [_athletes(by_school.get_group(t), "athletes", mode) for t in summary.index]
+    return summary.reset_index()
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+if __name__ == "__main__":
+    write_cube(build_cube(load_deals(CUBE_SOURCE_COLUMNS)))
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+nil_sketch.py
+===========================================
+Mergeable approximate distinct counts (HyperLogLog) for NIL keys.
+
+Distinct athletes / deals per arbitrary dashboard filter cannot be summed
+across cube cells — the same athlete shows up in many (school, sport,
+month) cells. Exact answers need a union of key sets; a HyperLogLog sketch
+answers the same question from a fixed-size register array and merges
+with an element-wise max, so cost no longer depends on how many keys the
+cells hold.
+
+Sketches are stored *sparse*: one uint32 per distinct
+(register index, rank) pair, packed as (idx << 6) | rank. A cube cell with
+a handful of athletes therefore costs a handful of integers, and merging
+any number of cells is a single scatter-max into 2**p registers.
+
+  encode_keys(keys)          int keys → packed (idx, rank), one per key
+  sketch_keys(keys)          int keys → sparse sketch
+  merge_sketches(sketches)   sparse sketches → dense registers
+  estimate(registers)        registers → cardinality estimate
+  sketch_count(sketches)     merge + estimate, rounded
+  exact_count(key_arrays)    exact union size (fallback mode)
+  distinct_count(...)        pick exact / sketch / auto by mode
+
+With p = 16 the standard error is ~0.4%; below ~160k distinct keys the
+linear-counting branch is used and results are near-exact.
+"""
+
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+P = 16                 # 2**16 registers (64 KiB dense)
+_RANK_BITS = 6         # rank ≤ 64 - P + 1 fits in 6 bits
+_RANK_MASK = (1 << _RANK_BITS) - 1
+
+DISTINCT_MODES = ("exact", "sketch", "auto")
+AUTO_EXACT_LIMIT = 50_000   # "auto": exact union when the cells hold at most this many keys
+
+
+# ============================================================
+# HASHING
+# ============================================================
+
+def hash64(keys: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer over int64 keys → well-mixed uint64."""
+    x = np.asarray(keys, dtype=np.int64).view(np.uint64).copy()
+    with np.errstate(over="ignore"):
+        x += np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+    return x
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length() for uint64 (split in 32-bit halves so float64 is exact)."""
+    hi = (x >> np.uint64(32)).astype(np.float64)
+    lo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1]).astype(np.uint32)
+
+
+# ============================================================
+# SKETCH
+# ============================================================
+
+def encode_keys(keys: Iterable[int], p: int = P) -> np.ndarray:
+    """One packed uint32 (register idx << 6 | rank) per key, duplicates kept."""
+    h = hash64(np.asarray(keys, dtype=np.int64))
+    idx = (h >> np.uint64(64 - p)).astype(np.uint32)
+    rest = h & np.uint64((1 << (64 - p)) - 1)
+    rank = (64 - p) - _bit_length(rest) + 1
+    return (idx << _RANK_BITS) | rank.astype(np.uint32)
+
+
+def sketch_keys(keys: Iterable[int], p: int = P) -> np.ndarray:
+    """Sparse sketch: sorted distinct packed (idx, rank) values."""
+    return np.unique(encode_keys(keys, p))
+
+
+def merge_sketches(sketches: Iterable[np.ndarray], p: int = P) -> np.ndarray:
+    """Scatter-max any number of sparse sketches into dense uint8 registers."""
+    registers = np.zeros(1 << p, dtype=np.uint8)
+    parts = [s for s in sketches if len(s)]
+    if parts:
+        packed = np.concatenate(parts).astype(np.uint32, copy=False)
+        np.maximum.at(registers, packed >> _RANK_BITS, (packed & _RANK_MASK).astype(np.uint8))
+    return registers
+
+
+def estimate(registers: np.ndarray) -> float:
+    """HyperLogLog estimate with linear-counting correction for small cardinalities."""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int32)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * m and zeros:
+        return m * np.log(m / zeros)
+    return float(raw)
+
+
+def sketch_count(sketches: Iterable[np.ndarray], p: int = P) -> int:
+    return int(round(estimate(merge_sketches(sketches, p))))
+
+
+# ============================================================
+# EXACT FALLBACK + DISPATCH
+# ============================================================
+
+def exact_count(key_arrays: Iterable[np.ndarray]) -> int:
+    arrays = [a for a in key_arrays if len(a)]
+    if not arrays:
+        return 0
+    return len(np.unique(np.concatenate(arrays)))
+
+
+def distinct_count(
+    key_arrays: Optional[Sequence[np.ndarray]] = None,
+    sketches: Optional[Sequence[np.ndarray]] = None,
+    mode: str = "auto",
+) -> int:
+    """
+    Distinct count over merged cells.
+
+    "exact" unions key_arrays, "sketch" merges sketches, "auto" unions when
+    the cells are small (cheap and exact) and merges sketches otherwise.
+    Falls back to exact when no sketches are given.
+    """
+    if mode not in DISTINCT_MODES:
+        raise ValueError(f"mode must be one of {DISTINCT_MODES}, got {mode!r}")
+    if mode == "auto" and key_arrays is not None:
+        mode = "exact" if sum(map(len, key_arrays)) <= AUTO_EXACT_LIMIT else "sketch"
+    if mode == "sketch" and sketches is not None:
+        return sketch_count(sketches)
+    if key_arrays is None:
+        raise ValueError("exact mode needs key_arrays")
+    return exact_count(key_arrays)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+nil_store.py
+===========================================
+Typed columnar store for the processed NIL tables the dashboard reads.
+
+CSV re-parsing (plus pd.to_datetime on deal_date) on every Streamlit rerun
+is the bulk of the dashboard's load cost. This module converts the
+processed CSVs once into Parquet with:
+  - categorical team_committed, sport_name, company_name, player_state
+  - native timestamp deal_date
+and exposes loaders that read only the requested columns.
+
+Inputs:
+  data/processed/on3_nil_deals_all.csv
+  data/processed/on3_nil_athlete_values.csv
+
+Outputs:
+  data/processed/store/deals.parquet
+  data/processed/store/athlete_values.parquet
+
+Built by etl.py (stage "nil_store") whenever either CSV changes, or by hand
+after nils_extract_deals.py / dedupe_nil_deals.py:
+  python nil_store.py
+"""
+
+import os
+from typing import List, Optional
+
+import pandas as pd
+
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
+STORE_DIR = os.path.join(PROCESSED_DIR, "store")
+
+DEALS_CSV = os.path.join(PROCESSED_DIR, "on3_nil_deals_all.csv")
+ATHLETE_CSV = os.path.join(PROCESSED_DIR, "on3_nil_athlete_values.csv")
+
+DEALS_STORE = os.path.join(STORE_DIR, "deals.parquet")
+ATHLETE_STORE = os.path.join(STORE_DIR, "athlete_values.parquet")
+
+CATEGORICAL_COLS = ["team_committed", "sport_name", "company_name", "player_state"]
+DATETIME_COLS = ["deal_date"]
+
+
+# ============================================================
+# TYPING
+# ============================================================
+
+def apply_store_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the known low-cardinality columns to category and dates to timestamps."""
+    df = df.copy()
+    for c in DATETIME_COLS:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+    for c in CATEGORICAL_COLS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    return df
+
+
+def fill_category(s: pd.Series, value: str) -> pd.Series:
+    """fillna() that also works on categoricals missing `value` as a category."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        if value not in s.cat.categories:
+            s = s.cat.add_categories([value])
+    return s.fillna(value)
+
+
+# ============================================================
+# BUILD
+# ============================================================
+
+def write_store(df: pd.DataFrame, path: str) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    apply_store_types(df).to_parquet(path, index=False)
+    print(f"[OK] Saved columnar store → {path}")
+    return path
+
+
+def build_store() -> None:
+    """Convert the processed CSVs into the Parquet store."""
+    for csv_path, store_path in ((DEALS_CSV, DEALS_STORE), (ATHLETE_CSV, ATHLETE_STORE)):
+        if not os.path.exists(csv_path):
+            print(f"[INFO] {csv_path} missing. Skip.")
+            continue
+        write_store(pd.read_csv(csv_path), store_path)
+
+
+# ============================================================
+# LOAD
+# ============================================================
+
+def _load(store_path: str, csv_path: str, columns: Optional[List[str]]) -> pd.DataFrame:
+    """Projected Parquet read; falls back to the CSV (typed the same way) if no store exists."""
+    if os.path.exists(store_path):
+        return pd.read_parquet(store_path, columns=columns)
+    print(f"[WARN] {store_path} missing — falling back to {csv_path}")
+    return apply_store_types(pd.read_csv(csv_path, usecols=columns))
+
+
+def _source(store_path: str, csv_path: str) -> str:
+    return store_path if os.path.exists(store_path) else csv_path
+
+
+def source_mtimes() -> tuple:
+    """mtimes of the files load_deals() / load_athlete_values() would read — a cheap cache key."""
+    return tuple(
+        os.path.getmtime(p) if os.path.exists(p) else None
+        for p in (_source(DEALS_STORE, DEALS_CSV), _source(ATHLETE_STORE, ATHLETE_CSV))
+    )
+
+
+def load_deals(columns: Optional[List[str]] = None) -> pd.DataFrame:
+    return _load(DEALS_STORE, DEALS_CSV, columns)
+
+
+def load_athlete_values(columns: Optional[List[str]] = None) -> pd.DataFrame:
+    return _load(ATHLETE_STORE, ATHLETE_CSV, columns)
+
+
+if __name__ == "__main__":
+    build_store()
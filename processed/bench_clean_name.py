@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+bench_clean_name.py
+==================================================
+Row-wise .apply(legacy clean_name) vs name_normalize.clean_names over the
+team column of the full deal file and the IPEDS name column. Checks the
+outputs are identical and reports wall time.
+
+Usage:
+  python processed/bench_clean_name.py [deals_csv] [ipeds_csv]
+"""
+
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+from name_normalize import clean_names
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+DEALS_CSV = os.path.join(BASE, "..", "data", "processed", "on3_nil_deals_all.csv")
+IPEDS_CSV = os.path.join(BASE, "..", "data", "processed", "ipeds_institution_demographics.csv")
+
+
+def legacy_clean_name(s: str) -> str:
+    """The eight-re.sub clean_name nil_institution_extract.py used before name_normalize.py."""
+    if pd.isna(s):
+        return ""
+    s = str(s).lower()
+
+    s = re.sub(r"\buniversity\b", "", s)
+    s = re.sub(r"\bcollege\b", "", s)
+    s = re.sub(r"\bthe\b", "", s)
+    s = re.sub(r"\bmen\b|\bwomen\b", "", s)
+    s = re.sub(r"\bfb\b|\bncaa\b", "", s)
+    s = re.sub(r"\bfootball\b", "", s)
+    s = re.sub(r"\bstate university\b", "state", s)
+
+    s = re.sub(r"[^a-z0-9 ]", " ", s)
+    s = re.sub(r"\s+", " ", s)
+
+    return s.strip()
+
+
+def bench(label: str, values: pd.Series) -> None:
+    t0 = time.perf_counter()
+    legacy = values.apply(legacy_clean_name)
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fast = clean_names(values)
+    t_fast = time.perf_counter() - t0
+
+    assert legacy.equals(fast), f"{label}: outputs differ"
+    print(f"{label:<28}{len(values):>10,}{values.nunique():>10,}"
+          f"{t_legacy:>10.2f}{t_fast:>10.3f}{t_legacy / t_fast:>9.0f}×")
+
+
+def main():
+    deals_csv = sys.argv[1] if len(sys.argv) > 1 else DEALS_CSV
+    ipeds_csv = sys.argv[2] if len(sys.argv) > 2 else IPEDS_CSV
+
+    deals = pd.read_csv(deals_csv, usecols=["team_committed"])
+    ipeds = pd.read_csv(ipeds_csv, usecols=["school_name"])
+
+    print(f"{'column':<28}{'rows':>10}{'distinct':>10}{'apply s':>10}{'batch s':>10}{'speedup':>10}")
+    bench("deals.team_committed", deals["team_committed"].astype(str).str.strip())
+    bench("ipeds.school_name", ipeds["school_name"].astype(str))
+
+
+if __name__ == "__main__":
+    main()
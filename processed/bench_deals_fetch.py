@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+bench_deals_fetch.py
+==================================================
+nils_extract_deals.py's concurrent page fetch (fetch_remaining_pages() for
+the default mode, iter_pages() for --stream) against a local stub server
+replaying data/raw/nil_deals.json-shaped pages, one request in flight vs
+MAX_IN_FLIGHT.
+
+The stub serves n_pages pages of 25 deals (the real deals cycled with fresh
+keys, real pagination block), adds a fixed latency per response, answers
+one page with a 500 and another with a 429 the first time each is asked
+for, and records when each request starts and how many are open at once.
+
+Checks, per run:
+  - pages come back in page order and every deal key is present once
+  - the 500 / 429 pages were retried and recovered
+  - requests never exceed the rate limit (beyond the initial burst) or
+    the in-flight limit
+
+Usage:
+  python processed/bench_deals_fetch.py [n_pages] [latency_ms]
+"""
+
+import copy
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import nils_extract_deals
+from fetch_engine import make_session
+from nils_extract_deals import fetch_page, fetch_remaining_pages, iter_pages
+
+RAW_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "raw", "nil_deals.json")
+PAGE_SIZE = 25
+RATE = 15.0       # below what 4 in flight at 100 ms could do, so the bucket binds
+
+
+def deal_pages(n_pages):
+    """{page: body} shaped like the On3 deals API (pagination + list)."""
+    with open(RAW_PAGE, encoding="utf-8") as f:
+        raw = json.load(f)
+    seed = raw["list"]
+    pages = {}
+    for page in range(1, n_pages + 1):
+        items = []
+        for i in range((page - 1) * PAGE_SIZE, page * PAGE_SIZE):
+            d = copy.copy(seed[i % len(seed)])
+            d["key"] = i + 1
+            items.append(d)
+        pagination = dict(raw["pagination"], count=n_pages * PAGE_SIZE, offset=(page - 1) * PAGE_SIZE,
+                          currentPage=page, pageCount=n_pages)
+        pages[page] = json.dumps({"pagination": pagination, "list": items}).encode("utf-8")
+    return pages
+
+
+def start_stub(pages, latency, fail_once):
+    lock = threading.Lock()
+    log = {"starts": [], "open": 0, "max_open": 0, "failed": []}
+    pending_failures = dict(fail_once)   # page → status
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            page = int(parse_qs(urlsplit(self.path).query)["page"][0])
+            with lock:
+                log["starts"].append(time.perf_counter())
+                log["open"] += 1
+                log["max_open"] = max(log["max_open"], log["open"])
+                status = pending_failures.pop(page, None)
+            try:
+                time.sleep(latency)
+                if status is not None:
+                    log["failed"].append((page, status))
+                    self.send_response(status)
+                    if status == 429:
+                        self.send_header("Retry-After", "1")
+                    self.end_headers()
+                    return
+                body = pages.get(page)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with lock:
+                    log["open"] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, log
+
+
+def _fetch_default(session):
+    """What main() does: page 1, then pages 2..N fanned out and re-ordered."""
+    first = fetch_page(1, session)
+    pages, errors = fetch_remaining_pages(first["pagination"]["pageCount"], session)
+    return [first] + list(pages.values()), errors
+
+
+def _fetch_stream(session):
+    return list(iter_pages(session)), {}
+
+
+def _max_in_window(starts, window):
+    """Most request starts inside any `window`-second interval."""
+    best, j = 0, 0
+    for i, t in enumerate(starts):
+        while starts[j] < t - window:
+            j += 1
+        best = max(best, i - j + 1)
+    return best
+
+
+def main():
+    n_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 100.0) / 1000
+    fail_once = {7: 500, 13: 429}
+    pages = deal_pages(n_pages)
+
+    nils_extract_deals.RATE_LIMIT = RATE
+    nils_extract_deals.BACKOFF = 0.05
+    print(f"[BENCH] {n_pages} pages × {PAGE_SIZE} deals, {latency * 1000:.0f} ms latency, "
+          f"rate limit {RATE:.0f}/s, one-off {fail_once}\n")
+
+    sink = open(os.devnull, "w")
+    for label, fetch in (("default", _fetch_default), ("stream", _fetch_stream)):
+        for in_flight in (1, 4):
+            server, log = start_stub(pages, latency, fail_once)
+            nils_extract_deals.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/deals?page={{page}}"
+            nils_extract_deals.MAX_IN_FLIGHT = in_flight
+            stdout, sys.stdout = sys.stdout, sink   # silence per-page [API] lines
+            try:
+                t0 = time.perf_counter()
+                got, errors = fetch(make_session(pool_size=in_flight))
+                elapsed = time.perf_counter() - t0
+            finally:
+                sys.stdout = stdout
+                server.shutdown()
+
+            order = [p["pagination"]["currentPage"] for p in got]
+            keys = [d["key"] for p in got for d in p["list"]]
+            starts = sorted(log["starts"])[1:]   # page 1 is fetched before the bucket exists
+            burst = max(1.0, RATE)
+            print(f"  {label:<8}{in_flight} in flight  {elapsed:6.2f} s  {len(log['starts'])} requests")
+            print(f"    [CHECK] page order: {order == list(range(1, n_pages + 1))}; "
+                  f"all {n_pages * PAGE_SIZE:,} deals once: {sorted(keys) == list(range(1, n_pages * PAGE_SIZE + 1))}; "
+                  f"no failed pages: {not errors}; "
+                  f"retried {sorted(p for p, _ in log['failed'])}: {len(log['starts']) == n_pages + len(fail_once)}; "
+                  f"rate ≤ limit: {_max_in_window(starts, 1.0) <= RATE + burst}; "
+                  f"in flight ≤ {in_flight}: {log['max_open'] <= in_flight}")
+    sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+bench_extract_players.py
+==================================================
+Legacy recursive extract_players() + build-all-then-dedup + json.dump vs
+the iterative walker (scrape_on3_school_nil.iter_players), with and without
+pruning, and the streaming PlayerWriter, on large nested payloads.
+Reports walk time, players found, and time / peak heap of the full
+extract → dedup → write step.
+
+Payloads:
+  wide   Next.js page data (dehydrated react-query state) with n players,
+         each carrying valuation history, images, ratings and stat arrays;
+         every player also appears in a second "trending" list
+  deep   the same players nested one level deeper per player (a chain of
+         depth n), past Python's recursion limit
+
+Usage:
+  python processed/bench_extract_players.py [n_players]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from scrape_on3_school_nil import PlayerWriter, extract_players, iter_players
+
+
+def legacy_extract_players(node):
+    """The recursive walker scrape_on3_school_nil.py used before iter_players()."""
+    players = []
+
+    def walk(x):
+        if isinstance(x, dict):
+            if "valuation" in x and ("fullName" in x or "athlete" in x):
+                players.append(x)
+
+            for v in x.values():
+                walk(v)
+
+        elif isinstance(x, list):
+            for item in x:
+                walk(item)
+
+    walk(node)
+    return players
+
+
+def _timed(fn, repeat: int = 3):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best * 1000
+
+
+def _peak_mb(fn) -> float:
+    """Peak Python heap allocated while fn() runs (payload already built)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def _player(rng: random.Random, i: int) -> dict:
+    return {
+        "id": i,
+        "fullName": f"Player {i}",
+        "valuation": {
+            "value": rng.randint(1_000, 5_000_000),
+            "history": [{"date": f"2024-{m:02d}-01", "value": rng.randint(1_000, 5_000_000)} for m in range(1, 13)],
+        },
+        "image": {"url": f"https://img/{i}.png", "width": 300, "height": 300, "sizes": [64, 128, 256]},
+        "position": {"abbr": "QB", "name": "Quarterback"},
+        "rating": {"stars": 4, "rating": 0.95, "ranks": [rng.randint(1, 500) for _ in range(8)]},
+        "stats": [rng.random() for _ in range(40)],
+        "team": {"name": f"School {i % 130}", "abbr": f"S{i % 130}"},
+    }
+
+
+def wide_payload(n: int) -> dict:
+    rng = random.Random(0)
+    players = [_player(rng, i) for i in range(n)]
+    return {"props": {"pageProps": {"dehydratedState": {"queries": [
+        {"state": {"data": {"list": players, "pagination": {"count": n}}}},
+        {"state": {"data": {"trending": players[::-1]}}},
+    ]}}}}
+
+
+def deep_payload(n: int) -> dict:
+    rng = random.Random(0)
+    root = node = {"list": []}
+    for i in range(n):
+        child = {"list": []}
+        node["list"].extend([_player(rng, i), child])
+        node = child
+    return root
+
+
+def legacy_pipeline(payload, path):
+    all_players = legacy_extract_players(payload)
+    unique = {p.get("id", p.get("fullName", str(i))): p for i, p in enumerate(all_players)}
+    with open(path, "w") as f:
+        json.dump(list(unique.values()), f, indent=2)
+    return len(unique)
+
+
+def streaming_pipeline(payload, path):
+    with PlayerWriter(path) as out:
+        for p in iter_players(payload):
+            out.add(p)
+    return out.written
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    tmp = tempfile.mkdtemp()
+
+    for label, payload in (("wide", wide_payload(n)), ("deep", deep_payload(n))):
+        print(f"[BENCH] {label} payload, {n:,} players\n")
+        print(f"  {'walker':<34}{'ms':>10}{'players':>10}")
+        runs = {
+            "legacy recursive": lambda: len(legacy_extract_players(payload)),
+            "iterative, no pruning": lambda: len(extract_players(payload, prune_keys=())),
+            "iterative, pruned": lambda: len(extract_players(payload)),
+            "iterative, pruned + dedup": lambda: sum(1 for _ in iter_players(payload, seen=set())),
+        }
+        for name, fn in runs.items():
+            try:
+                found, ms = _timed(fn)
+                print(f"  {name:<34}{ms:>10.1f}{found:>10,}")
+            except RecursionError:
+                print(f"  {name:<34}{'RecursionError':>20}")
+
+        print(f"\n  {'extract + dedup + write':<34}{'ms':>10}{'unique':>10}{'peak MB':>10}")
+        for name, fn in (("legacy list → dict → json.dump", legacy_pipeline),
+                         ("streaming PlayerWriter", streaming_pipeline)):
+            path = os.path.join(tmp, f"{label}_{name.split()[0]}.json")
+            try:
+                written, ms = _timed(lambda: fn(payload, path), repeat=1)
+                peak = _peak_mb(lambda: fn(payload, path))
+                print(f"  {name:<34}{ms:>10.1f}{written:>10,}{peak:>10.1f}")
+            except RecursionError:
+                print(f"  {name:<34}{'RecursionError':>20}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+bench_flatten_deal.py
+==================================================
+Peak RSS + wall time: legacy list-of-dicts flatten vs deal_stream batches.
+
+Builds a synthetic corpus by cycling the real deals in
+data/raw/nil_deals.json (with fresh deal keys) into 25-deal pages. Pages
+are generated lazily, so the raw JSON is never all in memory and only the
+flatten/write path is measured. Each path runs in its own process so peak
+RSS is not shared between them.
+
+Usage:
+  python processed/bench_flatten_deal.py [n_deals] [batch_size]
+"""
+
+import copy
+import json
+import multiprocessing as mp
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from nils_extract_deals import flatten_deal
+from deal_stream import stream_deals
+
+RAW_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "raw", "nil_deals.json")
+PAGE_SIZE = 25
+
+
+def synthetic_pages(n_deals: int):
+    with open(RAW_PAGE, encoding="utf-8") as f:
+        seed = json.load(f)["list"]
+    for start in range(0, n_deals, PAGE_SIZE):
+        items = []
+        for i in range(start, min(start + PAGE_SIZE, n_deals)):
+            d = copy.copy(seed[i % len(seed)])
+            d["key"] = i + 1
+            items.append(d)
+        yield {"list": items}
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def _run_legacy(n_deals, out_dir, _batch_size):
+    rows = []
+    for page in synthetic_pages(n_deals):
+        for d in page["list"]:
+            rows.append(flatten_deal(d))
+    df = pd.DataFrame(rows)
+    df.to_parquet(os.path.join(out_dir, "legacy.parquet"), index=False)
+    return len(df)
+
+
+def _run_stream(n_deals, out_dir, batch_size):
+    return stream_deals(synthetic_pages(n_deals), os.path.join(out_dir, "stream.parquet"), batch_size=batch_size)
+
+
+def _worker(name, n_deals, batch_size, out_dir, queue):
+    base = _peak_rss_mb()
+    t0 = time.perf_counter()
+    rows = {"legacy": _run_legacy, "stream": _run_stream}[name](n_deals, out_dir, batch_size)
+    queue.put((name, rows, time.perf_counter() - t0, base, _peak_rss_mb()))
+
+
+def main():
+    n_deals = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+
+    print(f"[BENCH] {n_deals:,} synthetic deals, stream batch size {batch_size:,}\n")
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as out_dir:
+        for name in ("legacy", "stream"):
+            q = ctx.Queue()
+            p = ctx.Process(target=_worker, args=(name, n_deals, batch_size, out_dir, q))
+            p.start()
+            name, rows, wall, base, peak = q.get()
+            p.join()
+            print(f"{name:>7}: rows={rows:,}  wall={wall:6.2f}s  "
+                  f"peak RSS={peak:8.1f} MB  (+{peak - base:.1f} MB over baseline)")
+
+
+if __name__ == "__main__":
+    main()
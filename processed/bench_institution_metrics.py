@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+bench_institution_metrics.py
+==================================================
+Regression check + timing for institution_metrics.aggregate_institutions
+against the groupby.agg + row-wise apply rollup it replaced.
+
+  1. Synthetic check: deals from a deal CSV (team → fake unitid), scaled up
+     by `repeat`; both rollups must produce byte-identical CSV output.
+     Falls back to the committed fixture (fixtures/institution_deals.csv)
+     when the full deal CSV is not present.
+  2. Snapshot check: when the deal CSV and nil_team_to_unitid_mapping.csv
+     that produced data/processed/nil_institution_level.csv are present,
+     the new rollup must reproduce that file byte for byte.
+
+Usage:
+  python processed/bench_institution_metrics.py [deals_csv] [repeat]
+"""
+
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+from institution_metrics import aggregate_institutions
+from money_parse import parse_money_series
+from name_normalize import clean_names
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE, "..", "data", "processed")
+DEALS_CSV = os.path.join(DATA_DIR, "on3_nil_deals_all.csv")
+MAPPING_CSV = os.path.join(DATA_DIR, "nil_team_to_unitid_mapping.csv")
+SNAPSHOT_CSV = os.path.join(DATA_DIR, "nil_institution_level.csv")
+FIXTURE_DEALS_CSV = os.path.join(BASE, "fixtures", "institution_deals.csv")
+
+
+def legacy_rollup(mapped: pd.DataFrame) -> pd.DataFrame:
+    """The rollup nil_institution_extract.py ran before institution_metrics.py."""
+    mapped = mapped.copy()
+    verified_col = next((c for c in ["verified", "verified_flag"] if c in mapped.columns), None)
+    mapped["verified_bool"] = False if verified_col is None else mapped[verified_col].astype(bool)
+    mapped["stars"] = mapped["stars"].fillna(0) if "stars" in mapped.columns else 0
+    mapped["stars_weighted_deal"] = mapped["stars"] * mapped["deal_amount_num"]
+
+    inst_nil = (
+        mapped
+        .groupby("unitid")
+        .agg(
+            nil_deal_count=("deal_key", "count"),
+            nil_total_dollars=("deal_amount_num", "sum"),
+            nil_avg_deal=("deal_amount_num", "mean"),
+            nil_median_deal=("deal_amount_num", "median"),
+            nil_verified_count=("verified_bool", "sum"),
+            nil_distinct_players=("player_key", "nunique"),
+            nil_distinct_companies=("company_key", "nunique"),
+            nil_stars_sum=("stars", "sum"),
+            nil_stars_weighted_total=("stars_weighted_deal", "sum"),
+        )
+        .reset_index()
+    )
+    inst_nil["nil_dollars_per_star"] = inst_nil.apply(
+        lambda r: r["nil_stars_weighted_total"] / r["nil_stars_sum"]
+        if r["nil_stars_sum"] > 0 else 0,
+        axis=1
+    )
+    return inst_nil
+
+
+def _csv(df: pd.DataFrame) -> str:
+    buf = io.StringIO()
+    df.to_csv(buf, index=False)
+    return buf.getvalue()
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def load_deals(path: str) -> pd.DataFrame:
+    nil = pd.read_csv(path)
+    nil.columns = [c.lower().strip() for c in nil.columns]
+    nil["deal_amount_num"] = parse_money_series(nil["deal_amount"], default=0.0)
+    # Missing teams become "nan", which is what astype(str) gave before pandas 3
+    # and the key nil_team_to_unitid_mapping.csv was built with
+    team = nil["team_committed"].astype(object).where(nil["team_committed"].notna(), "nan")
+    nil["team_name_clean"] = clean_names(team.astype(str).str.strip())
+    return nil
+
+
+def map_unitids(nil: pd.DataFrame, mapping_csv: str = MAPPING_CSV) -> pd.DataFrame:
+    """Deals whose team is in the mapping, with an int unitid column (as nil_institution_extract.py)."""
+    # keep_default_na=False: the team "nan" is a real mapping key, not a missing value
+    mapping = pd.read_csv(mapping_csv, keep_default_na=False)
+    mapped = nil.assign(unitid=nil["team_name_clean"].map(dict(zip(mapping["team_name_clean"], mapping["unitid"]))))
+    mapped = mapped.dropna(subset=["unitid"])
+    mapped["unitid"] = mapped["unitid"].astype(int)
+    return mapped
+
+
+def synthetic_check(nil: pd.DataFrame, repeat: int) -> None:
+    deals = pd.concat([nil] * repeat, ignore_index=True)
+    deals["unitid"] = pd.factorize(deals["team_name_clean"])[0] + 100_000
+
+    legacy, t_legacy = _timed(lambda: legacy_rollup(deals))
+    fast, t_fast = _timed(lambda: aggregate_institutions(deals))
+    assert _csv(legacy) == _csv(fast), "synthetic rollup differs from legacy output"
+    print(f"[CHECK] {len(deals):,} deals → {len(fast):,} institutions: identical CSV")
+    print(f"        legacy agg+apply {t_legacy:.2f}s   aggregate_institutions {t_fast:.2f}s "
+          f"({t_legacy / t_fast:.1f}×)")
+
+
+def snapshot_check(nil: pd.DataFrame) -> None:
+    if not (os.path.exists(MAPPING_CSV) and os.path.exists(SNAPSHOT_CSV)):
+        print("[SKIP] mapping / snapshot CSV not found")
+        return
+    mapped = map_unitids(nil)
+
+    with open(SNAPSHOT_CSV, encoding="utf-8") as f:
+        expected = f.read()
+    assert _csv(aggregate_institutions(mapped)) == expected, f"output differs from {SNAPSHOT_CSV}"
+    print(f"[CHECK] reproduces {SNAPSHOT_CSV} exactly")
+
+
+def main():
+    deals_csv = sys.argv[1] if len(sys.argv) > 1 else DEALS_CSV
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    if not os.path.exists(deals_csv):
+        print(f"[INFO] {deals_csv} not found — using {FIXTURE_DEALS_CSV}")
+        deals_csv = FIXTURE_DEALS_CSV
+
+    nil = load_deals(deals_csv)
+    synthetic_check(nil, repeat)
+    if os.path.abspath(deals_csv) == os.path.abspath(DEALS_CSV):
+        snapshot_check(nil)
+
+
+if __name__ == "__main__":
+    main()
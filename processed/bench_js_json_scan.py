@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+bench_js_json_scan.py
+==================================================
+Legacy per-character brace walk + json.loads of every top-level span vs
+js_json_scan.JsonObjectScanner on synthetic minified Next.js chunks.
+
+Chunks are webpack module maps full of JS object literals (bare keys,
+braces inside strings, block comments); some embed player data both as an
+inline JSON literal and as a JSON.parse('...') string. Reports wall time,
+json.loads attempts / failures and players found.
+
+Usage:
+  python processed/bench_js_json_scan.py [n_chunks] [chunk_mb]
+"""
+
+import json
+import random
+import sys
+import time
+
+from js_json_scan import JsonObjectScanner
+from scrape_on3_school_nil import PLAYER_KEYS, extract_players
+
+
+def legacy_extract_json_objects(js_text):
+    """The character loop scrape_on3_school_nil.py used before js_json_scan.py."""
+    objs = []
+    depth = 0
+    start = None
+
+    for i, char in enumerate(js_text):
+        if char == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0 and start is not None:
+                objs.append(js_text[start:i+1])
+                start = None
+
+    return objs
+
+
+def looks_like_player_json(js):
+    """The legacy substring pre-filter applied to every candidate before json.loads."""
+    keys = ["valuation", "athlete", "fullName", "rank", "team", "sport"]
+    return any(k in js for k in keys)
+
+
+def _module(rng: random.Random, i: int) -> str:
+    name = f"m{i}"
+    return (
+        f'{i}:function(e,t,n){{"use strict";/* {{ build {i} }} */'
+        f'var {name}={{a:e.b,c:"{{ {rng.random():.6f} }}",d:[1,2,{{x:"team"}}]}};'
+        f"function f{i}(r){{return r?{{rank:r.rank,sport:'{{}}'}}:null}}"
+        f"t.default={{render:function(){{return{{k:{name},v:`tpl {{${{e}}}}`}}}}}}}}"
+    )
+
+
+def _players(rng: random.Random, n: int, offset: int) -> list:
+    return [
+        {"id": offset + k, "fullName": f"Player {offset + k}", "sport": "Football",
+         "valuation": {"value": rng.randint(1_000, 5_000_000), "rank": k + 1},
+         "team": {"name": f"School {k % 130}", "abbr": "S{}"}}
+        for k in range(n)
+    ]
+
+
+def synthetic_chunk(rng: random.Random, size: int, with_players: bool, idx: int) -> str:
+    parts = [f"(self.webpackChunk_N_E=self.webpackChunk_N_E||[]).push([[{idx}],{{"]
+    length, i = 0, 0
+    inline_at = size // 3 if with_players else -1
+    while length < size:
+        mod = _module(rng, i)
+        if i and length >= inline_at > 0:
+            data = json.dumps({"list": _players(rng, 100, idx * 1000)}, separators=(",", ":"))
+            blob = json.dumps({"list": _players(rng, 100, idx * 1000 + 500)}, separators=(",", ":"))
+            blob = blob.replace("\\", "\\\\").replace("'", "\\'")
+            mod = f"{i}:function(e,t,n){{var d={data};var p=JSON.parse('{blob}');t.a=[d,p]}}"
+            inline_at = -1
+        parts.append(mod + ",")
+        length += len(mod) + 1
+        i += 1
+    parts.append("0:function(){}}]);")
+    return "".join(parts)
+
+
+def legacy(chunks):
+    attempts = failures = players = 0
+    for js in chunks:
+        for cand in legacy_extract_json_objects(js):
+            if not looks_like_player_json(cand):
+                continue
+            attempts += 1
+            try:
+                data = json.loads(cand)
+            except Exception:
+                failures += 1
+                continue
+            players += len(extract_players(data))
+    return attempts, failures, players
+
+
+def scanner(chunks):
+    sc = JsonObjectScanner(PLAYER_KEYS)
+    players = sum(len(extract_players(obj)) for js in chunks for obj in sc.scan(js))
+    return sc.spans_parsed, sc.parse_failures, players
+
+
+def main():
+    n_chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    chunk_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+
+    rng = random.Random(0)
+    chunks = [synthetic_chunk(rng, int(chunk_mb * 1e6), with_players=(i % 4 == 0), idx=i) for i in range(n_chunks)]
+    total_mb = sum(map(len, chunks)) / 1e6
+    print(f"[BENCH] {n_chunks} chunks, {total_mb:.1f} MB, {sum(i % 4 == 0 for i in range(n_chunks))} with player data\n")
+    print(f"{'method':<12}{'seconds':>10}{'ms/MB':>10}{'parses':>10}{'failed':>10}{'players':>10}")
+
+    for label, fn in (("legacy", legacy), ("scanner", scanner)):
+        t0 = time.perf_counter()
+        attempts, failures, players = fn(chunks)
+        elapsed = time.perf_counter() - t0
+        print(f"{label:<12}{elapsed:>10.3f}{elapsed * 1000 / total_mb:>10.1f}{attempts:>10,}{failures:>10,}{players:>10,}")
+
+    # Per-chunk scanner cost: key-free chunks stop at the substring pre-filter
+    sc = JsonObjectScanner(PLAYER_KEYS)
+    print()
+    for with_players in (False, True):
+        sample = [c for i, c in enumerate(chunks) if (i % 4 == 0) == with_players]
+        t0 = time.perf_counter()
+        for js in sample:
+            sc.scan(js)
+        per_chunk = (time.perf_counter() - t0) * 1000 / max(len(sample), 1)
+        print(f"scanner, chunk {'with' if with_players else 'without'} player keys: {per_chunk:.1f} ms / chunk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+bench_money_parse.py
+==================================================
+Row-wise .apply(parse_money) vs money_parse.parse_money_series.
+
+Builds a few million mixed money values ("$50K", "$1,200,000", "2.5M",
+"Undisclosed", NaN, …), parses them both ways, checks the results agree,
+and reports wall time.
+
+Usage:
+  python processed/bench_money_parse.py [n_values]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from money_parse import parse_money_series
+
+
+def legacy_parse_money(v):
+    """The row-wise parser nil_institution_extract.py used before money_parse.py."""
+    if pd.isna(v):
+        return 0.0
+    if isinstance(v, (int, float)):
+        return float(v)
+
+    s = str(v).strip()
+    if not s:
+        return 0.0
+
+    s = s.replace("$", "").replace(",", "").strip().lower()
+
+    if s in {"undisclosed", "n/a", "na", "unknown"}:
+        return 0.0
+
+    if s.endswith("m"):
+        try:
+            return float(s[:-1]) * 1_000_000
+        except ValueError:
+            return 0.0
+    if s.endswith("k"):
+        try:
+            return float(s[:-1]) * 1_000
+        except ValueError:
+            return 0.0
+
+    try:
+        return float(s)
+    except ValueError:
+        return 0.0
+
+
+def synthetic_values(n: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 5_000, n)
+    kind = rng.integers(0, 6, n)
+    values = np.where(kind == 0, [f"${a}K" for a in amounts],
+             np.where(kind == 1, [f"${a / 100:.1f}M" for a in amounts],
+             np.where(kind == 2, [f"${a * 1000:,}" for a in amounts],
+             np.where(kind == 3, "Undisclosed",
+             np.where(kind == 4, [f"{a}k" for a in amounts], "")))))
+    s = pd.Series(values, dtype=object)
+    s[kind == 5] = np.nan
+    return s
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000_000
+    values = synthetic_values(n)
+    print(f"[BENCH] {n:,} values, {values.nunique():,} distinct\n")
+
+    t0 = time.perf_counter()
+    legacy = values.apply(legacy_parse_money)
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fast = parse_money_series(values, default=0.0)
+    t_fast = time.perf_counter() - t0
+
+    assert np.allclose(legacy.to_numpy(), fast.to_numpy(), rtol=0, atol=0), "results differ"
+    print(f".apply(parse_money):  {t_legacy:7.2f}s")
+    print(f"parse_money_series:   {t_fast:7.2f}s   ({t_legacy / t_fast:.0f}× faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+bench_rankings_crawl.py
+==================================================
+End-to-end crawl of the On3 NIL rankings (nils_top100.crawl_rankings)
+against a local stub server, sequential (one in flight, inline parse) vs
+concurrent (pages in flight + parse pool).
+
+The stub serves saved rankings HTML: files named *page_<N>.html in
+fixture_dir (as written by bench_rankings_parse.py), or synthetic pages.
+It 404s past the last page of the default variant, returns an empty page
+past the last page of sport variants, fails one page once with a 500 (to
+exercise retries), and adds a fixed latency per response.
+
+Checks that the crawled rows equal parsing every fixture directly and that
+the incremental team summary equals summarize_by_team() on the player table
+deduplicated by URL (first listing with a team and a value).
+
+Usage:
+  python processed/bench_rankings_crawl.py [fixture_dir] [latency_ms]
+"""
+
+import glob
+import http.server
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+import nils_top100
+from bench_rankings_parse import rankings_page_html
+from fetch_engine import make_session
+from nils_top100 import crawl_rankings, parse_on3_nil_rankings_page, summarize_by_team
+
+SPORT_PAGES = {"football": 6, "basketball": 3}
+
+
+def load_fixtures(fixture_dir):
+    """{page: html} from *page_<N>.html files, or 8 synthetic pages."""
+    pages = {}
+    if fixture_dir:
+        for path in glob.glob(os.path.join(fixture_dir, "*.html")):
+            m = re.search(r"page_(\d+)\.html$", path)
+            if m:
+                with open(path, encoding="utf-8") as f:
+                    pages[int(m.group(1))] = f.read()
+    return pages or {p: rankings_page_html(p, seed=1) for p in range(1, 9)}
+
+
+def start_stub(default_pages, latency):
+    fail_once = {("football", 2)}
+    lock = threading.Lock()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            q = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+            sport, page = q.get("sport", ""), int(q.get("page", 1))
+            time.sleep(latency)
+            with lock:
+                fail = (sport, page) in fail_once
+                fail_once.discard((sport, page))
+            if fail:
+                self.send_response(500)
+                self.end_headers()
+                return
+            if not sport:
+                body = default_pages.get(page)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+            elif page <= SPORT_PAGES.get(sport, 0):
+                body = rankings_page_html(page, seed=1, sport=sport)
+            else:
+                body = "<html><body><main>No players</main></body></html>"
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def expected_rows(default_pages, variants):
+    frames = []
+    for sport, _ in variants:
+        pages = default_pages if not sport else {
+            p: rankings_page_html(p, seed=1, sport=sport) for p in range(1, SPORT_PAGES[sport] + 1)
+        }
+        for page in sorted(pages):
+            frames.append(parse_on3_nil_rankings_page(pages[page]).assign(sport=sport, page=page))
+    return pd.concat(frames)
+
+
+def main():
+    fixture_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 150.0) / 1000
+    default_pages = load_fixtures(fixture_dir)
+    server = start_stub(default_pages, latency)
+    page_url = f"http://127.0.0.1:{server.server_address[1]}/nil/rankings/?sport={{sport}}&year={{year}}&page={{page}}"
+    nils_top100.CRAWL_RATE = 0       # the stub's latency stands in for the network
+    nils_top100.CRAWL_BACKOFF = 0.1
+    variants = [("", ""), ("football", ""), ("basketball", "")]
+    out_dir = tempfile.mkdtemp(prefix="on3_crawl_")
+    n_pages = len(default_pages) + sum(SPORT_PAGES.values())
+    print(f"[BENCH] {n_pages} pages over {len(variants)} variants, {latency * 1000:.0f} ms latency per response\n")
+
+    sink = open(os.devnull, "w")
+    results = {}
+    for label, in_flight, workers in (("sequential", 1, 1), ("concurrent", 4, os.cpu_count() or 1)):
+        nils_top100.CRAWL_IN_FLIGHT = in_flight
+        players_out = os.path.join(out_dir, f"players_{label}.csv")
+        teams_out = os.path.join(out_dir, f"teams_{label}.csv")
+        stdout, sys.stdout = sys.stdout, sink   # silence per-page [HTTP] / [PARSE] lines
+        try:
+            t0 = time.perf_counter()
+            crawl_rankings(variants, make_session(pool_size=in_flight), workers=workers,
+                           players_out=players_out, teams_out=teams_out, page_url=page_url)
+            elapsed = time.perf_counter() - t0
+        finally:
+            sys.stdout = stdout
+        results[label] = (players_out, teams_out)
+        print(f"  {label:<12}{elapsed:8.2f} s   {n_pages / elapsed:6.1f} pages/s   "
+              f"({in_flight} in flight, {workers} parse worker{'s' if workers > 1 else ''})")
+    sink.close()
+    server.shutdown()
+
+    players_out, teams_out = results["concurrent"]
+    players = pd.read_csv(players_out, keep_default_na=False, na_values=[""])
+    players["sport"] = players["sport"].fillna("")
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        exp = expected_rows(default_pages, variants)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    same_rows = sorted(zip(players["sport"], players["page"], players["player_url"])) == \
+        sorted(zip(exp["sport"], exp["page"], exp["player_url"]))
+    teams = pd.read_csv(teams_out)
+    # A player counts once, at their first listing that has a team and a value
+    counted = players.dropna(subset=["team_name", "nil_valuation_dollars"]).drop_duplicates("player_url")
+    try:
+        pd.testing.assert_frame_equal(
+            teams, summarize_by_team(counted).reset_index(drop=True),
+            check_dtype=False,
+        )
+        same_teams = True
+    except AssertionError:
+        same_teams = False
+    # Window size changes the interleaving of variants in the file, not its rows
+    key = ["sport", "page", "rank", "player_url"]
+    sequential = pd.read_csv(results["sequential"][0]).sort_values(key, ignore_index=True)
+    same_runs = sequential.equals(pd.read_csv(players_out).sort_values(key, ignore_index=True))
+    print(f"\n[CHECK] {len(players):,} rows; rows match direct parse: {same_rows}; "
+          f"team summary matches summarize_by_team: {same_teams}; sequential == concurrent: {same_runs}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+bench_rankings_parse.py
+==================================================
+Per-page parse time of nils_top100.parse_on3_nil_rankings_page() with the
+BeautifulSoup (html.parser) and lxml backends on saved rankings HTML, and a
+check that both return the identical DataFrame.
+
+Without arguments, synthetic fixtures shaped like the live page are written
+to a temp directory first: hashed CSS-module class names, React's
+"1<!-- -->. <!-- -->1" rank text, default and team avatars, inline scripts
+containing "$" tokens, header rows without a player link, and a large
+__NEXT_DATA__ payload.
+
+Usage:
+  python processed/bench_rankings_parse.py [page.html ...]
+"""
+
+import html as html_lib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from nils_top100 import PARSERS, parse_on3_nil_rankings_page
+
+TEAMS = ["Texas Longhorns", "Ohio State Buckeyes", "Georgia Bulldogs", "LSU Tigers",
+         "USC Trojans", "Colorado Buffaloes", "Alabama Crimson Tide", "Miami Hurricanes"]
+POSITIONS = ["QB", "WR", "RB", "EDGE", "CB", "OT", "S", "PG", "SF", "C"]
+FIRST = ["Arch", "Shedeur", "Travis", "Jeremiah", "Ja'Marr", "Bronny", "Livvy", "Caleb", "Jalen", "Olivia"]
+LAST = ["Manning", "Sanders", "Hunter", "Smith", "O'Neal", "James", "Dunne", "Williams", "Milroe", "Ruiz"]
+
+
+def _valuation(rng: random.Random) -> str:
+    v = rng.choice([rng.uniform(1.0, 7.0), rng.uniform(100, 999)])
+    return f"${v:.1f}M" if v < 10 else f"${int(v)}K"
+
+
+def _row(rng: random.Random, rank: int) -> str:
+    name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+    slug = name.lower().replace(" ", "-").replace("'", "")
+    team = rng.choice(TEAMS)
+    team_img = "" if rng.random() < 0.05 else f'<img alt="{team} Avatar" src="/t/{rank}.png" width="24">'
+    rank_html = f"{rank}<!-- -->. <!-- -->{rank}" if rng.random() > 0.03 else f"{rank}"
+    return (
+        f'<div class="NilPlayerRankingItem_itemContainer__7Jx2a">'
+        f'<div class="NilPlayerRankingItem_rankContainer__p1ZcX"><span class="MuiTypography-root">{rank_html}</span></div>'
+        f'<div class="NilPlayerRankingItem_avatar__Qk3s"><img alt="Default Avatar" src="/a/{rank}.png"></div>'
+        f'<div class="NilPlayerRankingItem_nameContainer__kL9"><a class="MuiTypography-root NilPlayerRankingItem_name__h1Ks" '
+        f'href="/db/{slug}-{100000 + rank}/">{html_lib.escape(name)}</a>'
+        f'<span class="NilPlayerRankingItem_classYear__x">2025</span> <span>6-{rng.randint(0, 8)} / {rng.randint(170, 320)}</span></div>'
+        f'<div class="NilPlayerRankingItem_position__b2"><span> {rng.choice(POSITIONS)} </span></div>'
+        f'<div class="NilPlayerRankingItem_team__zz">{team_img}'
+        f'<svg viewBox="0 0 24 24"><path d="M12 2L2 7l10 5 10-5-10-5z"></path></svg></div>'
+        f'<script>self.__next_f.push([1,"$L{rank:x}"])</script>'
+        f'<div class="NilPlayerRankingItem_valuation__r4"><p class="MuiTypography-root">NIL Valuation</p>'
+        f'<span class="MuiTypography-root">{_valuation(rng)}</span></div>'
+        f'<div class="NilPlayerRankingItem_followers__aa"><span>{rng.randint(1, 999)}K</span> followers</div>'
+        f"</div>"
+    )
+
+
+def rankings_page_html(page: int = 1, per_page: int = 100, seed: int = 0, sport: str = "football") -> str:
+    """One synthetic rankings page (ranks (page-1)*per_page+1 …)."""
+    rng = random.Random(f"{seed}-{sport}-{page}")
+    start = (page - 1) * per_page + 1
+    rows = "".join(_row(rng, r) for r in range(start, start + per_page))
+    next_data = json.dumps({"props": {"pageProps": {"list": [
+        {"rank": r, "bio": "x" * 2000} for r in range(start, start + per_page)
+    ]}}, "page": "/nil/rankings/player/nil-valuations", "query": {"page": page, "sport": sport}})
+    nav = "".join(f'<li><a href="/nav/{i}/">Link {i}</a></li>' for i in range(150))
+    return (
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\"><title>NIL Valuations</title>"
+        '<script src="/_next/static/chunks/framework-2c79e2a64abdb08b.js" defer></script>'
+        "<style>.NilPlayerRankingItem_itemContainer__7Jx2a{display:flex}</style></head>"
+        f'<body><div id="__next"><header><nav><ul>{nav}</ul></nav></header><main>'
+        '<div class="NilPlayerRankingItem_itemContainer__7Jx2a NilPlayerRankingItem_header__q">'
+        "<span>Rank</span><span>Player</span><span>NIL Value</span></div>"
+        f"{rows}</main><footer>© On3</footer></div>"
+        f'<script id="__NEXT_DATA__" type="application/json">{next_data}</script></body></html>'
+    )
+
+
+def _timed(fn, repeat: int = 5):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best * 1000
+
+
+def main():
+    paths = sys.argv[1:]
+    if not paths:
+        fixture_dir = tempfile.mkdtemp(prefix="on3_rankings_")
+        for page in range(1, 6):
+            path = os.path.join(fixture_dir, f"nil_valuations_page_{page}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(rankings_page_html(page))
+            paths.append(path)
+        print(f"[BENCH] Wrote {len(paths)} synthetic fixtures → {fixture_dir}\n")
+
+    print(f"{'page':<30}{'KB':>8}{'rows':>6}" + "".join(f"{b + ' ms':>12}" for b in PARSERS) + f"{'speedup':>10}{'identical':>11}")
+    totals = dict.fromkeys(PARSERS, 0.0)
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        frames, times = {}, {}
+        sink = open(os.devnull, "w")
+        stdout, sys.stdout = sys.stdout, sink   # silence the parser's [PARSE] lines
+        try:
+            for backend in PARSERS:
+                frames[backend], times[backend] = _timed(lambda: parse_on3_nil_rankings_page(html, backend=backend))
+        finally:
+            sys.stdout = stdout
+            sink.close()
+        for backend, ms in times.items():
+            totals[backend] += ms
+
+        try:
+            pd.testing.assert_frame_equal(frames["bs4"], frames["lxml"])
+            identical = True
+        except AssertionError:
+            identical = False
+        print(f"{os.path.basename(path)[:29]:<30}{len(html) / 1e3:>8.0f}{len(frames['bs4']):>6}"
+              + "".join(f"{times[b]:>12.1f}" for b in PARSERS)
+              + f"{times['bs4'] / times['lxml']:>9.1f}×{str(identical):>11}")
+
+    n = len(paths)
+    print(f"\n{'mean per page':<44}" + "".join(f"{totals[b] / n:>12.1f}" for b in PARSERS))
+
+
+if __name__ == "__main__":
+    main()
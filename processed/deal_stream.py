@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+deal_stream.py
+==================================================
+Streaming flatten → columnar writer for On3 NIL deals.
+
+The legacy path in nils_extract_deals.main() keeps one ~45-key dict per
+deal in a list, then builds a DataFrame from it, so peak memory grows with
+the total deal count (list + dicts + DataFrame all alive at once).
+
+Here pages are flattened by a generator straight into fixed-schema column
+buffers; every `batch_size` rows the buffers become one Arrow RecordBatch
+that is appended to the typed deal store (data/processed/store/deals.parquet,
+same column types as nil_store.py writes) and, optionally, to the CSV, and
+are then cleared. Peak memory is bounded by the batch size, not by the
+number of deals.
+
+Raw API values whose type differs from their column's (e.g. an int
+player_height) are coerced to the column type for the store; values that
+cannot be converted become null.
+
+The CSV is written by pandas from the raw values, like the legacy
+pd.DataFrame(rows).to_csv(), so quoting and True/False are unchanged. One
+difference: pandas infers dtypes per batch, so an integer column with
+missing values only in some batches is written as "123" in the others,
+where the legacy single frame wrote "123.0" throughout.
+
+Requires pyarrow.
+"""
+
+import math
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from nils_extract_deals import flatten_deal
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+
+# ------------------------------------------------------------
+# SCHEMA
+# ------------------------------------------------------------
+# Column order matches flatten_deal() so the CSV is a drop-in replacement.
+# _CAT / _TS columns are the ones nil_store.apply_store_types() makes
+# categorical / timestamp, so the streamed store loads with the same dtypes.
+
+_INT = "int64"
+_FLT = "float64"
+_STR = "string"
+_BOOL = "bool"
+_CAT = "category"
+_TS = "timestamp"
+
+DEAL_COLUMNS = [
+    # Deal
+    ("deal_key", _INT), ("deal_date", _TS), ("deal_amount", _FLT),
+    ("nil_status", _STR), ("verified", _BOOL), ("source_url", _STR), ("type", _STR),
+    # Player
+    ("player_key", _INT), ("first_name", _STR), ("last_name", _STR),
+    ("player_name", _STR), ("player_slug", _STR), ("player_position", _STR),
+    ("player_height", _STR), ("player_weight", _FLT), ("player_class_year", _INT),
+    ("player_division", _STR), ("player_state", _CAT), ("player_hometown", _STR),
+    ("sport_abbr", _STR), ("sport_name", _CAT),
+    # Company
+    ("company_key", _INT), ("company_name", _CAT),
+    # Rating
+    ("rating", _FLT), ("stars", _FLT), ("national_rank", _FLT),
+    ("position_rank", _FLT), ("state_rank", _FLT),
+    # Consensus
+    ("consensus_rating", _FLT), ("consensus_stars", _FLT),
+    ("consensus_national_rank", _FLT), ("consensus_position_rank", _FLT),
+    ("consensus_state_rank", _FLT),
+    # Roster
+    ("roster_rating", _FLT), ("roster_stars", _FLT), ("roster_national_rank", _FLT),
+    # Status / School
+    ("status_type", _STR), ("status_date", _STR), ("team_committed", _CAT),
+    ("team_transferred_from", _STR), ("school_state", _STR),
+    # Article
+    ("headline", _STR), ("article_slug", _STR), ("article_url", _STR), ("article_date", _STR),
+]
+
+
+def arrow_schema():
+    _require_pyarrow()
+    types = {
+        _INT: pa.int64(), _FLT: pa.float64(), _STR: pa.string(), _BOOL: pa.bool_(),
+        _CAT: pa.dictionary(pa.int32(), pa.string()), _TS: pa.timestamp("us"),
+    }
+    return pa.schema([(name, types[t]) for name, t in DEAL_COLUMNS])
+
+
+# ------------------------------------------------------------
+# COERCION (raw API value → column type, None if impossible)
+# ------------------------------------------------------------
+
+def _to_float(v: Any) -> Optional[float]:
+    if v is None or isinstance(v, bool):
+        return None
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(f) else f
+
+
+def _to_int(v: Any) -> Optional[int]:
+    if isinstance(v, bool):
+        return None
+    if isinstance(v, int):
+        return v
+    f = _to_float(v)
+    return int(f) if f is not None and f.is_integer() else None
+
+
+def _to_str(v: Any) -> Optional[str]:
+    if v is None or isinstance(v, str):
+        return v
+    return str(v)
+
+
+def _to_bool(v: Any) -> Optional[bool]:
+    if isinstance(v, bool) or v is None:
+        return v
+    if isinstance(v, (int, float)) and v in (0, 1):
+        return bool(v)
+    if isinstance(v, str) and v.strip().lower() in ("true", "false"):
+        return v.strip().lower() == "true"
+    return None
+
+
+_COERCE: Dict[str, Callable[[Any], Any]] = {
+    _INT: _to_int, _FLT: _to_float, _STR: _to_str, _BOOL: _to_bool, _CAT: _to_str, _TS: _to_str,
+}
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("deal_stream requires pyarrow (pip install pyarrow)")
+
+
+# ------------------------------------------------------------
+# GENERATOR + BUFFERS
+# ------------------------------------------------------------
+
+def iter_flat_deals(pages: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Yield one flattened deal at a time from an iterable of API pages."""
+    for page in pages:
+        for d in page.get("list", []):
+            yield flatten_deal(d)
+
+
+class ColumnBuffer:
+    """Per-column lists of raw values for a fixed schema, emptied on every flush."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.names = schema.names
+        self.kinds = dict(DEAL_COLUMNS)
+        self.cols: Dict[str, List[Any]] = {n: [] for n in self.names}
+        self.size = 0
+
+    def append(self, row: Dict[str, Any]) -> None:
+        for n in self.names:
+            self.cols[n].append(row.get(n))
+        self.size += 1
+
+    def _array(self, field):
+        kind = self.kinds[field.name]
+        values = list(map(_COERCE[kind], self.cols[field.name]))
+        if kind == _TS:
+            # Same parsing as nil_store.apply_store_types()
+            return pa.array(pd.to_datetime(pd.Series(values, dtype=object), errors="coerce")).cast(field.type)
+        if kind == _CAT:
+            return pa.array(values, type=pa.string()).dictionary_encode()
+        return pa.array(values, type=field.type)
+
+    def to_batch(self):
+        """Coerced Arrow batch for the store."""
+        return pa.RecordBatch.from_arrays([self._array(f) for f in self.schema], schema=self.schema)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Raw values as pandas would have typed them in the legacy DataFrame."""
+        return pd.DataFrame(self.cols, columns=self.names)
+
+    def clear(self) -> None:
+        self.cols = {n: [] for n in self.names}
+        self.size = 0
+
+
+# ------------------------------------------------------------
+# WRITER
+# ------------------------------------------------------------
+
+def stream_deals(
+    pages: Iterable[Dict[str, Any]],
+    store_path: str,
+    csv_path: Optional[str] = None,
+    batch_size: int = 50_000,
+) -> int:
+    """
+    Flatten `pages` into the typed Parquet store at `store_path` (and
+    `csv_path` if given) batch by batch. Both are written under temporary
+    names and moved into place only after `pages` is exhausted; if iterating
+    it raises (nils_extract_deals.iter_pages does when a page failed), the
+    previous files are left untouched and the partial output stays in the
+    .tmp files. Returns the number of deals written.
+    """
+    schema = arrow_schema()
+    buf = ColumnBuffer(schema)
+    written = 0
+
+    os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+    store_tmp = store_path + ".tmp"
+    csv_tmp = csv_path + ".tmp" if csv_path else None
+    pq_writer = pq.ParquetWriter(store_tmp, schema)
+
+    def _flush():
+        pq_writer.write_batch(buf.to_batch())
+        if csv_tmp:
+            buf.to_frame().to_csv(csv_tmp, mode="w" if written == 0 else "a", header=written == 0, index=False)
+        n = buf.size
+        buf.clear()
+        return n
+
+    try:
+        for row in iter_flat_deals(pages):
+            buf.append(row)
+            if buf.size >= batch_size:
+                written += _flush()
+        if buf.size or written == 0:
+            written += _flush()
+    finally:
+        pq_writer.close()
+
+    os.replace(store_tmp, store_path)
+    if csv_tmp:
+        os.replace(csv_tmp, csv_path)
+    return written
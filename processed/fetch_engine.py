@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+fetch_engine.py
+==================================================
+Small concurrent HTTP fetch engine shared by the On3 scrapers.
+
+Pieces:
+  - TokenBucket      thread-safe rate limiter (requests / second + burst)
+  - make_session()   requests.Session with a connection pool sized to
+                     the number of in-flight requests
+  - fetch_concurrent() fan a list of keys (pages, URLs, …) out over a
+                     bounded thread pool, yielding results as they land
+  - fetch_ordered()  same, but collected and re-ordered by key
+  - fetch_in_order() streaming variant: yields in key order as soon as the
+                     next key is ready, buffering only out-of-order results
+  - retry_call()     call with exponential backoff on failure
+
+Rate limit and in-flight limit are independent: the bucket caps how often
+a request may *start*, the pool caps how many may be open at once.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# -------------------------------------------------------------------
+# RATE LIMITER
+# -------------------------------------------------------------------
+
+class TokenBucket:
+    """
+    Classic token bucket.
+
+    `rate` tokens are added per second up to `capacity`; acquire() blocks
+    until a token is available. rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# -------------------------------------------------------------------
+# SESSION
+# -------------------------------------------------------------------
+
+def make_session(pool_size: int = 8, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """Session whose connection pool can hold `pool_size` keep-alive sockets per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+# -------------------------------------------------------------------
+# RETRY
+# -------------------------------------------------------------------
+
+def retry_call(fn: Callable[[], Any], retries: int = 3, backoff: float = 1.0) -> Any:
+    """
+    Call fn(), retrying up to `retries` extra times.
+    Sleeps backoff, 2×backoff, 4×backoff, … between attempts; re-raises the last error.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt))
+
+
+# -------------------------------------------------------------------
+# FAN-OUT
+# -------------------------------------------------------------------
+
+def fetch_concurrent(
+    keys: Iterable[Hashable],
+    fetch_fn: Callable[[Hashable], Any],
+    rate: float = 3.0,
+    max_in_flight: int = 4,
+    retries: int = 0,
+    backoff: float = 1.0,
+) -> Iterator[Tuple[Hashable, Any, Optional[Exception]]]:
+    """
+    Run fetch_fn(key) for every key on a bounded thread pool.
+
+    Yields (key, result, error) in completion order; exactly one of
+    result / error is meaningful. A failure on one key never aborts the rest.
+    Every attempt (including retries) takes a token from the bucket.
+    """
+    bucket = TokenBucket(rate)
+
+    def _attempt(key):
+        bucket.acquire()
+        return fetch_fn(key)
+
+    def _task(key):
+        return retry_call(lambda: _attempt(key), retries=retries, backoff=backoff)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+        futures = {pool.submit(_task, k): k for k in keys}
+        for fut in as_completed(futures):
+            key = futures.pop(fut)   # drop our reference so results can be freed once consumed
+            try:
+                yield key, fut.result(), None
+            except Exception as e:
+                yield key, None, e
+
+
+def fetch_in_order(
+    keys: Iterable[Hashable],
+    fetch_fn: Callable[[Hashable], Any],
+    rate: float = 3.0,
+    max_in_flight: int = 4,
+    retries: int = 0,
+    backoff: float = 1.0,
+) -> Iterator[Tuple[Hashable, Any, Optional[Exception]]]:
+    """
+    Like fetch_concurrent(), but yields (key, result, error) in sorted key order.
+    Only results that arrive ahead of the next expected key are held in memory.
+    """
+    order = sorted(keys)
+    pending: Dict[Hashable, Tuple[Any, Optional[Exception]]] = {}
+    i = 0
+    for key, result, err in fetch_concurrent(
+        order, fetch_fn, rate=rate, max_in_flight=max_in_flight, retries=retries, backoff=backoff
+    ):
+        pending[key] = (result, err)
+        while i < len(order) and order[i] in pending:
+            result, err = pending.pop(order[i])
+            yield order[i], result, err
+            i += 1
+
+
+def fetch_ordered(
+    keys: Iterable[Hashable],
+    fetch_fn: Callable[[Hashable], Any],
+    rate: float = 3.0,
+    max_in_flight: int = 4,
+    retries: int = 0,
+    backoff: float = 1.0,
+) -> Tuple[Dict[Hashable, Any], Dict[Hashable, Exception]]:
+    """
+    Collect fetch_concurrent() into ({key: result}, {key: error}),
+    with the result dict ordered by key.
+    """
+    results: Dict[Hashable, Any] = {}
+    errors: Dict[Hashable, Exception] = {}
+    for key, result, err in fetch_concurrent(
+        keys, fetch_fn, rate=rate, max_in_flight=max_in_flight, retries=retries, backoff=backoff
+    ):
+        if err is not None:
+            errors[key] = err
+        else:
+            results[key] = result
+    return dict(sorted(results.items())), errors
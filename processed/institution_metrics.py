@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+institution_metrics.py
+==================================================
+Institution-level NIL metrics from mapped deal rows, fully columnar.
+
+The unitid column is factorized once and a single groupby over those codes
+serves every metric (pandas caches the grouping across aggregations):
+
+  - counts / sums       one .sum() over a block of flags and amounts
+  - mean                sum / count, which is how groupby mean is computed
+  - median              cython group median on the same grouping
+  - distinct counts     one .nunique() over player_key / company_key
+  - dollars per star    np.divide(..., where=stars > 0) instead of a
+                        row-wise apply
+
+Output columns and values match the groupby.agg + row-wise apply rollup
+that nil_institution_extract.py used to run.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+INSTITUTION_COLUMNS = [
+    "unitid",
+    "nil_deal_count", "nil_total_dollars", "nil_avg_deal", "nil_median_deal",
+    "nil_verified_count", "nil_distinct_players", "nil_distinct_companies",
+    "nil_stars_sum", "nil_stars_weighted_total", "nil_dollars_per_star",
+]
+
+
+def _verified_flags(deals: pd.DataFrame) -> pd.Series:
+    """Verified flag — support either 'verified' or 'verified_flag'."""
+    col: Optional[str] = next((c for c in ("verified", "verified_flag") if c in deals.columns), None)
+    if col is None:
+        return pd.Series(False, index=deals.index)
+    return deals[col].astype(bool)
+
+
+def aggregate_institutions(deals: pd.DataFrame, key: str = "unitid") -> pd.DataFrame:
+    """
+    Roll mapped deals (key, deal_key, deal_amount_num, player_key,
+    company_key, optional verified / stars) up to one row per institution.
+    """
+    deals = deals[deals[key].notna()]
+    codes, keys = pd.factorize(deals[key], sort=True)
+    n_groups = len(keys)
+
+    stars = deals["stars"].fillna(0) if "stars" in deals.columns else pd.Series(0, index=deals.index)
+    amount = deals["deal_amount_num"]
+    block = pd.DataFrame({
+        "has_deal_key": deals["deal_key"].notna(),
+        "amount": amount,
+        "has_amount": amount.notna(),
+        "verified": _verified_flags(deals),
+        "stars": stars,
+        "stars_weighted": stars * amount,
+        "player_key": deals["player_key"],
+        "company_key": deals["company_key"],
+    })
+    grouped = block.groupby(codes, sort=True)
+    sums = grouped[["has_deal_key", "amount", "has_amount", "verified", "stars", "stars_weighted"]].sum()
+    distinct = grouped[["player_key", "company_key"]].nunique()
+
+    out = pd.DataFrame({key: keys})
+    out["nil_deal_count"] = sums["has_deal_key"].to_numpy()
+    out["nil_total_dollars"] = sums["amount"].to_numpy()
+    out["nil_avg_deal"] = out["nil_total_dollars"] / sums["has_amount"].replace(0, np.nan).to_numpy()
+    out["nil_median_deal"] = grouped["amount"].median().to_numpy()
+    out["nil_verified_count"] = sums["verified"].to_numpy()
+    out["nil_distinct_players"] = distinct["player_key"].to_numpy()
+    out["nil_distinct_companies"] = distinct["company_key"].to_numpy()
+    out["nil_stars_sum"] = sums["stars"].to_numpy()
+    out["nil_stars_weighted_total"] = sums["stars_weighted"].to_numpy()
+
+    # Stars-weighted average dollars per star (0 where no stars; integer 0s when
+    # no institution has stars, as the row-wise version produced)
+    weighted = out["nil_stars_weighted_total"].to_numpy(dtype="float64")
+    stars_sum = out["nil_stars_sum"].to_numpy(dtype="float64")
+    has_stars = stars_sum > 0
+    if has_stars.any():
+        out["nil_dollars_per_star"] = np.divide(weighted, stars_sum, out=np.zeros(n_groups), where=has_stars)
+    else:
+        out["nil_dollars_per_star"] = 0
+    return out[INSTITUTION_COLUMNS]
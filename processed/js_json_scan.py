@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+js_json_scan.py
+==================================================
+Find and parse the JSON objects embedded in minified JS (Next.js chunks)
+that contain given keys, without walking the text character by character
+in Python.
+
+  1. Pre-filter: one substring search for the keys. Chunks without a hit
+     return immediately (most of them).
+  2. Brace scan: a single regex consumes everything between braces inside
+     the regex engine, including string literals (with escapes), template
+     literals and block comments, so braces inside strings never count.
+     The Python loop runs once per brace, not once per character, and
+     stops at the first depth-0 point after the last key hit.
+  3. Only spans that contain a key hit are kept, as (start, end) offsets;
+     outermost first, a span is materialized and json.loads-ed only if it
+     starts like JSON (`{"` / `{}`). Spans inside a parsed object are
+     skipped; when an outer span is not JSON (e.g. a JS object literal with
+     bare keys), its inner spans get their turn.
+  4. JSON.parse('...') string literals that contain a key hit are
+     unescaped and scanned the same way.
+
+JsonObjectScanner counts spans parsed and parse failures across calls.
+"""
+
+import bisect
+import json
+import re
+from typing import Any, Iterable, List, Tuple
+
+# Everything up to the next brace (strings / template literals / comments
+# swallowed whole; a lone quote or slash is consumed as a single char),
+# then the brace itself or the end of the text. Every character is covered
+# by some alternative, so a match never fails and never backtracks.
+_SKIP = (
+    r"""(?:[^{}"'`/]+"""
+    r"""|"[^"\\\n]*(?:\\.[^"\\\n]*)*\""""      # "..."  (escape-aware, unrolled loop)
+    r"""|'[^'\\\n]*(?:\\.[^'\\\n]*)*'"""        # '...'
+    r"""|`[^`\\]*(?:\\.[^`\\]*)*`"""            # `...`
+    r"""|/\*.*?\*/"""                           # /* ... */
+    r"""|["'`/])*"""
+)
+_BRACE_RE = re.compile(_SKIP + r"([{}]|\Z)", re.S)
+_JSON_START_RE = re.compile(r"\{\s*[\"}]")
+_JSON_PARSE_RE = re.compile(r"""JSON\.parse\(\s*('[^'\\]*(?:\\.[^'\\]*)*'|"[^"\\]*(?:\\.[^"\\]*)*")""", re.S)
+_JS_ESCAPE_RE = re.compile(r"\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)", re.S)
+_JS_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+
+
+def object_spans(text: str, stop_after: int = -1) -> List[Tuple[int, int, int]]:
+    """
+    (start, end, depth) of every balanced {...} outside strings / comments,
+    in closing order. Stray closing braces are ignored. With stop_after,
+    scanning ends at the first depth-0 point past that offset.
+    """
+    spans = []
+    stack: List[int] = []
+    for m in _BRACE_RE.finditer(text):
+        pos = m.start(1)
+        if pos == len(text):
+            break
+        if text[pos] == "{":
+            stack.append(pos)
+        elif stack:
+            start = stack.pop()
+            spans.append((start, pos + 1, len(stack)))
+            if not stack and 0 <= stop_after < pos:
+                break
+    return spans
+
+
+def unescape_js_string(body: str) -> str:
+    """Contents of a JS string literal (without its quotes) → the string value."""
+    def sub(m: "re.Match[str]") -> str:
+        esc = m.group(1)
+        if esc[0] in "ux" and len(esc) > 1:
+            return chr(int(esc[1:], 16))
+        return _JS_ESCAPES.get(esc, esc)
+    return _JS_ESCAPE_RE.sub(sub, body)
+
+
+class JsonObjectScanner:
+    """Parsed JSON objects (outermost first) that contain any of `keys`."""
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = list(keys)
+        self._key_re = re.compile("|".join(re.escape(k) for k in self.keys))
+        self.spans_parsed = 0
+        self.parse_failures = 0
+
+    def scan(self, text: str) -> List[Any]:
+        if not any(k in text for k in self.keys):
+            return []
+        hits = [m.start() for m in self._key_re.finditer(text)]
+        objects = self._scan_braces(text, hits)
+
+        for m in _JSON_PARSE_RE.finditer(text):
+            lo, hi = m.span(1)
+            if bisect.bisect_left(hits, lo) < bisect.bisect_left(hits, hi):
+                objects.extend(self.scan(unescape_js_string(text[lo + 1:hi - 1])))
+        return objects
+
+    def _scan_braces(self, text: str, hits: List[int]) -> List[Any]:
+        # Spans that contain a key hit, outermost (earliest start) first
+        candidates = sorted(
+            (s, e) for s, e, _ in object_spans(text, stop_after=hits[-1])
+            if bisect.bisect_left(hits, s) < bisect.bisect_left(hits, e)
+        )
+        objects = []
+        parsed_until = -1
+        for start, end in candidates:
+            if start < parsed_until or not _JSON_START_RE.match(text, start):
+                continue
+            self.spans_parsed += 1
+            try:
+                objects.append(json.loads(text[start:end]))
+            except ValueError:
+                self.parse_failures += 1
+                continue
+            parsed_until = end
+        return objects
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+money_parse.py
+==================================================
+Vectorized parsing of NIL money strings into dollars.
+
+Shared by nil_institution_extract.py (deal_amount) and nils_top100.py
+(rankings valuations). Handles:
+  - "$50K", "$2M", "$1,200,000", "5.3 m"
+  - "Undisclosed" / "N/A" / "NA" / "unknown" → `default`
+  - already-numeric values and numeric columns
+
+Money columns repeat a small set of distinct strings, so values are
+factorized first and only the uniques are parsed (pandas string ops +
+pd.to_numeric), then broadcast back through the codes.
+"""
+
+import numpy as np
+import pandas as pd
+
+UNDISCLOSED = {"undisclosed", "n/a", "na", "unknown"}
+SUFFIX_MULTIPLIER = {"k": 1_000.0, "m": 1_000_000.0}
+
+
+def _parse_unique(values: pd.Series, require_dollar: bool) -> np.ndarray:
+    """Parse distinct non-null values; NaN where unparseable."""
+    txt = values.astype(str).str.strip()
+    has_dollar = txt.str.startswith("$")
+
+    core = txt.str.replace("$", "", regex=False).str.replace(",", "", regex=False).str.strip().str.lower()
+    core = core.where(~core.isin(UNDISCLOSED))
+
+    suffix = core.str[-1:]
+    mult = suffix.map(SUFFIX_MULTIPLIER)
+    number = core.where(mult.isna(), core.str[:-1]).str.strip()
+
+    out = pd.to_numeric(number, errors="coerce") * mult.fillna(1.0)
+    if require_dollar:
+        out = out.where(has_dollar)
+    return out.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def parse_money_series(values, default: float = np.nan, require_dollar: bool = False) -> pd.Series:
+    """
+    Parse a column of money values into float dollars.
+
+    `default` fills missing / undisclosed / unparseable values.
+    `require_dollar` treats strings not starting with "$" as unparseable
+    (the rankings page mixes "$" valuations with other short tokens).
+    """
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+
+    if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+        return s.astype("float64").fillna(default)
+
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    parsed = _parse_unique(pd.Series(uniques, dtype=object), require_dollar)
+    parsed = np.where(np.isnan(parsed), default, parsed)
+
+    out = np.full(len(s), default, dtype="float64")
+    mask = codes >= 0
+    out[mask] = parsed[codes[mask]]
+    return pd.Series(out, index=s.index, name=s.name)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+name_normalize.py
+==================================================
+School / team name normalization for fuzzy matching.
+
+clean_name() used to run eight re.sub calls per string, row by row over
+every NIL deal and every IPEDS name. Here the word removals are one
+precompiled alternation and the punctuation strip + whitespace collapse is
+a single [^a-z0-9]+ pass, which gives identical output:
+
+  - the removed words are bounded by \\b on both sides, so removing one
+    never creates a new match for another (order does not matter)
+  - "state university" → "state" could never fire: "university" is
+    already gone by then
+  - after mapping [^a-z0-9 ] to spaces the only whitespace left is " ",
+    so both steps collapse to replacing non-alphanumeric runs with " "
+
+clean_names() is the batch API: it factorizes the input, normalizes each
+distinct string once and broadcasts back through the codes.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# PATTERNS
+# ============================================================
+
+STOPWORDS = ("university", "college", "the", "men", "women", "fb", "ncaa", "football")
+
+_STOPWORD_RE = re.compile(r"\b(?:" + "|".join(STOPWORDS) + r")\b")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def clean_name(s) -> str:
+    """Aggressive text clean for fuzzy matching ("" for missing values)."""
+    if pd.isna(s):
+        return ""
+    s = _STOPWORD_RE.sub("", str(s).lower())
+    return _NON_ALNUM_RE.sub(" ", s).strip()
+
+
+def clean_names(values, as_category: bool = False) -> pd.Series:
+    """
+    clean_name over a column, computed once per distinct value.
+
+    Returns an object Series aligned with `values`, or a categorical one
+    (categories = distinct cleaned names) when `as_category` is set.
+    """
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+
+    # Slot len(uniques) holds the result for missing values
+    cleaned = np.array([clean_name(u) for u in uniques] + [""], dtype=object)
+    codes = np.where(codes < 0, len(uniques), codes)
+
+    if as_category:
+        cat_codes, categories = pd.factorize(cleaned)
+        out = pd.Categorical.from_codes(cat_codes[codes], categories)
+    else:
+        out = cleaned[codes]
+    return pd.Series(out, index=s.index, name=s.name)
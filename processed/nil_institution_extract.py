@@ -9,12 +9,15 @@ Steps:
   1. Load:
         - on3_nil_deals_all.csv     (deal-level NIL data)
         - ipeds_institution_demographics.csv (institution metadata)
+        - nil_team_overrides.csv    (optional manual team → unitid fixes)
   2. Detect the IPEDS institution name column dynamically.
-  3. Clean & fuzzy-match NIL team names → IPEDS institutions.
+  3. Clean & fuzzy-match NIL team names → IPEDS institutions
+     (cached across runs in nil_team_resolution_cache.csv).
   4. Aggregate to institution-level NIL metrics.
   5. Save:
         - nil_institution_level.csv
         - nil_team_to_unitid_mapping.csv (for QA / manual review)
+        - nil_team_to_unitid_alternates.csv (top-k candidates per team)
 
 Inputs (expected columns in NIL CSV):
   deal_key, deal_date, deal_amount, verified, nil_status, source_url, type,
@@ -30,9 +33,13 @@ Output:
 """
 
 import os
-import re
 import pandas as pd
-from rapidfuzz import process, fuzz
+
+from money_parse import parse_money_series
+from institution_metrics import aggregate_institutions
+from name_normalize import clean_names
+from team_matcher import TeamMatcher
+from team_resolution_cache import ResolutionCache, apply_overrides, ipeds_fingerprint, load_overrides
 
 # ============================================================
 # PATH CONFIG
@@ -45,6 +52,11 @@ NIL_INPUT = os.path.join(DATA_DIR, "on3_nil_deals_all.csv")
 IPEDS_INPUT = os.path.join(DATA_DIR, "ipeds_institution_demographics.csv")
 OUTPUT_INST = os.path.join(DATA_DIR, "nil_institution_level.csv")
 OUTPUT_MAPPING = os.path.join(DATA_DIR, "nil_team_to_unitid_mapping.csv")
+OUTPUT_ALTERNATES = os.path.join(DATA_DIR, "nil_team_to_unitid_alternates.csv")
+RESOLUTION_CACHE = os.path.join(DATA_DIR, "nil_team_resolution_cache.csv")
+OVERRIDES_INPUT = os.path.join(DATA_DIR, "nil_team_overrides.csv")
+
+IPEDS_YEAR = 2022   # directory year of ipeds_institution_demographics.csv (etl.IPEDS_YEAR)
 
 # ============================================================
 # LOAD DATA
@@ -85,52 +97,11 @@ print(f"[INFO] Using IPEDS institution name column → {name_col}")
 # MONEY PARSER
 # ============================================================
 
-def parse_money(v):
-    """
-    Parse deal_amount into numeric dollars.
-
-    Accepts:
-      - "$50K", "$2M", "$1,200,000"
-      - "Undisclosed" → 0
-      - Already-numeric → float(v)
-    """
-    if pd.isna(v):
-        return 0.0
-    if isinstance(v, (int, float)):
-        return float(v)
-
-    s = str(v).strip()
-    if not s:
-        return 0.0
-
-    s = s.replace("$", "").replace(",", "").strip().lower()
-
-    if s in {"undisclosed", "n/a", "na", "unknown"}:
-        return 0.0
-
-    # suffix formats: 1.2m, 500k
-    if s.endswith("m"):
-        try:
-            return float(s[:-1]) * 1_000_000
-        except ValueError:
-            return 0.0
-    if s.endswith("k"):
-        try:
-            return float(s[:-1]) * 1_000
-        except ValueError:
-            return 0.0
-
-    # plain numeric
-    try:
-        return float(s)
-    except ValueError:
-        return 0.0
-
-
 if "deal_amount" not in nil.columns:
     raise ValueError("NIL CSV must contain a 'deal_amount' column.")
 
-nil["deal_amount_num"] = nil["deal_amount"].apply(parse_money)
+# "$50K" / "$2M" / "$1,200,000" / "Undisclosed" → dollars (vectorized, see money_parse.py)
+nil["deal_amount_num"] = parse_money_series(nil["deal_amount"], default=0.0)
 
 # ============================================================
 # EXTRACT TEAM NAME FOR MATCHING
@@ -166,30 +137,9 @@ nil["team_name_raw"] = nil[team_col].astype(str).str.strip()
 # NAME CLEANING FOR FUZZY MATCHING
 # ============================================================
 
-def clean_name(s: str) -> str:
-    """Aggressive text clean for fuzzy matching."""
-    if pd.isna(s):
-        return ""
-    s = str(s).lower()
-
-    # Remove some common words/phrases
-    s = re.sub(r"\buniversity\b", "", s)
-    s = re.sub(r"\bcollege\b", "", s)
-    s = re.sub(r"\bthe\b", "", s)
-    s = re.sub(r"\bmen\b|\bwomen\b", "", s)
-    s = re.sub(r"\bfb\b|\bncaa\b", "", s)
-    s = re.sub(r"\bfootball\b", "", s)
-    s = re.sub(r"\bstate university\b", "state", s)
-
-    # Strip non-alphanumeric
-    s = re.sub(r"[^a-z0-9 ]", " ", s)
-    s = re.sub(r"\s+", " ", s)
-
-    return s.strip()
-
-
-nil["team_name_clean"] = nil["team_name_raw"].apply(clean_name)
-ipeds["school_name_clean"] = ipeds[name_col].astype(str).apply(clean_name)
+# Normalized once per distinct name (see name_normalize.py)
+nil["team_name_clean"] = clean_names(nil["team_name_raw"])
+ipeds["school_name_clean"] = clean_names(ipeds[name_col].astype(str))
 
 # Optional: filter out blank team names (e.g. high school, pro, or missing)
 nil = nil[nil["team_name_clean"] != ""].copy()
@@ -198,43 +148,65 @@ nil = nil[nil["team_name_clean"] != ""].copy()
 # FUZZY MATCH: NIL team_name_clean → IPEDS school_name_clean
 # ============================================================
 
-unique_teams = nil["team_name_clean"].dropna().unique()
-ipeds_names = ipeds["school_name_clean"].tolist()
-
-print(f"[FUZZY MATCH] Matching {len(unique_teams)} unique NIL teams to IPEDS…")
+unique_teams = [t for t in nil["team_name_clean"].dropna().unique() if t]
 
-mapping_records = []
-mapping = {}
+# Token-blocked bulk scoring (see team_matcher.py); ALT_MIN_SCORE is the floor for alternates
+MATCH_THRESHOLD = 85
+TOP_K = 3
+ALT_MIN_SCORE = 70
 
-for t in unique_teams:
-    if not t:
-        continue
-
-    match, score, idx = process.extractOne(
-        t,
-        ipeds_names,
-        scorer=fuzz.WRatio
-    )
+# Resolutions persist across runs (see team_resolution_cache.py): only names
+# not already resolved against this IPEDS directory are scored.
+cache = ResolutionCache(
+    RESOLUTION_CACHE,
+    IPEDS_YEAR,
+    ipeds_fingerprint(ipeds["unitid"], ipeds["school_name_clean"]),
+)
+if cache.invalidated:
+    print(f"[CACHE] IPEDS directory changed → dropped {cache.invalidated} cached resolutions.")
+
+unseen = cache.unseen(unique_teams)
+print(f"[FUZZY MATCH] {len(unique_teams)} unique NIL teams, "
+      f"{len(unique_teams) - len(unseen)} cached, {len(unseen)} to match…")
+
+if unseen:
+    matcher = TeamMatcher(ipeds["school_name_clean"].tolist())
+    matches = matcher.match(unseen, top_k=TOP_K, score_cutoff=ALT_MIN_SCORE, rescore_below=MATCH_THRESHOLD)
+    print(f"[FUZZY MATCH] Scored {matcher.pairs_scored:,} pairs "
+          f"(full cross product: {len(unseen) * len(ipeds):,}).")
+
+    matches["unitid"] = ipeds["unitid"].to_numpy()[matches["choice_idx"]]
+    matches["iped_school_original"] = ipeds[name_col].to_numpy()[matches["choice_idx"]]
+    cache.add(unseen, matches.rename(
+        columns={"query": "team_name_clean", "choice": "candidate_school_clean", "score": "match_score"}
+    ))
+    cache.save()
+    print(f"[OK] Updated team resolution cache → {RESOLUTION_CACHE}")
+
+candidates = cache.candidates(unique_teams)
+best = candidates[(candidates["rank"] == 1) & (candidates["match_score"] >= MATCH_THRESHOLD)]
+
+mapping_df = (
+    best.rename(columns={"candidate_school_clean": "matched_school_clean"})
+    [["team_name_clean", "matched_school_clean", "match_score", "unitid", "iped_school_original"]]
+)
+mapping_df["unitid"] = mapping_df["unitid"].astype("int64")
+
+# Manual overrides take precedence over fuzzy matches
+mapping_df = apply_overrides(mapping_df, load_overrides(OVERRIDES_INPUT), unique_teams, ipeds, name_col)
+mapping_df = mapping_df.sort_values("match_score", ascending=False, na_position="first")
+mapping = dict(zip(mapping_df["team_name_clean"], mapping_df["unitid"]))
+print(f"[MAP] Created mapping for {len(mapping_df)} team names "
+      f"(score ≥ {MATCH_THRESHOLD}, {(mapping_df['source'] == 'override').sum()} overrides).")
+
+# Top-k candidates per team (incl. below-threshold ones) for manual review
+alternates_df = candidates.dropna(subset=["candidate_school_clean"]).drop(
+    columns=["ipeds_year", "ipeds_fingerprint"]
+)
+alternates_df.to_csv(OUTPUT_ALTERNATES, index=False)
+print(f"[OK] Saved top-{TOP_K} match alternates → {OUTPUT_ALTERNATES}")
 
-    # Strong-match threshold; tweak if needed
-    if score >= 85:
-        unitid = ipeds.iloc[idx]["unitid"]
-        mapping[t] = unitid
-
-        mapping_records.append(
-            {
-                "team_name_clean": t,
-                "matched_school_clean": match,
-                "match_score": score,
-                "unitid": unitid,
-                "iped_school_original": ipeds.iloc[idx][name_col],
-            }
-        )
-
-mapping_df = pd.DataFrame(mapping_records).sort_values("match_score", ascending=False)
-print(f"[MAP] Created mapping for {len(mapping_df)} team names with score ≥ 85.")
-
-# Save mapping for QA / manual tweaks
+# Save mapping for QA (edit nil_team_overrides.csv to correct it; this file is regenerated)
 mapping_df.to_csv(OUTPUT_MAPPING, index=False)
 print(f"[OK] Saved NIL team → IPEDS mapping → {OUTPUT_MAPPING}")
 
@@ -256,57 +228,13 @@ if mapped.empty:
         "Check mapping thresholds / team name columns."
     )
 
-# ============================================================
-# ADD SOME HELPER FIELDS FOR AGGREGATION
-# ============================================================
-
-# Verified flag — support either 'verified' or 'verified_flag'
-verified_col = None
-for c in ["verified", "verified_flag"]:
-    if c in mapped.columns:
-        verified_col = c
-        break
-
-if verified_col is None:
-    mapped["verified_bool"] = False
-else:
-    mapped["verified_bool"] = mapped[verified_col].astype(bool)
-
-# Player stars weighting (NIL value × stars)
-if "stars" in mapped.columns:
-    mapped["stars"] = mapped["stars"].fillna(0)
-else:
-    mapped["stars"] = 0
-
-mapped["stars_weighted_deal"] = mapped["stars"] * mapped["deal_amount_num"]
-
 # ============================================================
 # INSTITUTION-LEVEL AGGREGATION
 # ============================================================
 
-inst_nil = (
-    mapped
-    .groupby("unitid")
-    .agg(
-        nil_deal_count=("deal_key", "count"),
-        nil_total_dollars=("deal_amount_num", "sum"),
-        nil_avg_deal=("deal_amount_num", "mean"),
-        nil_median_deal=("deal_amount_num", "median"),
-        nil_verified_count=("verified_bool", "sum"),
-        nil_distinct_players=("player_key", "nunique"),
-        nil_distinct_companies=("company_key", "nunique"),
-        nil_stars_sum=("stars", "sum"),
-        nil_stars_weighted_total=("stars_weighted_deal", "sum"),
-    )
-    .reset_index()
-)
-
-# Stars-weighted average dollars per star (handle divide-by-zero)
-inst_nil["nil_dollars_per_star"] = inst_nil.apply(
-    lambda r: r["nil_stars_weighted_total"] / r["nil_stars_sum"]
-    if r["nil_stars_sum"] > 0 else 0,
-    axis=1
-)
+# Deal count, dollars, verified count, distinct players / companies and
+# stars-weighted metrics in one columnar groupby (see institution_metrics.py)
+inst_nil = aggregate_institutions(mapped)
 
 print("\n[PREVIEW] Institution-level NIL metrics:")
 print(inst_nil.head())
@@ -4,47 +4,101 @@ FULL EXTRACTION VERSION — PULL ALL NIL DEALS FROM ON3 API
 
 This script:
     ✔ Fetches all pages from the public On3 NIL API
+      (concurrently, under a token-bucket rate limit — see fetch_engine.py)
     ✔ Flattens each NIL deal using the corrected schema
     ✔ Saves full dataset to data/processed/on3_nil_deals_all.csv
     ✔ Prints debug info for page 1 (first JSON + null summary)
 
+Checkpointed mode (--checkpoint):
+    ✔ Writes each flattened page to its own JSONL shard under
+      data/processed/on3_deals_pages/ as soon as it lands
+    ✔ Tracks completed / failed pages in manifest.json
+    ✔ Retries failed pages with exponential backoff
+    ✔ On restart re-reads page 1, only fetches pages missing from the
+      manifest (plus the pages next to each gap if the page count or the
+      newest deal changed), then concatenates all shards into
+      on3_nil_deals_all.csv, dropping deal_keys duplicated at page seams
+
+Incremental mode (--incremental):
+    ✔ Loads the existing on3_nil_deals_all.csv
+    ✔ Walks pages newest-first until a page whose deal_keys are all known
+    ✔ Upserts the fetched rows by deal_key and rewrites the CSV in place
+
+Streaming mode (--stream):
+    ✔ Pages are consumed in order as they arrive and flattened straight
+      into column buffers (deal_stream.py), flushed in batches to the
+      typed deal store (store/deals.parquet, as nil_store.py writes it)
+      + on3_nil_deals_all.csv
+    ✔ Peak memory is bounded by the batch size instead of the deal count
+
 """
 
+import argparse
+import json
 import os
 import requests
 import pandas as pd
-import time
 from pprint import pprint
 
+from fetch_engine import (
+    TokenBucket, make_session, fetch_concurrent, fetch_in_order, fetch_ordered, retry_call
+)
+
 # ------------------------------------------------------------
 # CONFIG
 # ------------------------------------------------------------
-BASE_URL = "https://api.on3.com/public/v2/deals?page={page}"
+# Override with ON3_DEALS_URL to point at a local stub server
+BASE_URL = os.environ.get("ON3_DEALS_URL", "https://api.on3.com/public/v2/deals?page={page}")
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
 }
 
-SLEEP = 0.35   # Do not hammer API
+RATE_LIMIT = float(os.environ.get("ON3_RATE_LIMIT", 3.0))     # requests / second — do not hammer API
+MAX_IN_FLIGHT = int(os.environ.get("ON3_MAX_IN_FLIGHT", 4))   # concurrent open requests
 
 OUTPUT_DIR = "data/processed"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 OUTPUT_PATH = os.path.join(OUTPUT_DIR, "on3_nil_deals_all.csv")
+DEALS_STORE_PATH = os.path.join(OUTPUT_DIR, "store", "deals.parquet")   # nil_store.DEALS_STORE
+
+CHECKPOINT_DIR = os.path.join(OUTPUT_DIR, "on3_deals_pages")
+MANIFEST_PATH = os.path.join(CHECKPOINT_DIR, "manifest.json")
+
+RETRIES = 4        # extra attempts per page (5xx / 429 / connection errors)
+BACKOFF = 2.0      # seconds; doubles each retry
 
 
 # ------------------------------------------------------------
 # HELPERS
 # ------------------------------------------------------------
 
-def fetch_page(page: int):
+def fetch_page(page: int, session: requests.Session = None):
     """Fetch a given page from the On3 NIL API."""
     url = BASE_URL.format(page=page)
     print(f"[API] Fetching page {page}… {url}")
-    r = requests.get(url, headers=HEADERS, timeout=30)
+    getter = session.get if session is not None else requests.get
+    r = getter(url, headers=HEADERS, timeout=30)
     r.raise_for_status()
     return r.json()
 
 
+def fetch_remaining_pages(page_count: int, session: requests.Session):
+    """
+    Fan out pages 2..page_count concurrently, retrying failed pages.
+
+    Returns ({page: json} ordered by page, {page: error}).
+    """
+    return fetch_ordered(
+        range(2, page_count + 1),
+        lambda p: fetch_page(p, session),
+        rate=RATE_LIMIT,
+        max_in_flight=MAX_IN_FLIGHT,
+        retries=RETRIES,
+        backoff=BACKOFF,
+    )
+
+
 def flatten_deal(d):
     """Correct flatten for NIL deal JSON based on real On3 schema."""
 
@@ -130,6 +184,260 @@ def flatten_deal(d):
     }
 
 
+# ------------------------------------------------------------
+# CHECKPOINTING
+# ------------------------------------------------------------
+
+def _write_atomic(path: str, text: str) -> None:
+    """Write via a temp file + rename so a crash never leaves a half-written file."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def shard_path(page: int) -> str:
+    return os.path.join(CHECKPOINT_DIR, f"page_{page:05d}.jsonl")
+
+
+def load_manifest() -> dict:
+    """
+    Manifest: {"page_count": int, "first_deal_key": key of the newest deal on
+    page 1, "completed": [pages], "failed": {page: error}}.
+    """
+    if not os.path.exists(MANIFEST_PATH):
+        return {"page_count": None, "first_deal_key": None, "completed": [], "failed": {}}
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest.setdefault("first_deal_key", None)
+    return manifest
+
+
+def save_manifest(manifest: dict) -> None:
+    manifest["completed"] = sorted(set(manifest["completed"]))
+    _write_atomic(MANIFEST_PATH, json.dumps(manifest, indent=2))
+
+
+def spill_page(page: int, data: dict, manifest: dict) -> None:
+    """
+    Flatten one page to its shard and mark it completed.
+
+    A page re-fetched on a later run is merged into its existing shard
+    (fresh rows first) rather than replacing it: if the feed shifted, the
+    old shard holds deals that now sit on the next page.
+    """
+    rows = [flatten_deal(d) for d in data.get("list", [])]
+    path = shard_path(page)
+    if os.path.exists(path):
+        fresh = {r["deal_key"] for r in rows if r["deal_key"] is not None}
+        with open(path, encoding="utf-8") as f:
+            old = [json.loads(line) for line in f if line.strip()]
+        rows += [r for r in old if r.get("deal_key") is None or r["deal_key"] not in fresh]
+    _write_atomic(shard_path(page), "".join(json.dumps(r) + "\n" for r in rows))
+    manifest["completed"].append(page)
+    manifest["failed"].pop(str(page), None)
+    save_manifest(manifest)
+
+
+def _first_deal_key(data: dict):
+    deals = data.get("list") or []
+    return deals[0].get("key") if deals else None
+
+
+def concat_shards(page_count: int) -> pd.DataFrame:
+    """
+    Concatenate page shards in page order.
+
+    The feed is newest-first, so shards written by different runs can
+    overlap at their seams; a deal_key seen on an earlier page wins.
+    """
+    rows = []
+    for page in range(1, page_count + 1):
+        path = shard_path(page)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            rows.extend(json.loads(line) for line in f if line.strip())
+    df = pd.DataFrame(rows)
+    if df.empty or "deal_key" not in df.columns:
+        return df
+    dup = df["deal_key"].notna() & df.duplicated(subset="deal_key", keep="first")
+    if dup.any():
+        print(f"[CHECKPOINT] Dropped {int(dup.sum())} deals duplicated across page seams.")
+    return df[~dup].reset_index(drop=True)
+
+
+def main_checkpointed():
+    print("\n=========== STARTING CHECKPOINTED NIL EXTRACTION ===========\n")
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+
+    manifest = load_manifest()
+    session = make_session(pool_size=MAX_IN_FLIGHT, headers=HEADERS)
+
+    # Page 1 is re-read on every run: fresh pagination meta, and a check of
+    # whether the newest-first feed moved since the shards on disk were written
+    first = fetch_page(1, session)
+    page_count = first.get("pagination", {}).get("pageCount") or 1
+    first_key = _first_deal_key(first)
+    shifted = manifest["page_count"] is not None and (
+        page_count != manifest["page_count"] or first_key != manifest["first_deal_key"]
+    )
+    manifest["page_count"] = page_count
+    manifest["first_deal_key"] = first_key
+    spill_page(1, first, manifest)
+
+    done = set(manifest["completed"])
+    missing = [p for p in range(1, page_count + 1) if p not in done]
+    if shifted and missing:
+        # Deals added / removed since the last run move every later deal across
+        # page boundaries, so deals can slip between a shard on disk and the gap
+        # next to it. Re-fetch the neighbours of each gap; concat_shards() drops
+        # the resulting duplicates.
+        seams = {q for p in missing for q in (p - 1, p + 1) if 1 < q <= page_count} - set(missing)
+        print(f"[CHECKPOINT] Feed changed since the last run (page count / newest deal); "
+              f"re-fetching {len(seams)} pages next to gaps.")
+        missing = sorted(set(missing) | seams)
+    print(f"[CHECKPOINT] {len(done)}/{page_count} pages on disk, fetching {len(missing)}")
+
+    for page, data, err in fetch_concurrent(
+        missing,
+        lambda p: fetch_page(p, session),
+        rate=RATE_LIMIT,
+        max_in_flight=MAX_IN_FLIGHT,
+        retries=RETRIES,
+        backoff=BACKOFF,
+    ):
+        if err is not None:
+            print(f"[WARN] Failed on page {page} after {RETRIES} retries: {err}")
+            manifest["failed"][str(page)] = str(err)
+            save_manifest(manifest)
+        else:
+            spill_page(page, data, manifest)
+
+    if manifest["failed"]:
+        print(f"[WARN] {len(manifest['failed'])} pages still failed — re-run to resume: "
+              f"{sorted(int(p) for p in manifest['failed'])}")
+
+    df = concat_shards(page_count)
+    print("\n=== FINAL DF SHAPE ===")
+    print(df.shape)
+
+    df.to_csv(OUTPUT_PATH, index=False)
+    print(f"\n[OK] Saved all NIL deals → {OUTPUT_PATH}\n")
+
+
+# ------------------------------------------------------------
+# INCREMENTAL SYNC
+# ------------------------------------------------------------
+
+def _deal_keys(series: pd.Series) -> set:
+    return set(pd.to_numeric(series, errors="coerce").dropna().astype("int64"))
+
+
+def merge_deals(existing: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+    """
+    Upsert `fresh` into `existing` by deal_key.
+    Fresh rows win and go first, so the newest deals stay at the top like a full pull.
+    """
+    fresh = fresh.drop_duplicates(subset="deal_key", keep="first")
+    fresh_keys = pd.to_numeric(fresh["deal_key"], errors="coerce")
+    stale = pd.to_numeric(existing["deal_key"], errors="coerce").isin(fresh_keys)
+    return pd.concat([fresh, existing[~stale]], ignore_index=True)
+
+
+def main_incremental():
+    print("\n=========== STARTING INCREMENTAL NIL SYNC ===========\n")
+
+    if not os.path.exists(OUTPUT_PATH):
+        print(f"[INFO] {OUTPUT_PATH} not found — running full extraction instead.")
+        main()
+        return
+
+    existing = pd.read_csv(OUTPUT_PATH)
+    known = _deal_keys(existing["deal_key"])
+    print(f"[SYNC] {len(existing):,} rows / {len(known):,} known deal_keys on disk")
+
+    session = make_session(pool_size=1, headers=HEADERS)
+    bucket = TokenBucket(RATE_LIMIT)
+
+    fresh_rows = []
+    page, page_count = 1, 1
+    while page <= page_count:
+        bucket.acquire()
+        data = retry_call(lambda: fetch_page(page, session), retries=RETRIES, backoff=BACKOFF)
+        page_count = data.get("pagination", {}).get("pageCount") or page
+
+        rows = [flatten_deal(d) for d in data.get("list", [])]
+        fresh_rows.extend(rows)
+
+        page_keys = {r["deal_key"] for r in rows if r["deal_key"] is not None}
+        if not page_keys or page_keys <= known:
+            print(f"[SYNC] Page {page} fully known — stopping.")
+            break
+        page += 1
+
+    fresh = pd.DataFrame(fresh_rows)
+    if fresh.empty:
+        print("[SYNC] No deals returned; nothing to merge.")
+        return
+
+    fresh_keys = _deal_keys(fresh["deal_key"])
+    print(f"[SYNC] Fetched {page} pages: {len(fresh_keys - known):,} new, "
+          f"{len(fresh_keys & known):,} refreshed deals")
+
+    df = merge_deals(existing, fresh)
+    df.to_csv(OUTPUT_PATH, index=False)
+    print(f"\n[OK] Updated NIL deals in place → {OUTPUT_PATH} ({len(df):,} rows)\n")
+
+
+# ------------------------------------------------------------
+# STREAMING
+# ------------------------------------------------------------
+
+def iter_pages(session: requests.Session):
+    """
+    Yield API pages in page order, fetching 2..N concurrently behind the scenes.
+    Pages that still fail after retries are skipped; once every other page
+    has been yielded, raises RuntimeError listing them.
+    """
+    failed = {}
+    first = fetch_page(1, session)
+    page_count = first.get("pagination", {}).get("pageCount") or 1
+    print(f"[INFO] Total pages: {page_count}")
+    yield first
+
+    for page, data, err in fetch_in_order(
+        range(2, page_count + 1),
+        lambda p: fetch_page(p, session),
+        rate=RATE_LIMIT,
+        max_in_flight=MAX_IN_FLIGHT,
+        retries=RETRIES,
+        backoff=BACKOFF,
+    ):
+        if err is not None:
+            print(f"[WARN] Failed on page {page}: {err}")
+            failed[page] = err
+            continue
+        yield data
+
+    if failed:
+        raise RuntimeError(f"{len(failed)} pages failed after retries: {sorted(failed)}")
+
+
+def main_streaming(batch_size: int = 50_000):
+    from deal_stream import stream_deals
+
+    print("\n=========== STARTING STREAMING NIL EXTRACTION ===========\n")
+    session = make_session(pool_size=MAX_IN_FLIGHT, headers=HEADERS)
+    try:
+        n = stream_deals(iter_pages(session), DEALS_STORE_PATH, csv_path=OUTPUT_PATH, batch_size=batch_size)
+    except RuntimeError as e:
+        print(f"\n[ERROR] {e}; kept the previous {DEALS_STORE_PATH} / {OUTPUT_PATH} "
+              "(partial output, if any, left in *.tmp). Re-run to retry.\n")
+        return
+    print(f"\n[OK] Streamed {n:,} NIL deals → {DEALS_STORE_PATH}, {OUTPUT_PATH}\n")
+
+
 # ------------------------------------------------------------
 # MAIN EXTRACTION
 # ------------------------------------------------------------
@@ -140,7 +448,8 @@ def main():
     # -------------------------------
     # 1. Fetch first page to get metadata
     # -------------------------------
-    first = fetch_page(1)
+    session = make_session(pool_size=MAX_IN_FLIGHT, headers=HEADERS)
+    first = fetch_page(1, session)
 
     pagination = first.get("pagination", {})
     page_count = pagination.get("pageCount")
@@ -169,16 +478,16 @@ def main():
         all_rows.append(flatten_deal(d))
 
     # -------------------------------
-    # 4. Loop through remaining pages
+    # 4. Fetch remaining pages concurrently, flatten in page order
     # -------------------------------
-    for page in range(2, page_count + 1):
-        time.sleep(SLEEP)
-        try:
-            data = fetch_page(page)
-            for d in data.get("list", []):
-                all_rows.append(flatten_deal(d))
-        except Exception as e:
-            print(f"[WARN] Failed on page {page}: {e}")
+    pages, errors = fetch_remaining_pages(page_count, session)
+
+    for page, data in pages.items():
+        for d in data.get("list", []):
+            all_rows.append(flatten_deal(d))
+
+    for page, e in sorted(errors.items()):
+        print(f"[WARN] Failed on page {page}: {e}")
 
     # -------------------------------
     # 5. Convert to DataFrame
@@ -201,4 +510,20 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Pull all NIL deals from the On3 API.")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="spill pages to disk and resume from the manifest on restart")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fetch pages newer than the existing CSV and upsert by deal_key")
+    parser.add_argument("--stream", action="store_true",
+                        help="flatten pages straight into batched Parquet/CSV output")
+    args = parser.parse_args()
+
+    if args.stream:
+        main_streaming()
+    elif args.incremental:
+        main_incremental()
+    elif args.checkpoint:
+        main_checkpointed()
+    else:
+        main()
@@ -7,23 +7,56 @@ Option C: Robust-ish NIL scraping from On3 NIL valuations rankings.
 Strategy:
   - Hit the public NIL valuations rankings page:
       https://www.on3.com/nil/rankings/player/nil-valuations/
-  - Parse the *rendered HTML* (players, teams, valuations) using BeautifulSoup.
+  - Parse the *rendered HTML* (players, teams, valuations) using BeautifulSoup,
+    or lxml with precompiled XPath selectors (same DataFrame, several times
+    faster; opt in with --parser lxml / ON3_HTML_PARSER=lxml).
   - Avoid any brittle JSON (__NEXT_DATA__) paths.
 
 Outputs:
   - on3_nil_players_sample.csv   (player-level NIL data)
   - on3_nil_teams_sample.csv     (team-level NIL summary)
+
+Crawl mode (--crawl):
+  - Walks every rankings page of each sport / year variant (--sport /
+    --year), fetched concurrently under a token-bucket rate limit (see
+    fetch_engine.py) until a page 404s or has no player rows
+  - Page URLs come from a template (--page-url / ON3_RANKINGS_PAGE_URL,
+    placeholders {page}, {sport}, {year}). The default,
+    ?sport={sport}&year={year}&page={page}, is an ASSUMPTION: On3's real
+    sport / year query parameters have not been verified, so set the
+    template before crawling variants
+  - Parses pages in a process pool as they arrive; a page that fails to
+    fetch or parse is reported and skipped
+  - Appends each page's rows to on3_nil_players_all.csv as soon as it is
+    parsed, and rewrites on3_nil_teams_all.csv from running per-team totals
+    (players deduplicated by URL across pages and variants)
+  - ON3_RANKINGS_URL / ON3_RANKINGS_PAGE_URL point the crawl at a local
+    stub server
 """
 
+import argparse
+import itertools
+import math
 import os
 import re
 import time
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import requests
 import pandas as pd
 from bs4 import BeautifulSoup
 
+from fetch_engine import fetch_concurrent, make_session
+from money_parse import parse_money_series
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # pragma: no cover - optional dependency
+    etree = lxml_html = None
+
 # -------------------------------------------------------------------
 # CONFIG
 # -------------------------------------------------------------------
@@ -34,7 +67,26 @@ PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 
 ON3_BASE_URL = "https://www.on3.com"
-RANKINGS_URL = f"{ON3_BASE_URL}/nil/rankings/player/nil-valuations/"
+RANKINGS_URL = os.environ.get("ON3_RANKINGS_URL", f"{ON3_BASE_URL}/nil/rankings/player/nil-valuations/")
+# Crawl page URL per (sport, year) variant. The sport / year parameter names
+# are assumed, not confirmed against on3.com; query params left empty are dropped.
+RANKINGS_PAGE_URL = os.environ.get(
+    "ON3_RANKINGS_PAGE_URL",
+    RANKINGS_URL + ("&" if "?" in RANKINGS_URL else "?") + "sport={sport}&year={year}&page={page}",
+)
+
+# Crawl mode
+CRAWL_RATE = float(os.environ.get("ON3_RANKINGS_RATE", 1.0))          # requests / second — be polite
+CRAWL_IN_FLIGHT = int(os.environ.get("ON3_RANKINGS_IN_FLIGHT", 4))    # pages per variant per window
+CRAWL_MAX_PAGES = 500                                                 # per variant, safety cap
+CRAWL_RETRIES = 3
+CRAWL_BACKOFF = 2.0
+PARSE_WORKERS = int(os.environ.get("ON3_PARSE_WORKERS", 0)) or os.cpu_count() or 1
+PLAYERS_ALL_CSV = os.path.join(PROCESSED_DIR, "on3_nil_players_all.csv")
+TEAMS_ALL_CSV = os.path.join(PROCESSED_DIR, "on3_nil_teams_all.csv")
+
+# "bs4" (html.parser, default) or "lxml" (opt-in, needs lxml installed)
+PARSER_BACKEND = os.environ.get("ON3_HTML_PARSER", "bs4")
 
 HEADERS = {
     # Behave like a normal browser
@@ -59,33 +111,6 @@ def fetch_html(url: str, sleep_sec: float = 1.0) -> str:
     return resp.text
 
 
-def parse_money_str(s: str) -> Optional[float]:
-    """
-    Parse strings like "$5.3M", "$2M", "$850K" into numeric dollars.
-    Returns None if parsing fails.
-    """
-    if not isinstance(s, str):
-        return None
-    s = s.strip()
-    if not s.startswith("$"):
-        return None
-    # Remove `$` and commas
-    core = s[1:].replace(",", "")
-    m = re.match(r"^([\d\.]+)\s*([MK])?$", core, flags=re.IGNORECASE)
-    if not m:
-        return None
-    value = float(m.group(1))
-    suffix = m.group(2)
-    if suffix is None:
-        return value
-    suffix = suffix.upper()
-    if suffix == "M":
-        return value * 1_000_000
-    if suffix == "K":
-        return value * 1_000
-    return value
-
-
 def class_contains(fragment: str):
     """Return a filter function for BeautifulSoup class-based matching."""
     def _matcher(classes):
@@ -98,119 +123,211 @@ def class_contains(fragment: str):
 
 
 # -------------------------------------------------------------------
-# CORE PARSER
+# ROW FIELD RULES (shared by both parser backends)
 # -------------------------------------------------------------------
 
-def parse_on3_nil_rankings_page(html: str) -> pd.DataFrame:
+ROW_CLASS = "NilPlayerRankingItem_itemContainer"
+NAME_CLASS = "NilPlayerRankingItem_name"
+
+# In the text, rank is like "1. 1", "2. 2", etc.
+_RANK_RE = re.compile(r"\b(\d+)\.\s*\1\b")
+_LEADING_INT_RE = re.compile(r"^\s*(\d+)\b")
+
+
+def _is_position(txt: str) -> bool:
+    """Short uppercase code such as QB, WR."""
+    return 1 <= len(txt) <= 4 and txt.isupper() and txt.isalpha()
+
+
+def _team_from_alts(alts: Iterable[str]) -> Optional[str]:
     """
-    Parse the On3 NIL valuations rankings HTML into a player-level DataFrame.
+    Team name from the row's image alt texts: the first non-default avatar
+    (e.g. "Texas Longhorns Avatar").
+    """
+    for alt in alts:
+        if not alt:
+            continue
+        if "Default Avatar" in alt:
+            continue
+        # Many are like "texas longhorns Avatar" or "Texas Longhorns"
+        clean = alt.replace("Avatar", "").replace("avatar", "").strip()
+        if clean:
+            return clean
+    return None
 
-    For each visible player row, attempts to extract:
-      - rank
-      - position
-      - player_name
-      - player_href (relative URL)
-      - team_name   (from team avatar img alt, e.g. "Texas Longhorns Avatar")
-      - nil_valuation_str  (e.g. "$5.3M")
-      - nil_valuation_dollars (float)
+
+def _rank_from_text(row_text: str) -> Optional[int]:
     """
+    Rank from the row text; the first integer if it is not in "N. N" form,
+    knowing this might not be perfect but good enough.
+    """
+    m_rank = _RANK_RE.search(row_text)
+    if m_rank:
+        return int(m_rank.group(1))
+    # fallback: any leading integer
+    m2 = _LEADING_INT_RE.search(row_text)
+    if m2:
+        return int(m2.group(1))
+    return None
+
+
+def _first_money(strings: Iterable[str]) -> Optional[str]:
+    """Usually NIL valuation is the first "$" token in the row ($1.9M, $500K, …)."""
+    for txt in strings:
+        if txt.startswith("$"):
+            return txt
+    return None
+
+
+# -------------------------------------------------------------------
+# BACKEND: BeautifulSoup (html.parser)
+# -------------------------------------------------------------------
+
+def _parse_rows_bs4(html: str) -> List[Dict[str, Any]]:
     soup = BeautifulSoup(html, "html.parser")
 
     # Each player row is rendered by a React component named something like:
     #   NilPlayerRankingItem_itemContainer__<hash>
     # We'll search for any div whose class contains that prefix.
-    row_divs = soup.find_all("div", class_=class_contains("NilPlayerRankingItem_itemContainer"))
+    row_divs = soup.find_all("div", class_=class_contains(ROW_CLASS))
     print(f"[PARSE] Found {len(row_divs)} player rows (approx).")
 
     records: List[Dict[str, Any]] = []
 
     for row in row_divs:
-        # -----------------------------
         # Player name + link
-        # -----------------------------
-        name_anchor = row.find("a", class_=class_contains("NilPlayerRankingItem_name"))
+        name_anchor = row.find("a", class_=class_contains(NAME_CLASS))
         if not name_anchor:
             # Skip weird rows (e.g., headers)
             continue
         player_name = name_anchor.get_text(strip=True)
         player_href = name_anchor.get("href", "")
-        if player_href and player_href.startswith("/"):
-            player_href = ON3_BASE_URL + player_href
-
-        # -----------------------------
-        # Position (e.g., QB, WR)
-        # Often rendered as a short text element within the row.
-        # We'll look for a short uppercase string near the top.
-        # -----------------------------
+
+        # Position: first span / div whose text is a short uppercase code
         position = None
-        # Try to find span or div with short uppercase code
         for elt in row.find_all(["span", "div"], recursive=True):
             txt = elt.get_text(strip=True)
-            if 1 <= len(txt) <= 4 and txt.isupper() and txt.isalpha():
+            if _is_position(txt):
                 position = txt
                 break
 
-        # -----------------------------
-        # Team name:
-        # Use non-default avatar image alt text (e.g. "Texas Longhorns Avatar")
-        # -----------------------------
-        team_name = None
-        for img in row.find_all("img"):
-            alt = img.get("alt", "") or ""
-            if not alt:
-                continue
-            if "Default Avatar" in alt:
-                continue
-            # Many are like "texas longhorns Avatar" or "Texas Longhorns"
-            # Normalize capitalization a bit
-            clean = alt.replace("Avatar", "").replace("avatar", "").strip()
-            if clean:
-                # Title-case but keep acronyms-ish
-                team_name = clean
-                break
+        team_name = _team_from_alts(img.get("alt", "") or "" for img in row.find_all("img"))
+        rank = _rank_from_text(" ".join(row.stripped_strings))
+        nil_str = _first_money(row.stripped_strings)
+
+        records.append(_record(rank, position, player_name, player_href, team_name, nil_str))
+
+    return records
+
 
-        # -----------------------------
-        # Rank:
-        # In the text, rank is like "1. 1", "2. 2", etc.
-        # We'll try to find the first integer in row text,
-        # knowing this might not be perfect but good enough.
-        # -----------------------------
-        rank = None
-        row_text = " ".join(row.stripped_strings)
-        m_rank = re.search(r"\b(\d+)\.\s*\1\b", row_text)
-        if m_rank:
-            rank = int(m_rank.group(1))
-        else:
-            # fallback: any leading integer
-            m2 = re.search(r"^\s*(\d+)\b", row_text)
-            if m2:
-                rank = int(m2.group(1))
-
-        # -----------------------------
-        # NIL valuation:
-        # Search inside this row for the first string like $1.9M, $500K, etc.
-        # -----------------------------
-        nil_str = None
-        for txt in row.stripped_strings:
-            if txt.startswith("$"):
-                # Usually NIL valuation is the first "$" token in the row
-                nil_str = txt
+# -------------------------------------------------------------------
+# BACKEND: lxml (libxml2) + precompiled XPath
+# -------------------------------------------------------------------
+# Selectors are compiled once. Class matching is a substring test on the
+# class attribute, like class_contains(); strings are collected the way
+# BeautifulSoup's get_text(strip=True) / stripped_strings do (comments,
+# <script> and <style> contents excluded).
+
+if etree is not None:
+    _X_ROWS = etree.XPath(f'//div[contains(@class, "{ROW_CLASS}")]')
+    _X_NAME = etree.XPath(f'descendant::a[contains(@class, "{NAME_CLASS}")][1]')
+    _X_SPAN_DIV = etree.XPath("descendant::*[self::span or self::div]")
+    _X_IMG_ALTS = etree.XPath("descendant::img/@alt")
+    _X_NON_TEXT = etree.XPath("//script | //style")
+
+
+def _lxml_strings(el) -> List[str]:
+    return [s for s in (t.strip() for t in el.itertext()) if s]
+
+
+def _parse_rows_lxml(html: str) -> List[Dict[str, Any]]:
+    if lxml_html is None:
+        raise ImportError("lxml is not installed; use the bs4 parser backend.")
+    if not html.strip():
+        print("[PARSE] Found 0 player rows (approx).")
+        return []
+    try:
+        doc = lxml_html.document_fromstring(html)
+    except ValueError:
+        # str input with an XML encoding declaration
+        doc = lxml_html.document_fromstring(html.encode("utf-8"), parser=lxml_html.HTMLParser(encoding="utf-8"))
+
+    for el in _X_NON_TEXT(doc):
+        el.drop_tree()   # keeps the element's tail text
+
+    row_divs = _X_ROWS(doc)
+    print(f"[PARSE] Found {len(row_divs)} player rows (approx).")
+
+    records: List[Dict[str, Any]] = []
+
+    for row in row_divs:
+        anchors = _X_NAME(row)
+        if not anchors:
+            continue
+        name_anchor = anchors[0]
+        player_name = "".join(_lxml_strings(name_anchor))
+        player_href = name_anchor.get("href", "")
+
+        position = None
+        for elt in _X_SPAN_DIV(row):
+            txt = "".join(_lxml_strings(elt))
+            if _is_position(txt):
+                position = txt
                 break
-        nil_dollars = parse_money_str(nil_str) if nil_str else None
 
-        records.append(
-            {
-                "rank": rank,
-                "position": position,
-                "player_name": player_name,
-                "player_url": player_href,
-                "team_name": team_name,
-                "nil_valuation_str": nil_str,
-                "nil_valuation_dollars": nil_dollars,
-            }
-        )
+        strings = _lxml_strings(row)
+        team_name = _team_from_alts(_X_IMG_ALTS(row))
+        rank = _rank_from_text(" ".join(strings))
+        nil_str = _first_money(strings)
+
+        records.append(_record(rank, position, player_name, player_href, team_name, nil_str))
+
+    return records
+
+
+# -------------------------------------------------------------------
+# CORE PARSER
+# -------------------------------------------------------------------
+
+PARSERS = {"bs4": _parse_rows_bs4, "lxml": _parse_rows_lxml}
+
+
+def _record(rank, position, player_name, player_href, team_name, nil_str) -> Dict[str, Any]:
+    if player_href and player_href.startswith("/"):
+        player_href = ON3_BASE_URL + player_href
+    return {
+        "rank": rank,
+        "position": position,
+        "player_name": player_name,
+        "player_url": player_href,
+        "team_name": team_name,
+        "nil_valuation_str": nil_str,
+    }
+
+
+def parse_on3_nil_rankings_page(html: str, backend: Optional[str] = None) -> pd.DataFrame:
+    """
+    Parse the On3 NIL valuations rankings HTML into a player-level DataFrame.
+
+    For each visible player row, attempts to extract:
+      - rank
+      - position
+      - player_name
+      - player_href (relative URL)
+      - team_name   (from team avatar img alt, e.g. "Texas Longhorns Avatar")
+      - nil_valuation_str  (e.g. "$5.3M")
+      - nil_valuation_dollars (float)
+
+    backend: "bs4" or "lxml" (default PARSER_BACKEND); both return the same frame.
+    """
+    backend = backend or PARSER_BACKEND
+    if backend not in PARSERS:
+        raise ValueError(f"Unknown parser backend {backend!r}; expected one of {sorted(PARSERS)}.")
+    records = PARSERS[backend](html)
 
     df = pd.DataFrame(records)
+    if not df.empty:
+        df["nil_valuation_dollars"] = parse_money_series(df["nil_valuation_str"], require_dollar=True)
     # Sort by rank if available, else by nil value
     if "rank" in df.columns and df["rank"].notna().any():
         df = df.sort_values("rank")
@@ -252,16 +369,204 @@ def summarize_by_team(players_df: pd.DataFrame) -> pd.DataFrame:
     return team_summary
 
 
+# -------------------------------------------------------------------
+# MULTI-PAGE CRAWL
+# -------------------------------------------------------------------
+
+# (sport, year); "" means the site default
+Variant = Tuple[str, str]
+PageKey = Tuple[str, str, int]
+
+
+def rankings_page_url(page: int, sport: str = "", year: str = "", template: Optional[str] = None) -> str:
+    """Fill the page URL template (default RANKINGS_PAGE_URL), dropping empty query params."""
+    url = (template or RANKINGS_PAGE_URL).format(page=page, sport=sport, year=year)
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if v]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def fetch_rankings_page(key: PageKey, session: requests.Session, template: Optional[str] = None) -> Optional[str]:
+    """Page HTML, or None past the last page (404)."""
+    sport, year, page = key
+    url = rankings_page_url(page, sport, year, template)
+    print(f"[HTTP] GET {url}")
+    resp = session.get(url, timeout=30)
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    return resp.text
+
+
+def parse_rankings_page(job: Tuple[PageKey, str, Optional[str]]) -> pd.DataFrame:
+    """Worker: parse one page and tag its rows with sport / year / page."""
+    (sport, year, page), html, backend = job
+    df = parse_on3_nil_rankings_page(html, backend=backend)
+    if not df.empty:
+        df.insert(0, "page", page)
+        df.insert(0, "year", year)
+        df.insert(0, "sport", sport)
+    return df
+
+
+class TeamAccumulator:
+    """
+    summarize_by_team() maintained page by page: running per-team player
+    names, sum, count and max. A player (by URL) counts once however many
+    pages or variants list them.
+    """
+
+    def __init__(self):
+        self.seen_urls: set = set()
+        self._teams: Dict[str, list] = {}   # team → [names, total, count, max]
+
+    def add(self, players_df: pd.DataFrame) -> None:
+        cols = ["player_url", "team_name", "player_name", "nil_valuation_dollars"]
+        for url, team, name, value in players_df[cols].itertuples(index=False, name=None):
+            if pd.isna(team) or pd.isna(value):
+                continue
+            # Marked seen only once counted, so a later listing with a team / value still counts
+            if url:
+                if url in self.seen_urls:
+                    continue
+                self.seen_urls.add(url)
+            t = self._teams.setdefault(team, [set(), 0.0, 0, -math.inf])
+            if not pd.isna(name):
+                t[0].add(name)
+            t[1] += value
+            t[2] += 1
+            t[3] = max(t[3], value)
+
+    def frame(self) -> pd.DataFrame:
+        rows = [
+            {
+                "team_name": team,
+                "players_count": len(names),
+                "total_nil_valuation": total,
+                "avg_nil_valuation": total / count,
+                "max_nil_valuation": vmax,
+            }
+            for team, (names, total, count, vmax) in sorted(self._teams.items())
+        ]
+        cols = ["team_name", "players_count", "total_nil_valuation", "avg_nil_valuation", "max_nil_valuation"]
+        return pd.DataFrame(rows, columns=cols).sort_values("total_nil_valuation", ascending=False)
+
+
+def _write_csv_atomic(df: pd.DataFrame, path: str) -> None:
+    tmp = path + ".tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def crawl_rankings(
+    variants: List[Variant],
+    session: requests.Session,
+    max_pages: int = CRAWL_MAX_PAGES,
+    workers: int = PARSE_WORKERS,
+    backend: Optional[str] = None,
+    players_out: str = PLAYERS_ALL_CSV,
+    teams_out: str = TEAMS_ALL_CSV,
+    page_url: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Crawl every page of every variant; returns the team summary.
+
+    Works in windows of CRAWL_IN_FLIGHT pages per active variant. Each page
+    is handed to the parse pool as soon as it downloads; parsed pages are
+    then appended to players_out in (variant, page) order. A variant ends at
+    its first page that 404s or has no player rows (later pages of that
+    window are discarded). Pages that still fail to download after retries,
+    or fail to parse, are reported and skipped. page_url overrides the
+    RANKINGS_PAGE_URL template.
+    """
+    for path in (players_out, teams_out):
+        if os.path.exists(path):
+            os.remove(path)
+
+    next_page: Dict[Variant, int] = {v: 1 for v in variants}
+    teams = TeamAccumulator()
+    rows_written = 0
+    failed: Dict[PageKey, Exception] = {}
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while next_page:
+            keys = [
+                (sport, year, p)
+                for (sport, year), start in next_page.items()
+                for p in range(start, min(start + CRAWL_IN_FLIGHT, max_pages + 1))
+            ]
+            parsed: Dict[PageKey, Any] = {}
+            for key, html, err in fetch_concurrent(
+                keys,
+                lambda k: fetch_rankings_page(k, session, page_url),
+                rate=CRAWL_RATE,
+                max_in_flight=CRAWL_IN_FLIGHT,
+                retries=CRAWL_RETRIES,
+                backoff=CRAWL_BACKOFF,
+            ):
+                if err is not None:
+                    print(f"[WARN] Page {key} failed: {err}")
+                    failed[key] = err
+                elif html is None:
+                    parsed[key] = None
+                else:
+                    # Without a pool the job is parsed inline below
+                    job = (key, html, backend)
+                    parsed[key] = pool.submit(parse_rankings_page, job) if pool else job
+
+            ended = set()
+            for key in sorted(parsed):
+                variant = key[:2]
+                if variant in ended:
+                    continue
+                df = parsed[key]
+                if df is not None:
+                    try:
+                        df = df.result() if pool else parse_rankings_page(df)
+                    except Exception as e:
+                        print(f"[WARN] Page {key} could not be parsed: {e!r}")
+                        failed[key] = e
+                        continue
+                if df is None or df.empty:
+                    print(f"[CRAWL] {variant} ends before page {key[2]}.")
+                    ended.add(variant)
+                    continue
+                df.to_csv(players_out, mode="a", header=rows_written == 0, index=False)
+                rows_written += len(df)
+                teams.add(df)
+
+            _write_csv_atomic(teams.frame(), teams_out)
+            print(f"[CRAWL] {rows_written:,} player rows, {len(teams.seen_urls):,} distinct players so far.")
+
+            for variant in list(next_page):
+                next_page[variant] += CRAWL_IN_FLIGHT
+                if variant in ended:
+                    del next_page[variant]
+                elif next_page[variant] > max_pages:
+                    print(f"[WARN] {variant} reached max_pages={max_pages}; stopping there.")
+                    del next_page[variant]
+    finally:
+        if pool:
+            pool.shutdown()
+
+    if failed:
+        print(f"[WARN] {len(failed)} pages failed to download or parse: {sorted(failed)}")
+    print(f"[OK] Crawled {rows_written:,} player rows → {players_out}")
+    print(f"[OK] Team summary → {teams_out}")
+    return teams.frame()
+
+
 # -------------------------------------------------------------------
 # MAIN
 # -------------------------------------------------------------------
 
-def main():
+def main(parser_backend: Optional[str] = None):
     # 1) Fetch NIL rankings HTML (college by default)
     html = fetch_html(RANKINGS_URL)
 
     # 2) Parse into player-level NIL table
-    players_df = parse_on3_nil_rankings_page(html)
+    players_df = parse_on3_nil_rankings_page(html, backend=parser_backend)
 
     players_out = os.path.join(PROCESSED_DIR, "on3_nil_players_sample.csv")
     players_df.to_csv(players_out, index=False)
@@ -280,5 +585,34 @@ def main():
         print(team_df.head(15))
 
 
+def main_crawl(sports: List[str], years: List[str], max_pages: int, parser_backend: Optional[str] = None,
+               page_url: Optional[str] = None):
+    variants = list(itertools.product(sports or [""], years or [""]))
+    session = make_session(pool_size=CRAWL_IN_FLIGHT, headers=HEADERS)
+    team_df = crawl_rankings(variants, session, max_pages=max_pages, backend=parser_backend, page_url=page_url)
+
+    print("\n=== Top 15 Teams by Total NIL Valuation (All Pages) ===")
+    with pd.option_context("display.max_rows", 15, "display.max_columns", None):
+        print(team_df.head(15))
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape the On3 NIL valuations rankings page.")
+    parser.add_argument("--parser", choices=sorted(PARSERS), default=PARSER_BACKEND,
+                        help=f"HTML parser backend (default: {PARSER_BACKEND}; env ON3_HTML_PARSER).")
+    parser.add_argument("--crawl", action="store_true",
+                        help="Walk every rankings page instead of only the first.")
+    parser.add_argument("--sport", action="append", default=[],
+                        help="Sport variant to crawl (repeatable; default: site default).")
+    parser.add_argument("--year", action="append", default=[],
+                        help="Year variant to crawl (repeatable; default: site default).")
+    parser.add_argument("--max-pages", type=int, default=CRAWL_MAX_PAGES,
+                        help=f"Per-variant page cap in crawl mode (default {CRAWL_MAX_PAGES}).")
+    parser.add_argument("--page-url", default=RANKINGS_PAGE_URL,
+                        help="Crawl page URL template with {page}, {sport}, {year}; the default sport / year "
+                             "params are assumed, not confirmed (env ON3_RANKINGS_PAGE_URL).")
+    args = parser.parse_args()
+    if args.crawl:
+        main_crawl(args.sport, args.year, args.max_pages, parser_backend=args.parser, page_url=args.page_url)
+    else:
+        main(parser_backend=args.parser)
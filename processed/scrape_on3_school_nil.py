@@ -1,19 +1,65 @@
 #!/usr/bin/env python3
+"""
+Scrape On3 NIL player valuations out of the Next.js chunks of the
+rankings page.
+
+Chunk pipeline:
+    ✔ Chunk files are immutable (content-hashed filenames), so each one is
+      cached on disk under data/processed/on3_chunk_cache/ and only chunks
+      not seen before are downloaded
+    ✔ Downloads run concurrently over one pooled session (fetch_engine.py)
+    ✔ Each chunk is scanned in a process pool as soon as it is on disk,
+      so the CPU-bound JSON scan uses every core while downloads continue
+
+Player extraction:
+    ✔ Decoded JSON is walked with an explicit stack (no recursion limit),
+      never descending into scalars or a player's own attribute objects
+    ✔ Players are deduplicated by id / fullName as they are found and
+      streamed straight into on3_nil_players.json
+
+Environment:
+    ON3_NIL_PAGE_URL      rankings page (point at a local stub server)
+    ON3_CHUNK_CACHE       chunk cache directory ("" disables the cache)
+    ON3_MAX_IN_FLIGHT     concurrent chunk downloads   (default 8)
+    ON3_SCAN_WORKERS      scan processes               (default: all cores)
+"""
+
+import hashlib
+import os
 import re
 import json
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
 import requests
 from bs4 import BeautifulSoup
 
-BASE_URL = "https://www.on3.com/nil/rankings/player/nil-valuations/"
+from fetch_engine import fetch_concurrent, make_session
+from js_json_scan import JsonObjectScanner
+
+BASE_URL = os.environ.get("ON3_NIL_PAGE_URL", "https://www.on3.com/nil/rankings/player/nil-valuations/")
 HEADERS = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"}
 
+CHUNK_CACHE_DIR = os.environ.get("ON3_CHUNK_CACHE", os.path.join("data", "processed", "on3_chunk_cache"))
+MAX_IN_FLIGHT = int(os.environ.get("ON3_MAX_IN_FLIGHT", 8))
+CHUNK_RATE = 20.0      # requests / second — chunks are static CDN files
+RETRIES = 2
+OUTPUT_PATH = "on3_nil_players.json"
+SCAN_WORKERS = int(os.environ.get("ON3_SCAN_WORKERS", 0)) or os.cpu_count() or 1
+
+# Next.js chunk names end in a hex content hash (framework-2c79e2a64abdb08b.js);
+# only those are safe to cache forever.
+_HASHED_CHUNK_RE = re.compile(r"[-.][0-9a-f]{8,}\.js$")
+
 
 # -----------------------------------------------------------
 # Extract ALL JS chunk URLs from the page
 # -----------------------------------------------------------
-def get_all_chunks():
+def get_all_chunks(session: requests.Session = None):
     print("[INFO] Fetching NIL valuations page…")
-    html = requests.get(BASE_URL, headers=HEADERS).text
+    getter = session.get if session is not None else requests.get
+    html = getter(BASE_URL, headers=HEADERS, timeout=30).text
     soup = BeautifulSoup(html, "html.parser")
 
     chunk_urls = []
@@ -21,111 +67,274 @@ def get_all_chunks():
     for s in soup.find_all("script", src=True):
         src = s["src"]
         if "/_next/static/chunks/" in src:
-            url = "https://www.on3.com" + src if src.startswith("/") else src
-            chunk_urls.append(url)
+            chunk_urls.append(urljoin(BASE_URL, src))
 
+    chunk_urls = list(dict.fromkeys(chunk_urls))   # a chunk can be referenced twice
     print(f"[INFO] Found {len(chunk_urls)} JS chunks")
     return chunk_urls
 
 
 # -----------------------------------------------------------
-# Robust JSON extractor (nesting-aware)
+# Chunk cache (immutable, content-hashed files)
 # -----------------------------------------------------------
-def extract_json_objects(js_text):
-    objs = []
-    depth = 0
-    start = None
-
-    for i, char in enumerate(js_text):
-        if char == "{":
-            if depth == 0:
-                start = i
-            depth += 1
-        elif char == "}":
-            depth -= 1
-            if depth == 0 and start is not None:
-                objs.append(js_text[start:i+1])
-                start = None
-
-    return objs
+def chunk_cache_path(url, cache_dir=CHUNK_CACHE_DIR):
+    """Cache file for a chunk URL, or None if the chunk is not content-hashed."""
+    path = urlsplit(url).path
+    if not cache_dir or not _HASHED_CHUNK_RE.search(path):
+        return None
+    name = path.rsplit("/_next/static/chunks/", 1)[-1].replace("/", "__")
+    # Prefixed with a hash of the URL so equal names on other hosts never collide
+    key = hashlib.sha1(url.split("?", 1)[0].encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{key}_{name}")
+
+
+def download_chunk(url, session, cache_dir=CHUNK_CACHE_DIR):
+    """Fetch one chunk and store it; returns the path it was written to."""
+    r = session.get(url, headers=HEADERS, timeout=30)
+    r.raise_for_status()
+    path = chunk_cache_path(url, cache_dir)
+    if path is None:
+        # Not cacheable: scratch copy, overwritten on the next run
+        scratch = os.path.join(cache_dir or tempfile.gettempdir(), "_uncached")
+        path = os.path.join(scratch, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".js")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(r.text)
+    os.replace(tmp, path)
+    return path
+
+
+# extract_players() only keeps dicts with a "valuation" key, so only spans
+# containing it are worth parsing (see js_json_scan.py)
+PLAYER_KEYS = ["valuation"]
 
 
 # -----------------------------------------------------------
-# Identify the NIL dataset JSON
+# Extract all player objects (iterative, pruned)
 # -----------------------------------------------------------
-def looks_like_player_json(js):
-    # Key NIL indicators
-    keys = ["valuation", "athlete", "fullName", "rank", "team", "sport"]
-
-    return any(k in js for k in keys)
+# Keys of a player dict whose values describe that one athlete (valuation,
+# image, position, sport, home state / town, commitment status, ratings)
+# and never hold other players. Only pruned inside player dicts: elsewhere
+# keys like "state" hold page data (react-query's dehydrated state).
+PRUNE_KEYS = frozenset({
+    "valuation", "image", "position", "sport", "defaultSport",
+    "state", "hometown", "status", "rating", "rosterRating",
+})
+
+
+def is_player(x):
+    # Heuristic: dict with valuation fields
+    return "valuation" in x and ("fullName" in x or "athlete" in x)
+
+
+def player_key(p):
+    """Dedup key: id, else fullName; None means the player is never deduplicated."""
+    return p.get("id", p.get("fullName"))
+
+
+def iter_players(node, seen=None, prune_keys=PRUNE_KEYS):
+    """
+    Yield every player dict under node, in document (pre-)order.
+
+    Walks with an explicit stack, so payload depth is not bounded by the
+    recursion limit. Scalars (including scalar-only lists) are never pushed,
+    and a player's prune_keys subtrees are skipped. When seen is a set,
+    players whose key is already in it are skipped and new keys are added.
+    """
+    stack = [node]
+    pop, push = stack.pop, stack.append
+    while stack:
+        x = pop()
+        # Children are pushed last-to-first so the first one is popped first
+        if type(x) is dict:
+            if is_player(x):
+                key = player_key(x) if seen is not None else None
+                if key is None:
+                    yield x
+                elif key not in seen:
+                    seen.add(key)
+                    yield x
+                for k, v in reversed(x.items()):
+                    if k not in prune_keys and (type(v) is dict or type(v) is list):
+                        push(v)
+            else:
+                for v in reversed(x.values()):
+                    if type(v) is dict or type(v) is list:
+                        push(v)
+        elif type(x) is list:
+            for v in reversed(x):
+                if type(v) is dict or type(v) is list:
+                    push(v)
+
+
+def extract_players(node, prune_keys=PRUNE_KEYS):
+    return list(iter_players(node, prune_keys=prune_keys))
+
+
+class PlayerWriter:
+    """
+    Stream players into a JSON array file (same layout as json.dump(..., indent=2)),
+    skipping players whose id / fullName was already written. The file is
+    written under a temporary name and moved into place on close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.seen = set()
+        self.written = 0
+        self.duplicates = 0
+        self._tmp = f"{path}.tmp"
+        self._f = open(self._tmp, "w", encoding="utf-8")
+        self._f.write("[")
+
+    def add(self, player):
+        key = player_key(player)
+        if key is not None:
+            if key in self.seen:
+                self.duplicates += 1
+                return False
+            self.seen.add(key)
+        self._f.write(",\n  " if self.written else "\n  ")
+        self._f.write(json.dumps(player, indent=2).replace("\n", "\n  "))
+        self.written += 1
+        return True
+
+    def close(self):
+        self._f.write("\n]" if self.written else "]")
+        self._f.close()
+        os.replace(self._tmp, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._f.close()
+            os.remove(self._tmp)
 
 
 # -----------------------------------------------------------
-# Recursively extract all player objects
+# Chunk scan (runs in a worker process)
 # -----------------------------------------------------------
-def extract_players(node):
-    players = []
-
-    def walk(x):
-        if isinstance(x, dict):
-            # Heuristic: dict with valuation fields
-            if "valuation" in x and ("fullName" in x or "athlete" in x):
-                players.append(x)
-
-            for v in x.values():
-                walk(v)
+def scan_chunk(path):
+    """
+    Scan one chunk file → (json candidates, players, spans parsed, parse failures).
+    Takes a path rather than the text so only the players cross the process boundary.
+    """
+    with open(path, encoding="utf-8") as f:
+        js = f.read()
+    scanner = JsonObjectScanner(PLAYER_KEYS)
+    json_objects = scanner.scan(js)
+    seen = set()   # a chunk often carries the same players twice (inline + JSON.parse)
+    players = [p for data in json_objects for p in iter_players(data, seen)]
+    return len(json_objects), players, scanner.spans_parsed, scanner.parse_failures
+
+
+def scan_chunks(chunk_urls, session, cache_dir=CHUNK_CACHE_DIR, workers=SCAN_WORKERS):
+    """
+    Download (or read from the cache) and scan every chunk.
+
+    Cached chunks are queued for scanning straight away; new chunks are
+    queued as each download lands. A chunk that fails to download or scan
+    is skipped. Returns ({url: scan_chunk() result} in chunk_urls order,
+    {url: download or scan error}).
+    """
+    cached, to_fetch = {}, []
+    for url in chunk_urls:
+        path = chunk_cache_path(url, cache_dir)
+        if path is not None and os.path.exists(path):
+            cached[url] = path
+        else:
+            to_fetch.append(url)
+    print(f"[INFO] {len(cached)} chunks cached, {len(to_fetch)} to download")
+
+    errors = {}
+    results = {}
+    pending = {}
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def scan_failed(url, path, err):
+        print(f"[WARN] Chunk scan failed: {url} ({err!r})")
+        errors[url] = err
+        # Drop the file so a re-run downloads the chunk again instead of rescanning it
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    try:
+        def submit(url, path):
+            if pool:
+                pending[url] = (path, pool.submit(scan_chunk, path))
+                return
+            try:
+                results[url] = scan_chunk(path)
+            except Exception as e:
+                scan_failed(url, path, e)
+
+        for url, path in cached.items():
+            submit(url, path)
+        for url, path, err in fetch_concurrent(
+            to_fetch,
+            lambda u: download_chunk(u, session, cache_dir),
+            rate=CHUNK_RATE,
+            max_in_flight=MAX_IN_FLIGHT,
+            retries=RETRIES,
+        ):
+            if err is not None:
+                print(f"[WARN] Chunk download failed: {url} ({err})")
+                errors[url] = err
+                continue
+            print(f"[INFO] Downloaded chunk: {url}")
+            submit(url, path)
 
-        elif isinstance(x, list):
-            for item in x:
-                walk(item)
+        for url, (path, fut) in pending.items():
+            try:
+                results[url] = fut.result()
+            except Exception as e:
+                scan_failed(url, path, e)
+    finally:
+        if pool:
+            pool.shutdown()
 
-    walk(node)
-    return players
+    return {url: results[url] for url in chunk_urls if url in results}, errors
 
 
 # -----------------------------------------------------------
 # MAIN SCRAPER
 # -----------------------------------------------------------
 def main():
-    chunk_urls = get_all_chunks()
-
-    all_players = []
-
-    for url in chunk_urls:
-        print(f"[INFO] Downloading chunk: {url}")
-        js = requests.get(url, headers=HEADERS).text
+    session = make_session(pool_size=MAX_IN_FLIGHT, headers=HEADERS)
+    chunk_urls = get_all_chunks(session)
 
-        json_candidates = extract_json_objects(js)
-        print(f"  → {len(json_candidates)} JSON candidates")
+    results, errors = scan_chunks(chunk_urls, session)
 
-        for cand in json_candidates:
-            if not looks_like_player_json(cand):
-                continue
+    if errors:
+        print(f"[WARN] {len(errors)} chunks could not be downloaded or scanned; re-run to retry them.")
 
-            try:
-                data = json.loads(cand)
-            except Exception:
-                continue
-
-            players = extract_players(data)
-            if players:
-                print(f"[SUCCESS] Found {len(players)} NIL players in {url}")
-                all_players.extend(players)
-
-    if not all_players:
+    if not any(players for _, players, _, _ in results.values()):
         print("[ERROR] No NIL players found across all chunks.")
         return
 
-    # Deduplicate by id/fullName
-    unique = {p.get("id", p.get("fullName", str(i))): p for i, p in enumerate(all_players)}
+    spans_parsed = parse_failures = 0
 
-    print(f"[INFO] Total unique players extracted: {len(unique)}")
+    # Deduplicate by id/fullName while streaming to disk (first occurrence wins)
+    with PlayerWriter(OUTPUT_PATH) as out:
+        for url, (n_candidates, players, parsed, failed) in results.items():
+            spans_parsed += parsed
+            parse_failures += failed
+            if players:
+                print(f"[SUCCESS] Found {len(players)} NIL players in {url} ({n_candidates} JSON candidates)")
+            for p in players:
+                out.add(p)
 
-    # Save output
-    with open("on3_nil_players.json", "w") as f:
-        json.dump(list(unique.values()), f, indent=2)
+    print(f"[INFO] Total unique players extracted: {out.written} "
+          f"({out.duplicates} duplicates, {spans_parsed} spans parsed, {parse_failures} failed)")
 
-    print("[DONE] Saved → on3_nil_players.json")
+    print(f"[DONE] Saved → {OUTPUT_PATH}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+team_matcher.py
+==================================================
+Blocked, bulk fuzzy matching of NIL team names → IPEDS institutions.
+
+Calling process.extractOne per team scores every team against every IPEDS
+name (~6,250), so cost grows with teams × institutions. TeamMatcher builds
+a token inverted index over the (cleaned) IPEDS names once, and restricts
+each team to the institutions it shares a selective token with:
+
+  - blocks: one per token; tokens found in more than `max_block` names
+    ("state", "community", "of", …) are too common to block on and are
+    only used when a team has no other indexed token
+  - teams with no indexed token at all (typos, abbreviations), teams with
+    fewer than `min_block` blocked candidates, and blocked teams whose
+    best score is below `rescore_below` (85, the mapping threshold) are
+    scored against every institution instead
+
+Every block is scored in bulk with rapidfuzz.process.cdist (workers=-1, all
+cores). Scores are merged per (team, institution) and the top-k per team
+are returned, best first, ties broken by lower institution index.
+
+Blocking is not guaranteed to give extractOne's answer: WRatio's partial
+matching can rank a name that shares no selective token with the team
+above everything in its blocks ("dayton" → "daytona" over "dayton barber",
+"sacramento state" → "enterprise state community" over "california state
+sacramento"). Fully scanned teams get extractOne's answer; with
+min_block >= len(choices) every team is fully scanned.
+bench_team_matcher.py reports how many blocked mappings differ.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import process, fuzz
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+MAX_BLOCK = 300          # tokens in more names than this are not used for blocking
+MIN_BLOCK = 0            # teams with fewer blocked candidates than this get a full scan
+RESCORE_BELOW = 85       # blocked teams whose best score is below this get a full scan
+FULL_SCAN_CHUNK = 512    # teams per cdist call in the full-scan fallback
+
+
+class TeamMatcher:
+    """Token-blocked index over a fixed list of choice names."""
+
+    def __init__(
+        self,
+        choices: Sequence[str],
+        max_block: int = MAX_BLOCK,
+        min_block: int = MIN_BLOCK,
+        scorer=fuzz.WRatio,
+    ):
+        self.choices = list(choices)
+        self.max_block = max_block
+        self.min_block = min_block
+        self.scorer = scorer
+        self.pairs_scored = 0
+
+        index: Dict[str, List[int]] = defaultdict(list)
+        for i, name in enumerate(self.choices):
+            for tok in set(name.split()):
+                index[tok].append(i)
+        self.index = {tok: np.asarray(rows, dtype=np.int64) for tok, rows in index.items()}
+
+    def _blocking_tokens(self, name: str) -> List[str]:
+        """Indexed tokens of `name`, selective ones only unless none are selective."""
+        toks = [t for t in set(name.split()) if t in self.index]
+        selective = [t for t in toks if len(self.index[t]) <= self.max_block]
+        return selective or toks
+
+    def _score(self, queries: List[str], q_idx: np.ndarray, c_idx: np.ndarray,
+               score_cutoff: float, workers: int, out: list) -> None:
+        """cdist one block and append (query, choice, score) triples above the cutoff."""
+        if not len(q_idx) or not len(c_idx):
+            return
+        scores = process.cdist(
+            [queries[i] for i in q_idx],
+            [self.choices[j] for j in c_idx],
+            scorer=self.scorer,
+            dtype=np.float64,
+            workers=workers,
+            score_cutoff=score_cutoff,
+        )
+        self.pairs_scored += scores.size
+        qi, cj = np.nonzero(scores >= score_cutoff)
+        out.append((q_idx[qi], c_idx[cj], scores[qi, cj]))
+
+    def match(
+        self,
+        queries: Sequence[str],
+        top_k: int = 3,
+        score_cutoff: float = 0,
+        workers: int = -1,
+        rescore_below: float = RESCORE_BELOW,
+    ) -> pd.DataFrame:
+        """
+        Top-k matches per query.
+
+        Returns one row per (query, rank) with columns
+        query_idx, query, rank, choice_idx, choice, score.
+        Queries with nothing above `score_cutoff` have no rows.
+        Blocked queries whose best score is below `rescore_below` are
+        re-scored against every choice.
+        """
+        queries = list(queries)
+
+        # Group queries by token block; queries without any indexed token, or
+        # with fewer than min_block candidates, scan everything
+        blocks: Dict[str, List[int]] = defaultdict(list)
+        full_scan: List[int] = []
+        for qi, name in enumerate(queries):
+            toks = self._blocking_tokens(name)
+            if not toks or sum(len(self.index[t]) for t in toks) < self.min_block:
+                full_scan.append(qi)
+                continue
+            for tok in toks:
+                blocks[tok].append(qi)
+
+        hits: list = []
+        for tok, q_list in blocks.items():
+            self._score(queries, np.asarray(q_list), self.index[tok], score_cutoff, workers, hits)
+
+        # Blocked queries whose best score is below rescore_below: the block may
+        # have missed a better name, so drop their block hits and scan everything
+        best = np.full(len(queries), -1.0)
+        for hq, _, hs in hits:
+            np.maximum.at(best, hq, hs)
+        blocked = np.zeros(len(queries), dtype=bool)
+        blocked[[qi for q_list in blocks.values() for qi in q_list]] = True
+        rescore = blocked & (best < rescore_below)
+        if rescore.any():
+            hits = [(hq[~rescore[hq]], hc[~rescore[hq]], hs[~rescore[hq]]) for hq, hc, hs in hits]
+            full_scan.extend(np.flatnonzero(rescore).tolist())
+
+        all_choices = np.arange(len(self.choices))
+        for start in range(0, len(full_scan), FULL_SCAN_CHUNK):
+            self._score(queries, np.asarray(full_scan[start:start + FULL_SCAN_CHUNK]),
+                        all_choices, score_cutoff, workers, hits)
+
+        columns = ["query_idx", "query", "rank", "choice_idx", "choice", "score"]
+        if not hits:
+            return pd.DataFrame(columns=columns)
+
+        q, c, s = (np.concatenate(parts) for parts in zip(*hits))
+        result = (
+            pd.DataFrame({"query_idx": q, "choice_idx": c, "score": s})
+            .drop_duplicates(["query_idx", "choice_idx"])
+            .sort_values(["query_idx", "score", "choice_idx"], ascending=[True, False, True])
+        )
+        result = result.groupby("query_idx", sort=False).head(top_k)
+        result["rank"] = result.groupby("query_idx", sort=False).cumcount() + 1
+        result["query"] = [queries[i] for i in result["query_idx"]]
+        result["choice"] = [self.choices[j] for j in result["choice_idx"]]
+        return result[columns].reset_index(drop=True)
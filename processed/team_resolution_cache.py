@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+team_resolution_cache.py
+==================================================
+Persistent NIL team → IPEDS resolution cache with manual overrides.
+
+nil_institution_extract.py used to fuzzy-match every team on every run and
+overwrite the mapping CSV, losing any manual QA. Resolutions now live in:
+
+  nil_team_resolution_cache.csv   (managed, one row per (team, candidate rank))
+      team_name_clean, rank, candidate_school_clean, match_score, unitid,
+      iped_school_original, ipeds_year, ipeds_fingerprint
+      Teams scored with no candidate above the cutoff keep a single rank-1
+      row with an empty candidate, so they are not re-scored either.
+
+  nil_team_overrides.csv          (hand-edited, never written by the pipeline)
+      team_name_clean, unitid, note
+      An override wins over any fuzzy match. An empty unitid pins the team
+      as unmatched.
+
+Cache entries are keyed on team_name_clean + IPEDS year, and stamped with a
+fingerprint of the IPEDS directory (unitid + cleaned name). When the
+directory changes, every entry built against the old one is dropped, since
+any team's best match may have moved; overrides are kept.
+"""
+
+import hashlib
+import os
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+CACHE_COLUMNS = [
+    "team_name_clean", "rank", "candidate_school_clean", "match_score", "unitid",
+    "iped_school_original", "ipeds_year", "ipeds_fingerprint",
+]
+OVERRIDE_COLUMNS = ["team_name_clean", "unitid", "note"]
+
+
+def ipeds_fingerprint(unitids: Iterable, names_clean: Iterable) -> str:
+    """Order-independent hash of the (unitid, cleaned name) pairs in an IPEDS directory."""
+    pairs = sorted(f"{u}\t{n}" for u, n in zip(unitids, names_clean))
+    return hashlib.sha1("\n".join(pairs).encode("utf-8")).hexdigest()[:16]
+
+
+def _write_atomic(df: pd.DataFrame, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def load_overrides(path: str) -> pd.DataFrame:
+    """Manual overrides; an empty frame when the file does not exist yet."""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=OVERRIDE_COLUMNS)
+    df = pd.read_csv(path, dtype={"team_name_clean": str})
+    missing = set(OVERRIDE_COLUMNS[:2]) - set(df.columns)
+    if missing:
+        raise ValueError(f"Overrides file {path} is missing columns: {sorted(missing)}")
+    df["unitid"] = pd.to_numeric(df["unitid"], errors="coerce").astype("Int64")
+    return df.drop_duplicates("team_name_clean", keep="last")
+
+
+class ResolutionCache:
+    """Cached fuzzy-match candidates for one IPEDS year + directory fingerprint."""
+
+    def __init__(self, path: str, ipeds_year: int, fingerprint: str):
+        self.path = path
+        self.ipeds_year = int(ipeds_year)
+        self.fingerprint = fingerprint
+        self.invalidated = 0
+
+        if os.path.exists(path):
+            rows = pd.read_csv(path, dtype={"team_name_clean": str, "ipeds_fingerprint": str})
+            valid = (rows["ipeds_year"] == self.ipeds_year) & (rows["ipeds_fingerprint"] == fingerprint)
+            self.invalidated = rows.loc[~valid, "team_name_clean"].nunique()
+            self.rows = rows[valid].reset_index(drop=True)
+        else:
+            self.rows = pd.DataFrame(columns=CACHE_COLUMNS)
+        self.rows["unitid"] = self.rows["unitid"].astype("Int64")
+
+    def _known(self) -> set:
+        return set(self.rows["team_name_clean"])
+
+    def unseen(self, teams: Iterable[str]) -> List[str]:
+        known = self._known()
+        return [t for t in teams if t not in known]
+
+    def add(self, teams: Iterable[str], candidates: pd.DataFrame) -> None:
+        """
+        Record freshly scored `teams`. `candidates` uses the cache columns
+        (minus the ipeds_* stamps); teams absent from it are cached as unmatched.
+        """
+        teams = list(teams)
+        scored = set(candidates["team_name_clean"]) if len(candidates) else set()
+        empty = pd.DataFrame({"team_name_clean": [t for t in teams if t not in scored], "rank": 1})
+        fresh = pd.concat([candidates, empty], ignore_index=True)
+        fresh["ipeds_year"] = self.ipeds_year
+        fresh["ipeds_fingerprint"] = self.fingerprint
+        fresh["unitid"] = fresh["unitid"].astype("Int64")
+
+        stale = self.rows["team_name_clean"].isin(teams)
+        self.rows = pd.concat([self.rows[~stale], fresh[CACHE_COLUMNS]], ignore_index=True)
+
+    def candidates(self, teams: Iterable[str]) -> pd.DataFrame:
+        """Cached candidate rows for `teams` (placeholder rows for unmatched teams included)."""
+        return self.rows[self.rows["team_name_clean"].isin(set(teams))].reset_index(drop=True)
+
+    def save(self) -> None:
+        _write_atomic(self.rows.sort_values(["team_name_clean", "rank"]), self.path)
+
+
+def apply_overrides(mapping_df: pd.DataFrame, overrides: pd.DataFrame, teams: Iterable[str],
+                    ipeds: pd.DataFrame, name_col: str) -> pd.DataFrame:
+    """
+    Apply manual overrides for `teams` on top of the fuzzy mapping table
+    (team_name_clean, matched_school_clean, match_score, unitid,
+    iped_school_original). Rows gain source = "fuzzy" or "override".
+    """
+    mapping_df = mapping_df.assign(source="fuzzy")
+    ov = overrides[overrides["team_name_clean"].isin(set(teams))]
+    if ov.empty:
+        return mapping_df
+
+    by_unitid = ipeds.drop_duplicates("unitid").set_index("unitid")
+    unknown = ov["unitid"].notna() & ~ov["unitid"].isin(by_unitid.index)
+    if unknown.any():
+        print(f"[WARN] {unknown.sum()} override(s) point at unitids not in this IPEDS directory; ignored: "
+              f"{ov.loc[unknown, 'team_name_clean'].tolist()}")
+        ov = ov[~unknown]
+
+    pinned = ov[ov["unitid"].notna()]
+    unitids = pinned["unitid"].astype("int64").to_numpy()
+    rows = pd.DataFrame({
+        "team_name_clean": pinned["team_name_clean"].to_numpy(),
+        "matched_school_clean": by_unitid.loc[unitids, "school_name_clean"].to_numpy(),
+        "match_score": np.nan,
+        "unitid": unitids,
+        "iped_school_original": by_unitid.loc[unitids, name_col].to_numpy(),
+        "source": "override",
+    })
+    kept = mapping_df[~mapping_df["team_name_clean"].isin(ov["team_name_clean"])]
+    return pd.concat([kept, rows], ignore_index=True)
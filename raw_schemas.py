@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+raw_schemas.py
+===========================================
+Schema registry for the raw CSV sources the ETL reads.
+
+Each RawSchema says which columns a pipeline actually uses and how to type
+them, so read_raw() can:
+
+  - parse only those columns (usecols), resolved against the file header
+    case-insensitively; columns a file lacks are simply absent, so the
+    pipelines' own "missing column" checks still apply
+  - skip dtype inference (explicit dtypes, low-cardinality text as category)
+  - keep FIPS codes as zero-padded strings instead of integers that lose
+    their leading zeros
+
+With pyarrow installed the file is parsed by pyarrow.csv directly, with
+the schema's column selection and Arrow types passed to the parser (pandas'
+engine="pyarrow" reads everything as inferred and casts afterwards, which
+is slower than the C engine on wide files like EADA).
+
+If a typed column holds a value its dtype cannot parse (e.g. "$1,200" in a
+money column), the read falls back to inferred dtypes for the same columns
+and the pipeline's own to_numeric coercion handles it.
+
+Config (env):
+  ETL_CSV_ENGINE   "pyarrow" (default when installed) or "c"
+"""
+
+import csv
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
+
+CSV_ENGINE = os.environ.get("ETL_CSV_ENGINE", "pyarrow" if pa is not None else "c")
+
+
+@dataclass(frozen=True)
+class RawSchema:
+    name: str
+    filename: str
+    columns: Sequence[str] = ()                            # exact (lower-cased) names to read
+    match: Sequence[str] = ()                              # plus any column containing one of these
+    dtypes: Mapping[str, str] = field(default_factory=dict)
+    match_dtype: Optional[str] = None                      # dtype of the `match` columns
+    categoricals: Sequence[str] = ()
+    fips: Mapping[str, int] = field(default_factory=dict)  # column → zero-pad width
+
+    @property
+    def path(self) -> str:
+        if "{" in self.filename:
+            raise ValueError(f"{self.name}: filename {self.filename!r} is a template; use path_for()")
+        return os.path.join(RAW_DIR, self.filename)
+
+    def path_for(self, **fields) -> str:
+        """Path of one file of a templated source, e.g. IPEDS_DIRECTORY.path_for(year=2022)."""
+        return os.path.join(RAW_DIR, self.filename.format(**fields))
+
+    def select(self, header: Sequence[str]) -> Dict[str, str]:
+        """Raw header names to read → their normalized (lower / stripped) names."""
+        wanted = set(self.columns)
+        selected = {}
+        for raw in header:
+            col = raw.lower().strip()
+            if col in wanted or any(m in col for m in self.match):
+                selected[raw] = col
+        return selected
+
+    def dtype_for(self, col: str) -> Optional[str]:
+        if col in self.fips:
+            return "str"
+        if col in self.categoricals:
+            return "category"
+        if col in self.dtypes:
+            return self.dtypes[col]
+        if self.match_dtype and any(m in col for m in self.match):
+            return self.match_dtype
+        return None
+
+
+# ============================================================
+# REGISTRY
+# ============================================================
+
+IPEDS_DIRECTORY = RawSchema(
+    name="ipeds_directory",
+    filename="ipeds_directory_{year}.csv",
+    columns=[
+        # Identity
+        "unitid", "inst_name", "institution_name",
+
+        # Geography
+        "state_abbr", "city", "county_name", "county_fips",
+        "latitude", "longitude",
+
+        # Urbanicity
+        "urban_centric_locale",
+
+        # Sector / control / level
+        "inst_control", "sector", "institution_level",
+        "degree_granting", "offering_undergrad", "offering_grad",
+
+        # Size & admin
+        "inst_size", "inst_system_flag", "inst_system_name",
+
+        # CBSA regioning
+        "cbsa", "cbsa_type", "csa",
+
+        # Carnegie 2021 classifications (very important for segmentation)
+        "cc_basic_2021",
+        "cc_instruc_undergrad_2021",
+        "cc_instruc_grad_2021",
+        "cc_undergrad_2021",
+        "cc_enroll_2021",
+        "cc_size_setting_2021",
+
+        # Nice-to-have URLs
+        "url_school", "url_application", "url_fin_aid",
+    ],
+    dtypes={
+        "unitid": "int64",
+        "inst_name": "str", "institution_name": "str", "city": "str", "county_name": "str",
+        "latitude": "float64", "longitude": "float64",
+        "inst_system_name": "str", "url_school": "str", "url_application": "str", "url_fin_aid": "str",
+        **{c: "int64" for c in [
+            "urban_centric_locale", "inst_control", "sector", "institution_level",
+            "degree_granting", "offering_undergrad", "offering_grad",
+            "inst_size", "inst_system_flag", "cbsa", "cbsa_type", "csa",
+            "cc_basic_2021", "cc_instruc_undergrad_2021", "cc_instruc_grad_2021",
+            "cc_undergrad_2021", "cc_enroll_2021", "cc_size_setting_2021",
+        ]},
+    },
+    categoricals=["state_abbr"],
+    fips={"county_fips": 5},
+)
+
+# Identity / enrollment columns plus every money column _eada_column_groups looks at
+EADA = RawSchema(
+    name="eada",
+    filename="EADA_2024.csv",
+    columns=[
+        "unitid", "institution_name", "inst_name", "school_name",
+        "state_abbr", "state", "state_cd",
+        "eftotalcount", "total_athletes",
+    ],
+    match=["revenue", "expense", "salary", "recruit"],
+    dtypes={"unitid": "int64", "institution_name": "str", "inst_name": "str", "school_name": "str",
+            "eftotalcount": "int64", "total_athletes": "int64"},
+    match_dtype="float64",
+    categoricals=["state_abbr", "state", "state_cd"],
+)
+
+FCC_MOBILE = RawSchema(
+    name="fcc_mobile",
+    filename="fcc_mobile_county.csv",
+    columns=[
+        "area_data_type", "geography_type", "geography_id", "geography_desc", "total_area",
+        "mobilebb_4g_area_st_pct", "mobilebb_5g_spd1_area_st_pct",
+    ],
+    dtypes={"geography_desc": "str", "total_area": "float64",
+            "mobilebb_4g_area_st_pct": "float64", "mobilebb_5g_spd1_area_st_pct": "float64"},
+    categoricals=["area_data_type", "geography_type"],
+    fips={"geography_id": 0},   # already zero-padded per geography level (state 2, county 5)
+)
+
+RAW_SCHEMAS: Dict[str, RawSchema] = {s.name: s for s in (IPEDS_DIRECTORY, EADA, FCC_MOBILE)}
+
+
+# ============================================================
+# READER
+# ============================================================
+
+def _read_header(path: str) -> List[str]:
+    # csv.reader on the first line; pd.read_csv(nrows=0) builds a Series per column (slow on EADA's 474)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+
+def _arrow_type(dtype: str):
+    return {
+        "int64": pa.int64(), "float64": pa.float64(), "str": pa.string(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+    }[dtype]
+
+
+def _read_arrow(path: str, usecols: List[str], dtypes: Dict[str, str]) -> pd.DataFrame:
+    convert = pa_csv.ConvertOptions(
+        include_columns=usecols,
+        column_types={raw: _arrow_type(dt) for raw, dt in dtypes.items()},
+        strings_can_be_null=True,   # empty text cells → NaN, as read_csv gives
+    )
+    return pa_csv.read_csv(path, convert_options=convert).to_pandas()
+
+
+def read_raw(schema: RawSchema, path: Optional[str] = None, engine: Optional[str] = None) -> pd.DataFrame:
+    """Read the schema's columns from `path` (default schema.path) with explicit dtypes."""
+    path = path or schema.path
+    engine = engine or CSV_ENGINE
+    header = _read_header(path)
+    selected = schema.select(header)
+    dtypes = {raw: dt for raw, col in selected.items() if (dt := schema.dtype_for(col))}
+    usecols = [raw for raw in header if raw in selected]   # file order, as a full read gives
+
+    try:
+        if engine == "pyarrow" and pa is not None:
+            df = _read_arrow(path, usecols, dtypes)
+        else:
+            df = pd.read_csv(path, usecols=usecols, dtype=dtypes)
+    except (ValueError, TypeError) as e:   # pa.ArrowInvalid is a ValueError
+        print(f"[WARN] {os.path.basename(path)} does not match the {schema.name} schema ({e}); "
+              "inferring dtypes.")
+        text = {raw: dt for raw, dt in dtypes.items() if dt == "str"}
+        df = pd.read_csv(path, usecols=usecols, dtype=text, low_memory=False)
+
+    if list(df.columns) != usecols:
+        df = df[usecols]
+    df.columns = [selected[raw] for raw in usecols]
+    for col, width in schema.fips.items():
+        if col in df.columns and width:
+            df[col] = df[col].str.zfill(width)
+    return df
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+urban_client.py
+===========================================
+Concurrent, disk-cached client for the Urban Institute Education Data API.
+
+The API pages results (`count`, `next`, `results`). Following `next` one
+page at a time with a fixed sleep is bound by round-trip latency, so
+UrbanClient:
+
+  1. fetches page 1 and reads `count` and the page size from it
+  2. fetches pages 2..N concurrently (`page=k`) on a bounded thread pool,
+     under a token-bucket rate limit, with retry + exponential backoff
+     (TokenBucket / retry_call / make_session from processed/fetch_engine.py)
+  3. caches every raw page response on disk, keyed by URL + params, and
+     reuses it until it is older than the TTL
+  4. yields rows in page order as DataFrame chunks, so the full result is
+     never held as one big list of dicts
+
+If the first response has no `count`, it falls back to following `next`
+serially (still cached and rate limited).
+
+Config (env):
+  URBAN_API_BASE        API root (point at a local stand-in server for tests)
+  URBAN_RATE_LIMIT      requests / second             (default 4)
+  URBAN_MAX_IN_FLIGHT   concurrent requests           (default 4)
+  URBAN_CACHE_TTL       page cache TTL in seconds     (default 7 days, 0 = off)
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from processed.fetch_engine import TokenBucket, make_session, retry_call
+
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "data", "raw", "urban_cache")
+
+URBAN_BASE = os.environ.get("URBAN_API_BASE", "https://educationdata.urban.org/api/v1")
+RATE_LIMIT = float(os.environ.get("URBAN_RATE_LIMIT", "4"))
+MAX_IN_FLIGHT = int(os.environ.get("URBAN_MAX_IN_FLIGHT", "4"))
+CACHE_TTL = float(os.environ.get("URBAN_CACHE_TTL", str(7 * 24 * 3600)))
+
+RETRIES = 3
+BACKOFF = 1.0
+CHUNK_ROWS = 50_000
+
+
+# ============================================================
+# CLIENT
+# ============================================================
+
+class UrbanClient:
+    """Paginated Urban API reads with concurrency, rate limiting, retry and a page cache."""
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        retries: int = RETRIES,
+        backoff: float = BACKOFF,
+        cache_dir: Optional[str] = CACHE_DIR,
+        ttl: float = CACHE_TTL,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.retries = retries
+        self.backoff = backoff
+        self.cache_dir = cache_dir if ttl > 0 else None
+        self.ttl = ttl
+        self.bucket = TokenBucket(rate)
+        self.requests_made = 0
+        self.cache_hits = 0
+        self._stats_lock = threading.Lock()
+
+        self.session = make_session(pool_size=self.max_in_flight)
+
+    # ---------------- cache ----------------
+
+    def _cache_path(self, url: str, params: Dict[str, Any]) -> str:
+        key = json.dumps([url, sorted(params.items())], default=str)
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _read_cache(self, path: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(path) or time.time() - os.path.getmtime(path) > self.ttl:
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, path: str, data: Dict[str, Any]) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    # ---------------- pages ----------------
+
+    def get_page(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """One API response (cached), retried with exponential backoff."""
+        params = dict(params or {})
+        path = self._cache_path(url, params) if self.cache_dir else None
+        if path:
+            cached = self._read_cache(path)
+            if cached is not None:
+                with self._stats_lock:
+                    self.cache_hits += 1
+                return cached
+
+        def _request() -> Dict[str, Any]:
+            self.bucket.acquire()
+            with self._stats_lock:
+                self.requests_made += 1
+            resp = self.session.get(url, params=params, timeout=60)
+            if resp.status_code != 200:
+                raise RuntimeError(f"Urban API error {resp.status_code}: {resp.text[:500]}")
+            return resp.json()
+
+        data = retry_call(_request, retries=self.retries, backoff=self.backoff)
+
+        if path:
+            self._write_cache(path, data)
+        return data
+
+    def iter_pages(self, url: str, params: Optional[Dict[str, Any]] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Yield each page's `results` in page order."""
+        params = dict(params or {})
+        first = self.get_page(url, params)
+        results = first.get("results", [])
+        yield results
+
+        count, page_size = first.get("count"), len(results)
+        if count is None or not page_size:
+            # No count to plan from: follow `next` links one by one
+            next_url = first.get("next")
+            while next_url:
+                data = self.get_page(next_url)
+                yield data.get("results", [])
+                next_url = data.get("next")
+            return
+
+        # Keep a bounded window of pages in flight / buffered, consumed in page order
+        pages = iter(range(2, math.ceil(count / page_size) + 1))
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            window = deque(
+                pool.submit(self.get_page, url, {**params, "page": p})
+                for p in islice(pages, 2 * self.max_in_flight)
+            )
+            while window:
+                fut = window.popleft()
+                page = next(pages, None)
+                if page is not None:
+                    window.append(pool.submit(self.get_page, url, {**params, "page": page}))
+                yield fut.result().get("results", [])
+
+    def iter_frames(self, url: str, params: Optional[Dict[str, Any]] = None,
+                    chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Rows as DataFrame chunks of roughly `chunk_rows`."""
+        buffer: List[Dict[str, Any]] = []
+        for rows in self.iter_pages(url, params):
+            buffer.extend(rows)
+            if len(buffer) >= chunk_rows:
+                yield pd.DataFrame(buffer)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer)
+
+    def fetch_frame(self, url: str, params: Optional[Dict[str, Any]] = None,
+                    chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+        frames = list(self.iter_frames(url, params, chunk_rows))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()